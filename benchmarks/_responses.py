@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""Synthetic MixVel responses for benchmarks."""
+import copy
+import os
+
+from lxml import etree
+
+here = os.path.dirname(os.path.abspath(__file__))
+SAMPLE = os.path.join(
+    here, os.pardir, "tests", "responses", "order", "air-shopping__RT-2ADT1CNN.xml"
+)
+
+
+def air_shopping_response(offers_count, distinct_prices=50):
+    """Returns raw AirShoppingRS with the sample offer copied `offers_count` times.
+
+    Copies get unique offer ids and one of `distinct_prices` total prices,
+    as real responses repeat a few fares across many offers.
+
+    :rtype: bytes
+    """
+    envelope = etree.parse(SAMPLE).getroot()
+    sample = envelope.find(".//Response/Offer")
+    response = sample.getparent()
+    response.remove(sample)
+    for n in range(offers_count):
+        offer = copy.deepcopy(sample)
+        offer.find("OfferID").text = "offer-{:08d}".format(n)
+        total_amount = offer.find("TotalPrice/TotalAmount")
+        total_amount.text = "{}.00".format(4863 + (n * 7919) % distinct_prices * 100)
+        response.append(offer)
+    return etree.tostring(envelope, xml_declaration=True, encoding="utf-8")
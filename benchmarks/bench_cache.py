@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Get/set latency of cache backends with a parsed AirShopping response
+and with its raw bytes, as cached by `Client`.
+
+    PYTHONPATH=src python benchmarks/bench_cache.py
+"""
+import shutil
+import tempfile
+import timeit
+
+from mixvel._parsers import parse_air_shopping_response
+from mixvel.cache import DiskCache, KeyValueCache, LocalKeyValueStore, TTLCache
+from mixvel.client import _parse_response
+
+from _responses import air_shopping_response
+
+NUMBER = 20
+
+if __name__ == "__main__":
+    content = air_shopping_response(100)
+    parse = lambda: parse_air_shopping_response(_parse_response(content))
+    best = min(timeit.repeat(parse, number=NUMBER, repeat=3))
+    print("parse raw {} KB: {:8.3f} ms".format(len(content) // 1024, best / NUMBER * 1e3))
+    values = [("raw", content), ("parsed", parse())]
+    path = tempfile.mkdtemp()
+    try:
+        for value_name, value in values:
+            backends = [
+                ("memory", TTLCache()),
+                ("disk", DiskCache(path)),
+                ("key-value", KeyValueCache(LocalKeyValueStore())),
+            ]
+            for name, cache in backends:
+                for n in range(NUMBER):
+                    cache.set(n, value)
+                    cache.get(n)
+                print("{:<10} {:<10} set {:8.3f} ms  get {:8.3f} ms".format(
+                    value_name, name,
+                    cache.set_latency.mean * 1e3, cache.get_latency.mean * 1e3,
+                ))
+                cache.clear()
+    finally:
+        shutil.rmtree(path)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Datetime parsing of AirShopping responses: `strptime` per value
+(as it was done before) against memoized `parse_datetime`.
+
+    PYTHONPATH=src python benchmarks/bench_datetimes.py
+"""
+import datetime
+import timeit
+
+from lxml import etree
+
+from mixvel import _parsers
+from mixvel.client import _check_response
+
+from _responses import air_shopping_response
+
+NUMBER = 3
+
+
+def parse_datetime_strptime(text):
+    return datetime.datetime.strptime(text.split(".")[0].rstrip("Z"), _parsers.DATETIME_FORMAT)
+
+
+if __name__ == "__main__":
+    parse_datetime = _parsers.parse_datetime
+    content = air_shopping_response(200)
+    resp = _check_response(etree.fromstring(content))
+    texts = [
+        elm.text for elm in resp.iter("ScheduledDateTime", "OfferExpirationTimeLimitDateTime")
+    ]
+    print("{} offers, {} timestamps, {} distinct".format(
+        len(resp.findall("./Response/Offer")), len(texts), len(set(texts))
+    ))
+    for name, fn in [("strptime", parse_datetime_strptime), ("parse_datetime", parse_datetime)]:
+        best = min(timeit.repeat(lambda: [fn(text) for text in texts], number=NUMBER, repeat=3))
+        print("{:<15} {:8.3f} us/value".format(name, best / NUMBER / len(texts) * 1e6))
+        _parsers.parse_datetime = fn
+        best = min(timeit.repeat(
+            lambda: _parsers.parse_air_shopping_response(resp), number=NUMBER, repeat=3
+        ))
+        print("{:<15} {:8.1f} ms/response".format("", best / NUMBER * 1e3))
+    _parsers.parse_datetime = parse_datetime
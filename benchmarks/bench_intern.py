@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Memory of parsed offers with and without interning of repeated codes.
+
+A synthetic 20k-offer response is parsed in chunks of 1000 offers,
+parsed models are kept and their unique objects are summed up.
+
+    PYTHONPATH=src python benchmarks/bench_intern.py
+"""
+import datetime
+import sys
+
+from lxml import etree
+
+from mixvel import _parsers
+from mixvel.client import _check_response
+from mixvel.models import Model, _field_names
+
+from _responses import air_shopping_response
+
+OFFERS_COUNT = 20000
+CHUNK = 1000
+
+try:
+    string_types = (str, unicode)
+except NameError:
+    string_types = (str,)
+
+
+def footprint(root):
+    """Returns total size of unique objects reachable from root and
+    number of string objects among them."""
+    seen = set()
+    stack = [root]
+    size = strings = 0
+    while stack:
+        obj = stack.pop()
+        if obj is None or id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, string_types):
+            strings += 1
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, Model):
+            stack.extend(getattr(obj, name) for name in _field_names(type(obj)))
+        elif hasattr(obj, "__dict__") and not isinstance(obj, datetime.datetime):
+            size += sys.getsizeof(obj.__dict__)
+            stack.extend(obj.__dict__.values())
+    return size, strings
+
+
+def parse_offers(resp):
+    offers = []
+    for _ in range(OFFERS_COUNT // CHUNK):
+        offers.extend(_parsers.parse_air_shopping_response(resp).offers)
+    return offers
+
+
+if __name__ == "__main__":
+    resp = _check_response(etree.fromstring(air_shopping_response(CHUNK)))
+    intern_text = _parsers.intern_text
+    for name, fn in [("plain", lambda text: text), ("interned", intern_text)]:
+        _parsers.intern_text = fn
+        _parsers._strings.clear()
+        offers = parse_offers(resp)
+        size, strings = footprint(offers)
+        print("{:<10} {} offers {:8.1f} MB {:>9} strings".format(
+            name, len(offers), size / 1024.0 / 1024, strings
+        ))
+        del offers
+    _parsers.intern_text = intern_text
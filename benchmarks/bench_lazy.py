@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Time of eager and lazy offers of AirShopping responses, for a results list
+which reads price, owner and expiration of every offer and opens
+fare details and services of a few.
+
+    PYTHONPATH=src python benchmarks/bench_lazy.py
+"""
+import timeit
+
+from lxml import etree
+
+from mixvel._parsers import parse_air_shopping_response
+from mixvel.client import _check_response
+
+from _responses import air_shopping_response
+
+NUMBER = 3
+OPENED = 5  # offers a user clicks
+
+
+def results_list(resp, lazy_offers):
+    offers = parse_air_shopping_response(resp, lazy_offers=lazy_offers).offers
+    rows = [
+        (o.total_price.total_amount.amount, o.owner_code, o.offer_expiration_timelimit_datetime)
+        for o in offers
+    ]
+    for offer in offers[:OPENED]:
+        for item in offer.offer_items:
+            item.fare_details, item.services, item.price.tax_summary
+    return rows
+
+
+if __name__ == "__main__":
+    for offers_count in [100, 1000]:
+        resp = _check_response(etree.fromstring(air_shopping_response(offers_count)))
+        for lazy_offers in [False, True]:
+            run = lambda: results_list(resp, lazy_offers)
+            best = min(timeit.repeat(run, number=NUMBER, repeat=3))
+            print("{:>5} offers lazy_offers={!s:<5} {:8.1f} ms".format(
+                offers_count, lazy_offers, best / NUMBER * 1e3
+            ))
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Memory of models with `__slots__` against the same models with `__dict__`.
+
+Every object of a parsed 1000-offer response is copied into an equivalent
+class which keeps its fields in a per-instance `__dict__`, as models did
+before, and footprints of both trees are compared.
+
+    PYTHONPATH=src python benchmarks/bench_models.py
+"""
+import collections
+import sys
+
+from lxml import etree
+
+from mixvel import _parsers
+from mixvel.client import _check_response
+from mixvel.models import Model, _field_names
+
+from _responses import air_shopping_response
+from bench_intern import footprint
+
+OFFERS_COUNT = 1000
+
+_dict_classes = {}
+
+
+def _dict_class(cls):
+    klass = _dict_classes.get(cls)
+    if klass is None:
+        klass = _dict_classes[cls] = type(cls.__name__, (object,), {})
+    return klass
+
+
+def with_dict(obj, copies=None):
+    """Returns copy of model tree made of classes with `__dict__`."""
+    if copies is None:
+        copies = {}
+    if id(obj) in copies:
+        return copies[id(obj)]
+    if isinstance(obj, list):
+        copy = [with_dict(item, copies) for item in obj]
+    elif isinstance(obj, Model):
+        copy = _dict_class(type(obj))()
+        for name in _field_names(type(obj)):
+            setattr(copy, name, with_dict(getattr(obj, name), copies))
+    else:
+        copy = obj
+    copies[id(obj)] = copy
+    return copy
+
+
+def instance_sizes(root):
+    """Returns per-class instance counts and sizes, with `__dict__`."""
+    counts = collections.Counter()
+    sizes = collections.Counter()
+    seen = set()
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, list):
+            stack.extend(obj)
+        elif isinstance(obj, Model):
+            counts[type(obj).__name__] += 1
+            sizes[type(obj).__name__] += sys.getsizeof(obj)
+            stack.extend(getattr(obj, name) for name in _field_names(type(obj)))
+        elif type(obj) in _dict_classes.values():
+            counts[type(obj).__name__] += 1
+            sizes[type(obj).__name__] += sys.getsizeof(obj) + sys.getsizeof(obj.__dict__)
+            stack.extend(obj.__dict__.values())
+    return counts, sizes
+
+
+if __name__ == "__main__":
+    resp = _check_response(etree.fromstring(air_shopping_response(OFFERS_COUNT)))
+    slotted = _parsers.parse_air_shopping_response(resp)
+    dicted = with_dict(slotted)
+    counts, slotted_sizes = instance_sizes(slotted)
+    _, dicted_sizes = instance_sizes(dicted)
+    print("{:<26} {:>8} {:>10} {:>10}".format("model", "objects", "__dict__", "__slots__"))
+    for name, count in counts.most_common():
+        print("{:<26} {:>8} {:>8} B {:>8} B".format(
+            name, count, dicted_sizes[name] // count, slotted_sizes[name] // count,
+        ))
+    for name, root in [("__dict__", dicted), ("__slots__", slotted)]:
+        size, _ = footprint(root)
+        print("{:<10} {} offers {:8.1f} MB".format(
+            name, OFFERS_COUNT, size / 1024.0 / 1024,
+        ))
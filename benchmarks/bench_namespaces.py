@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""Namespace stripping of AirShopping responses of different sizes.
+
+    PYTHONPATH=src python benchmarks/bench_namespaces.py
+"""
+import timeit
+
+from lxml import etree
+
+from mixvel.utils import (
+    lxml_remove_namespaces, strip_envelope_namespaces, strip_namespaces,
+)
+
+from _responses import air_shopping_response
+
+if __name__ == "__main__":
+    for offers_count in [10, 100, 1000, 3000]:
+        content = air_shopping_response(offers_count)
+        number = max(1, 1000 // offers_count)
+        row = ["{:>6} offers {:>6} KB".format(offers_count, len(content) // 1024)]
+        for fn in [lxml_remove_namespaces, strip_namespaces, strip_envelope_namespaces]:
+            # trees are kept alive, so deallocation is not measured
+            trees = iter([etree.fromstring(content) for _ in range(number * 3)])
+            best = min(timeit.repeat(
+                lambda: fn(next(trees)), number=number, repeat=3
+            ))
+            row.append("{} {:8.3f} ms".format(fn.__name__, best / number * 1e3))
+        print("  ".join(row))
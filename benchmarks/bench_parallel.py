@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Parse time of a large AirShopping response, serially and in process
+pools of growing size. Speedup is bounded by the number of CPU cores.
+
+    PYTHONPATH=src python benchmarks/bench_parallel.py
+"""
+import multiprocessing
+import timeit
+
+from lxml import etree
+
+from mixvel._parsers import parse_air_shopping_response
+from mixvel.client import _check_response
+
+from _responses import air_shopping_response
+
+OFFERS_COUNT = 2000
+NUMBER = 1
+
+if __name__ == "__main__":
+    resp = _check_response(etree.fromstring(air_shopping_response(OFFERS_COUNT)))
+    print("{} CPU cores, {} offers".format(multiprocessing.cpu_count(), OFFERS_COUNT))
+    parse = lambda: parse_air_shopping_response(resp)
+    serial = min(timeit.repeat(parse, number=NUMBER, repeat=3)) / NUMBER
+    print("serial      {:8.1f} ms".format(serial * 1e3))
+    for processes in [1, 2, 4, 8]:
+        pool = multiprocessing.Pool(processes)
+        try:
+            parse = lambda: parse_air_shopping_response(resp, pool=pool)
+            best = min(timeit.repeat(parse, number=NUMBER, repeat=3)) / NUMBER
+        finally:
+            pool.close()
+            pool.join()
+        print("{} processes {:8.1f} ms {:5.2f}x".format(processes, best * 1e3, serial / best))
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""Parse time of AirShopping responses of different sizes.
+
+Run it on two checkouts to compare parser changes:
+
+    PYTHONPATH=src python benchmarks/bench_parsers.py
+"""
+import timeit
+
+from lxml import etree
+
+from mixvel._parsers import parse_air_shopping_response
+from mixvel.client import _check_response
+
+from _responses import air_shopping_response
+
+if __name__ == "__main__":
+    for offers_count in [10, 100, 1000]:
+        resp = _check_response(etree.fromstring(air_shopping_response(offers_count)))
+        number = max(1, 300 // offers_count)
+        best = min(timeit.repeat(
+            lambda: parse_air_shopping_response(resp), number=number, repeat=3
+        ))
+        print("{:>5} offers {:10.2f} ms".format(offers_count, best / number * 1e3))
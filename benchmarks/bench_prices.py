@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""Parse time and memory of AirShopping responses with and without
+sharing of equal prices.
+
+    PYTHONPATH=src python benchmarks/bench_prices.py
+"""
+import timeit
+
+from lxml import etree
+
+from mixvel._parsers import parse_air_shopping_response
+from mixvel.client import _check_response
+
+from _responses import air_shopping_response
+from bench_intern import footprint
+
+NUMBER = 3
+
+if __name__ == "__main__":
+    for offers_count in [100, 1000]:
+        resp = _check_response(etree.fromstring(air_shopping_response(offers_count)))
+        for share_prices in [False, True]:
+            parse = lambda: parse_air_shopping_response(resp, share_prices=share_prices)
+            best = min(timeit.repeat(parse, number=NUMBER, repeat=3))
+            size, _ = footprint(parse().offers)
+            print("{:>5} offers share_prices={!s:<5} {:8.1f} ms {:8.1f} MB".format(
+                offers_count, share_prices, best / NUMBER * 1e3, size / 1024.0 / 1024
+            ))
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Parse time and memory of AirShopping responses by offer projection.
+
+    PYTHONPATH=src python benchmarks/bench_projection.py
+"""
+import timeit
+
+from lxml import etree
+
+from mixvel._parsers import parse_air_shopping_response
+from mixvel.client import _check_response
+
+from _responses import air_shopping_response
+from bench_intern import footprint
+
+NUMBER = 3
+
+if __name__ == "__main__":
+    for offers_count in [100, 1000]:
+        resp = _check_response(etree.fromstring(air_shopping_response(offers_count)))
+        for projection in ["summary", "pricing", "full"]:
+            parse = lambda: parse_air_shopping_response(resp, projection=projection)
+            best = min(timeit.repeat(parse, number=NUMBER, repeat=3))
+            size, _ = footprint(parse().offers)
+            print("{:>5} offers {:<8} {:8.1f} ms {:8.1f} MB".format(
+                offers_count, projection, best / NUMBER * 1e3, size / 1024.0 / 1024
+            ))
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Per-request cost of rendering AirShopping request.
+
+Compares building a new Jinja environment per request (as it was done
+before templates were cached) with the process-wide compiled templates.
+
+    PYTHONPATH=src python benchmarks/bench_render.py
+"""
+import datetime
+import os
+import timeit
+import uuid
+
+from jinja2 import Environment, FileSystemLoader
+
+from mixvel import AnonymousPassenger, Leg
+from mixvel import _render
+
+NUMBER = 2000
+
+context = {
+    "itinerary": [
+        Leg("MOW", "AER", datetime.date(2025, 6, 13)),
+        Leg("AER", "MOW", datetime.date(2025, 6, 21)),
+    ],
+    "paxes": [
+        AnonymousPassenger("Pax-1", "ADT"),
+        AnonymousPassenger("Pax-2", "ADT"),
+        AnonymousPassenger("Pax-3", "CNN"),
+    ],
+    "message_id": uuid.uuid4(),
+    "time_sent": datetime.datetime.utcnow(),
+}
+templates_dir = os.path.join(os.path.dirname(_render.__file__), "templates")
+
+
+def render_uncached():
+    env = Environment(loader=FileSystemLoader(templates_dir))
+    return env.get_template("order_air-shopping.xml").render(context)
+
+
+def render_cached():
+    return _render.render("order_air-shopping.xml", context)
+
+
+if __name__ == "__main__":
+    assert render_uncached() == render_cached()
+    for name, fn in [("uncached", render_uncached), ("cached", render_cached)]:
+        best = min(timeit.repeat(fn, number=NUMBER, repeat=3))
+        print("{:<10} {:8.1f} us/request".format(name, best / NUMBER * 1e6))
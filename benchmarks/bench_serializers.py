@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Throughput of request serializers: Jinja templates vs lxml builders.
+
+    PYTHONPATH=src python benchmarks/bench_serializers.py
+"""
+import datetime
+import timeit
+import uuid
+
+from mixvel import (
+    AnonymousPassenger, IdentityDocument, Individual, Leg, Passenger,
+    SelectedOffer, SelectedOfferItem,
+)
+from mixvel.client import SERIALIZERS
+
+NUMBER = 2000
+
+base = {
+    "message_id": uuid.uuid4(),
+    "time_sent": datetime.datetime.utcnow(),
+}
+requests = {
+    "order_air-shopping.xml": dict(base, **{
+        "itinerary": [
+            Leg("MOW", "AER", datetime.date(2025, 6, 13)),
+            Leg("AER", "MOW", datetime.date(2025, 6, 21)),
+        ],
+        "paxes": [
+            AnonymousPassenger("Pax-1", "ADT"),
+            AnonymousPassenger("Pax-2", "ADT"),
+            AnonymousPassenger("Pax-3", "CNN"),
+        ],
+    }),
+    "order_create.xml": dict(base, **{
+        "selected_offer": SelectedOffer(
+            "d21832f0", [SelectedOfferItem("979aa343", ["Pax-1", "Pax-2", "Pax-3"])]
+        ),
+        "paxes": [
+            Passenger(
+                "Pax-{}".format(n), "ADT",
+                Individual("Francis", "Nikolas", "Bacon", "M", datetime.date(1961, 1, 22)),
+                IdentityDocument("4509511001", "PS", "RU", datetime.date(2035, 1, 1)),
+                phone="+79651112233", email="me@francisbacon.com",
+            )
+            for n in range(1, 4)
+        ],
+    }),
+}
+
+
+def encoded(name, serializer):
+    data = SERIALIZERS[serializer](name, requests[name])
+    return data if isinstance(data, bytes) else data.encode("utf-8")
+
+
+if __name__ == "__main__":
+    for name in sorted(requests):
+        for serializer in ["jinja", "lxml"]:
+            best = min(timeit.repeat(
+                lambda: encoded(name, serializer), number=NUMBER, repeat=3
+            ))
+            print("{:<24} {:<6} {:8.0f} requests/s {:6d} bytes".format(
+                name, serializer, NUMBER / best, len(encoded(name, serializer))
+            ))
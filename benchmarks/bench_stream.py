@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Peak memory of parsing AirShopping responses from a file, all at once,
+streamed offer by offer with `iter_offers`, or only the 50 cheapest
+offers of the stream.
+
+Each run is a separate process, spawned by a parent that stays small since
+peak resident set size survives `exec`.
+
+    PYTHONPATH=src python benchmarks/bench_stream.py
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from mixvel._parsers import iter_offers, parse_air_shopping_response
+from mixvel.client import _parse_response
+
+from _responses import air_shopping_response
+
+
+def run(mode, path):
+    if mode.isdigit():
+        with open(path, "wb") as f:
+            f.write(air_shopping_response(int(mode)))
+        return
+    started = time.time()
+    with open(path, "rb") as f:
+        if mode == "parse":
+            count = len(parse_air_shopping_response(_parse_response(f.read())).offers)
+        elif mode == "top_k":
+            count = sum(1 for _ in iter_offers(f, top_k=50))
+        else:
+            count = sum(1 for _ in iter_offers(f))
+    elapsed = time.time() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0  # KB on Linux
+    print("{:>5} offers {:<6} {:8.1f} ms {:8.1f} MB peak RSS".format(
+        count, mode, elapsed * 1e3, peak
+    ))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        run(sys.argv[1], sys.argv[2])
+        sys.exit()
+    for offers_count in [500, 1000, 2000]:
+        fd, path = tempfile.mkstemp(suffix=".xml")
+        os.close(fd)
+        try:
+            for mode in [str(offers_count), "parse", "stream", "top_k"]:
+                subprocess.check_call([sys.executable, __file__, mode, path])
+        finally:
+            os.remove(path)
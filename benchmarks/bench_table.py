@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Filter, sort and group-by of parsed offers with Python loops
+and with `OfferTable` columns.
+
+    PYTHONPATH=src python benchmarks/bench_table.py
+"""
+import collections
+import timeit
+
+from lxml import etree
+
+from mixvel._parsers import parse_air_shopping_response
+from mixvel.client import _check_response
+from mixvel.table import OfferTable
+
+from _responses import air_shopping_response
+
+OFFERS_COUNT = 2000
+NUMBER = 20
+MAX_AMOUNT = 600000
+
+
+def with_loops(offers):
+    cheap = [o for o in offers if o.total_price.total_amount.amount <= MAX_AMOUNT]
+    ranked = sorted(cheap, key=lambda o: o.total_price.total_amount.amount)
+    by_owner = collections.defaultdict(list)
+    for offer in ranked:
+        by_owner[offer.owner_code].append(offer)
+    return by_owner
+
+
+def with_table(table):
+    ranked = table.sort(indices=table.filter(max_amount=MAX_AMOUNT))
+    return table.group_by("owner_code", ranked)
+
+
+if __name__ == "__main__":
+    resp = _check_response(etree.fromstring(air_shopping_response(OFFERS_COUNT)))
+    shopping = parse_air_shopping_response(resp)
+    table = OfferTable(shopping.offers, shopping.data_lists)
+    for name, run in [
+        ("loops", lambda: with_loops(shopping.offers)),
+        ("table", lambda: with_table(table)),
+        ("build table", lambda: OfferTable(shopping.offers, shopping.data_lists)),
+    ]:
+        best = min(timeit.repeat(run, number=NUMBER, repeat=3)) / NUMBER
+        print("{} offers {:<12} {:8.3f} ms".format(OFFERS_COUNT, name, best * 1e3))
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Time of the 50 cheapest offers of AirShopping responses, parsed in full
+and sorted, selected with `top_k` from the parsed tree or from the stream,
+and memory of models built on the way. The parsed tree is not counted,
+its parse time is shown as "xml", see bench_stream.py for peak memory.
+
+    PYTHONPATH=src python benchmarks/bench_top_k.py
+"""
+import timeit
+
+from lxml import etree
+
+from mixvel._parsers import iter_offers, parse_air_shopping_response
+from mixvel.client import _check_response
+
+from _responses import air_shopping_response
+from bench_intern import footprint
+
+NUMBER = 3
+K = 50
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_all(resp):
+    return parse_air_shopping_response(resp).offers
+
+
+def sort_all(resp):
+    return sorted(parse_all(resp), key=lambda o: o.total_price.total_amount.amount)[:K]
+
+
+def top_k(resp):
+    return parse_air_shopping_response(resp, top_k=K).offers
+
+
+def stream_top_k(chunks):
+    return list(iter_offers(chunks, top_k=K))
+
+
+if __name__ == "__main__":
+    for offers_count in [500, 2000]:
+        content = air_shopping_response(offers_count)
+        chunks = [content[i:i + CHUNK_SIZE] for i in range(0, len(content), CHUNK_SIZE)]
+        resp = _check_response(etree.fromstring(content))
+        best = min(timeit.repeat(lambda: etree.fromstring(content), number=NUMBER, repeat=3))
+        print("{:>5} offers {:<10} {:8.1f} ms".format(offers_count, "xml", best / NUMBER * 1e3))
+        # the stream is read from raw chunks, the rest from the parsed tree
+        for name, run, built, source in [
+            ("parse+sort", sort_all, parse_all, resp),
+            ("top_k", top_k, top_k, resp),
+            ("stream", stream_top_k, stream_top_k, chunks),
+        ]:
+            parse = lambda: run(source)
+            best = min(timeit.repeat(parse, number=NUMBER, repeat=3))
+            size, _ = footprint(built(source))
+            print("{:>5} offers {:<10} {:8.1f} ms {:8.2f} MB".format(
+                offers_count, name, best / NUMBER * 1e3, size / 1024.0 / 1024
+            ))
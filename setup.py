@@ -52,5 +52,7 @@ setup(
     ],
     extras_require={
         "test": test_requirements,
+        "async": ["aiohttp; python_version >= '3.5'"],
+        "table": ["numpy"],
     },
 )
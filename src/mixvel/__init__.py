@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import sys
+
 from .__version__ import (
     __title__, __description__, __url__, __version__,
     __author__, __author_email__,
@@ -6,9 +8,20 @@ from .__version__ import (
 
 from . import utils
 from .client import PROD_GATEWAY, TEST_GATEWAY
-from .client import Client
+from .client import Client, Exchange, create_session
+if sys.version_info >= (3, 5):
+    from .aio import AsyncClient
+from .cache import (
+    CacheBackend,
+    DiskCache,
+    KeyValueCache,
+    LocalKeyValueStore,
+    TTLCache,
+)
+from .table import OfferTable
+from .tokens import FileTokenStore, MemoryTokenStore, TokenStore
 from .exceptions import (
-    NoOrdersToCancel
+    AuthenticationFailed, MixvelError, NoOrdersToCancel,
 )
 from .models import (
     Amount, AnonymousPassenger, Booking, BookingEntity,
@@ -21,6 +34,7 @@ from .models import (
     Tax, TaxSummary, Ticket, TicketDocInfo,
     TransportDepArrival, ValidatingParty,
 )  # types
+from .models import UNLOADED
 from .models import (
     AirShoppingResponse, OrderViewResponse,
 )  # responses
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+"""
+mixvel._builders
+~~~~~~~~~~~~~~
+Provides internal functions for building MixVel API requests with lxml.
+
+It is a template-free alternative to `mixvel._render`: requests are built
+straight from models into compact UTF-8 bytes. The output matches rendered
+templates up to insignificant whitespace.
+"""
+
+from lxml import etree
+
+try:
+    text_type = unicode
+except NameError:
+    text_type = str
+
+ENVELOPE_NS = "https://www.mixvel.com/API/XSD/mixvel_envelope/1_06"
+AUTH_NS = "https://www.mixvel.com/API/XSD/mixvel_auth/1_01"
+AIR_SHOPPING_NS = "https://www.mixvel.com/API/XSD/Mixvel_AirShoppingRQ/1_01"
+ORDER_CANCEL_NS = "https://www.mixvel.com/API/XSD/Mixvel_OrderCancelRQ/1_01"
+ORDER_CHANGE_NS = "https://www.mixvel.com/API/XSD/Mixvel_OrderChangeRQ/1_00"
+ORDER_CREATE_NS = "https://www.mixvel.com/API/XSD/Mixvel_OrderCreateRQ/1_01"
+ORDER_RETRIEVE_NS = "https://www.mixvel.com/API/XSD/Mixvel_OrderRetrieveRQ/1_00"
+
+
+def _sub(parent, tag, text=None):
+    elm = etree.SubElement(parent, tag)
+    if text is not None:
+        elm.text = text_type(text)
+    return elm
+
+
+def _root(prefix, ns, tag):
+    return etree.Element("{%s}%s" % (ns, tag), nsmap={prefix: ns})
+
+
+def build_envelope(context):
+    """Builds MixVel envelope with empty `AppData` node.
+
+    :param context: request variables, `message_id` and `time_sent`
+    :type context: dict
+    :rtype: lxml.etree._Element
+    """
+    envelope = _root("MixEnv", ENVELOPE_NS, "Envelope")
+    _sub(envelope, "Header")
+    body = _sub(envelope, "Body")
+    message_info = _sub(body, "MessageInfo")
+    message_info.set("MessageId", text_type(context["message_id"]))
+    message_info.set("TimeSent", context["time_sent"].strftime("%Y-%m-%dT%H:%M:%SZ"))
+    _sub(body, "AppData")
+    return envelope
+
+
+def build_login(context):
+    """Builds Auth request.
+
+    :rtype: lxml.etree._Element
+    """
+    auth = _root("a", AUTH_NS, "Auth")
+    _sub(auth, "Login", context["login"])
+    _sub(auth, "Password", context["password"])
+    _sub(auth, "StructureUnitID", context["structure_unit_id"])
+    return auth
+
+
+def build_air_shopping(context):
+    """Builds Mixvel_AirShoppingRQ.
+
+    :rtype: lxml.etree._Element
+    """
+    rq = _root("shop", AIR_SHOPPING_NS, "Mixvel_AirShoppingRQ")
+    request = _sub(rq, "Request")
+    criteria = _sub(
+        _sub(request, "FlightRequest"), "FlightRequestOriginDestinationsCriteria"
+    )
+    for leg in context["itinerary"]:
+        origin_dest = _sub(criteria, "OriginDestCriteria")
+        cabin_type = _sub(origin_dest, "CabinType")
+        _sub(cabin_type, "CabinTypeCode", leg.cabin)
+        _sub(_sub(cabin_type, "PrefLevel"), "PrefLevelCode", "Required")
+        _sub(_sub(origin_dest, "DestArrivalCriteria"), "IATA_LocationCode", leg.destination)
+        origin_dep = _sub(origin_dest, "OriginDepCriteria")
+        _sub(origin_dep, "Date", leg.departure)
+        _sub(origin_dep, "IATA_LocationCode", leg.origin)
+    paxs = _sub(request, "Paxs")
+    for pax in context["paxes"]:
+        pax_node = _sub(paxs, "Pax")
+        _sub(pax_node, "PaxID", pax.pax_id)
+        _sub(pax_node, "PTC", pax.ptc)
+    pricing = _sub(_sub(request, "ShoppingCriteria"), "PricingMethodCriteria")
+    _sub(pricing, "BestPricingOptionText", "Extended")
+    _sub(pricing, "CarrierMixInd", "true")
+    return rq
+
+
+def build_order_cancel(context):
+    """Builds Mixvel_OrderCancelRQ.
+
+    :rtype: lxml.etree._Element
+    """
+    rq = _root("m", ORDER_CANCEL_NS, "Mixvel_OrderCancelRQ")
+    mix_order = _sub(_sub(rq, "Request"), "MixOrder")
+    _sub(mix_order, "MixOrderID", context["mix_order_id"])
+    return rq
+
+
+def build_order_change(context):
+    """Builds Mixvel_OrderChangeRQ.
+
+    :rtype: lxml.etree._Element
+    """
+    rq = _root("o", ORDER_CHANGE_NS, "Mixvel_OrderChangeRQ")
+    request = _sub(rq, "Request")
+    _sub(_sub(request, "MixOrder"), "MixOrderID", context["mix_order_id"])
+    details = _sub(_sub(request, "PaymentFunctions"), "PaymentProcessingDetails")
+    _sub(details, "Amount", context["amount"]).set("CurCode", "RUB")
+    _sub(_sub(details, "PaymentProcessingDetailsPaymentMethod"), "OtherPaymentMethod")
+    return rq
+
+
+def build_order_create(context):
+    """Builds Mixvel_OrderCreateRQ.
+
+    :rtype: lxml.etree._Element
+    """
+    rq = _root("m", ORDER_CREATE_NS, "Mixvel_OrderCreateRQ")
+    request = _sub(rq, "Request")
+    selected_offer = context["selected_offer"]
+    selected_offer_node = _sub(_sub(request, "CreateOrder"), "SelectedOffer")
+    _sub(selected_offer_node, "OfferRefID", selected_offer.offer_ref_id)
+    for selected_offer_item in selected_offer.selected_offer_items:
+        item = _sub(selected_offer_node, "SelectedOfferItem")
+        _sub(item, "OfferItemRefID", selected_offer_item.offer_item_ref_id)
+        for pax_ref_id in selected_offer_item.pax_ref_ids:
+            _sub(item, "PaxRefID", pax_ref_id)
+    data_lists = _sub(request, "DataLists")
+    contact_info_list = _sub(data_lists, "ContactInfoList")
+    pax_list = _sub(data_lists, "PaxList")
+    for index, pax in enumerate(context["paxes"], 1):
+        contact_info_id = "Contact-{}".format(index)
+        if pax.email is not None and pax.phone is not None:
+            contact_info = _sub(contact_info_list, "ContactInfo")
+            _sub(contact_info, "ContactInfoID", contact_info_id)
+            email = _sub(contact_info, "EmailAddress")
+            _sub(email, "ContactTypeText", "personal")
+            _sub(email, "EmailAddressText", pax.email)
+            phone = _sub(contact_info, "Phone")
+            _sub(phone, "ContactTypeText", "personal")
+            _sub(phone, "PhoneNumber", pax.phone)
+        pax_node = _sub(pax_list, "Pax")
+        if pax.email is not None or pax.phone is not None:
+            _sub(pax_node, "ContactInfoRefID", contact_info_id)
+        doc = _sub(pax_node, "IdentityDoc")
+        _sub(doc, "ExpiryDate", pax.doc.expiry_date)
+        _sub(doc, "IdentityDocID", pax.doc.doc_id)
+        _sub(doc, "IdentityDocTypeCode", pax.doc.type_code)
+        _sub(doc, "IssuingCountryCode", pax.doc.issuing_country_code)
+        _sub(doc, "Surname", pax.individual.surname)
+        individual = _sub(pax_node, "Individual")
+        _sub(individual, "Birthdate", pax.individual.birthdate)
+        _sub(individual, "GenderCode", pax.individual.gender)
+        _sub(individual, "GivenName", pax.individual.given_name)
+        if pax.individual.middle_name:
+            _sub(individual, "MiddleName", pax.individual.middle_name)
+        _sub(individual, "Surname", pax.individual.surname)
+        _sub(pax_node, "PaxID", pax.pax_id)
+        _sub(pax_node, "PTC", pax.ptc)
+    return rq
+
+
+def build_order_retrieve(context):
+    """Builds Mixvel_OrderRetrieveRQ.
+
+    :rtype: lxml.etree._Element
+    """
+    rq = _root("o", ORDER_RETRIEVE_NS, "Mixvel_OrderRetrieveRQ")
+    criteria = _sub(_sub(rq, "Request"), "OrderFilterCriteria")
+    _sub(_sub(criteria, "MixOrder"), "MixOrderID", context["mix_order_id"])
+    return rq
+
+
+builders = {
+    "accounts_login.xml": build_login,
+    "order_air-shopping.xml": build_air_shopping,
+    "order_cancel.xml": build_order_cancel,
+    "order_change.xml": build_order_change,
+    "order_create.xml": build_order_create,
+    "order_retrieve.xml": build_order_retrieve,
+}
+
+
+def serialize(name, context):
+    """Builds request, a drop-in replacement of `mixvel._render.render`.
+
+    :param name: file name of request template the request replaces
+    :type name: str
+    :param context: request variables
+    :type context: dict
+    :return: UTF-8 encoded request
+    :rtype: bytes
+    """
+    envelope = build_envelope(context)
+    envelope[1][1].append(builders[name](context))  # Body/AppData
+    return etree.tostring(envelope, xml_declaration=True, encoding="UTF-8")
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 import datetime
+import heapq
 
+from lxml import etree
+
+from .exceptions import error_class
 from .models import (
     Amount,
     AnonymousPassenger,
@@ -35,6 +39,184 @@ from .models import (
     AirShoppingResponse,
     OrderViewResponse,
 )
+from .models import UNLOADED
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+DATETIME_CACHE_SIZE = 4096
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+STRING_CACHE_SIZE = 65536
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# smaller responses are parsed serially, the pool was slower than one process
+# on them in bench_parallel.py
+PARALLEL_MIN_OFFERS = 5000
+PARALLEL_CHUNK_OFFERS = 250
+
+# Fields of offers parsed by projection presets, `offer_items.<field>`
+# names fields of offer items, `offer_items` all of them
+PROJECTIONS = {
+    "summary": frozenset([
+        "offer_id",
+        "owner_code",
+        "offer_expiration_timelimit_datetime",
+        "total_price",
+    ]),
+    "pricing": frozenset([
+        "offer_id",
+        "owner_code",
+        "offer_expiration_timelimit_datetime",
+        "ticket_docs_count",
+        "total_price",
+        "offer_items.offer_item_id",
+        "offer_items.price",
+        "offer_items.fare_details",
+    ]),
+    "full": None,
+}
+
+_datetimes = {}  # text: datetime, responses repeat a few timestamps many times
+_strings = {}  # text: text, codes and references repeated across offers
+_projections = {}  # projection: fields of air shopping response read for it
+
+
+def intern_text(text):
+    """Returns shared copy of repeated text, e.g. IATA, carrier or currency code.
+
+    Equal values parsed from one or several responses share one string
+    object instead of a copy per model. Up to `STRING_CACHE_SIZE` values
+    are kept.
+
+    :param text: text or None
+    :type text: str or None
+    :rtype: str or None
+    """
+    shared = _strings.get(text)
+    if shared is not None or text is None:
+        return shared
+    if len(_strings) >= STRING_CACHE_SIZE:
+        _strings.clear()
+    _strings[text] = text
+    return text
+
+
+def parse_datetime(text):
+    """Parse ISO 8601 date and time, e.g. "2025-06-13T10:05:00".
+
+    Fractions of a second and "Z" suffix are dropped. The fixed format
+    is parsed by slicing, anything else falls back to `strptime`.
+    Results are memoized, up to `DATETIME_CACHE_SIZE` values.
+
+    :param text: date and time
+    :type text: str
+    :rtype: datetime.datetime
+    """
+    value = _datetimes.get(text)
+    if value is not None:
+        return value
+    s = text.split(".")[0].rstrip("Z")
+    try:
+        if len(s) != 19 or s[4] + s[7] + s[10] + s[13] + s[16] != "--T::":
+            raise ValueError(text)
+        value = datetime.datetime(
+            int(s[0:4]), int(s[5:7]), int(s[8:10]),
+            int(s[11:13]), int(s[14:16]), int(s[17:19]),
+        )
+    except ValueError:
+        value = datetime.datetime.strptime(s, DATETIME_FORMAT)
+    if len(_datetimes) >= DATETIME_CACHE_SIZE:
+        _datetimes.clear()
+    _datetimes[text] = value
+    return value
+
+
+# How a field takes values of children with its tag, see `_read`
+ONE = 0  # value of the first child, like `find`
+MANY = 1  # list of values of all children
+ALL = 2  # list of items of all values, when each child holds a list
+
+
+def _read(elm, fields, prices=None):
+    """Reads children of element in a single pass, dispatching them on tag.
+
+    Replaces a `find` per field: every child is visited once
+    and children with tags of no field are skipped.
+
+    :param elm: element or its document
+    :type elm: lxml.etree._Element or lxml.etree._ElementTree
+    :param fields: fields by child tag, `(name, parse, mode)` tuples, where
+        `parse(child, prices)` returns the field value and mode is one of
+        `ONE`, `MANY`, `ALL`
+    :type fields: dict
+    :param prices: (optional) prices shared within response, see `parse_price`
+    :type prices: dict or None
+    :return: values of fields found, by field name
+    :rtype: dict
+    """
+    if isinstance(elm, etree._ElementTree):
+        elm = elm.getroot()
+    values = {}
+    for child in elm:
+        field = fields.get(child.tag)
+        if field is None:
+            continue
+        name, parse, mode = field
+        if mode == ONE:
+            if name not in values:
+                values[name] = parse(child, prices)
+        elif mode == MANY:
+            if name in values:
+                values[name].append(parse(child, prices))
+            else:
+                values[name] = [parse(child, prices)]
+        elif name in values:
+            values[name].extend(parse(child, prices))
+        else:
+            values[name] = list(parse(child, prices))
+    return values
+
+
+def _text(elm, prices=None):
+    return elm.text
+
+
+def _code(elm, prices=None):
+    return intern_text(elm.text)
+
+
+def _int(elm, prices=None):
+    return int(elm.text)
+
+
+def _float(elm, prices=None):
+    return float(elm.text)
+
+
+def _datetime(elm, prices=None):
+    return parse_datetime(elm.text)
+
+
+def _plain(parse):
+    """Adapts `parse(elm)` of a type without prices to `_read`."""
+    return lambda elm, prices=None: parse(elm)
+
+
+def _codes(tag):
+    """Returns parser of codes held by children with the tag."""
+    return lambda elm, prices=None: [
+        intern_text(child.text) for child in elm if child.tag == tag
+    ]
+
+
+def _each(tag, parse):
+    """Returns parser of list element, `parse(elm)` is applied
+    to its children with the tag."""
+    return lambda elm, prices=None: [parse(child) for child in elm if child.tag == tag]
 
 
 def is_cancel_success(resp):
@@ -47,38 +229,324 @@ def is_cancel_success(resp):
     return all([s == "Success" for s in resp.xpath(".//OperationStatus/text()")])
 
 
-def parse_air_shopping_response(resp):
+def parse_air_shopping_response(
+    resp, share_prices=False, lazy_offers=False, projection=None, pool=None,
+    top_k=None, top_key=None,
+):
     """Parse air shopping response.
 
     :param resp: text of Mixvel_AirShoppingRS
     :type resp: lxml.etree._Element
+    :param share_prices: (optional) build equal prices once and share them
+        between offers, shared prices must not be modified, defaults to False
+    :type share_prices: bool
+    :param lazy_offers: (optional) return `LazyOffer` objects, which parse
+        their fields on first access and keep the response tree meanwhile,
+        defaults to False
+    :type lazy_offers: bool
+    :param projection: (optional) fields of offers to parse, name of preset
+        in `PROJECTIONS` or set of field names, fields left out are set to
+        `UNLOADED` and their elements are not visited, defaults to all fields
+    :type projection: str or set[str] or None
+    :param pool: (optional) process pool parsing offers of large responses,
+        with at least `PARALLEL_MIN_OFFERS` offers, in chunks of
+        `PARALLEL_CHUNK_OFFERS`, e.g. `multiprocessing.Pool`; offers are
+        pickled back to this process, which costs about as much as parsing,
+        so it pays off on several free cores only, measure with
+        benchmarks/bench_parallel.py before passing one; prices are shared
+        within chunks only, lazy offers are parsed serially
+    :type pool: multiprocessing.pool.Pool or concurrent.futures.Executor or None
+    :param top_k: (optional) keep only that many offers with the least
+        `top_key`, in its order; an offer is parsed in full only if it
+        makes it, the pool is not used then; the response tree is already
+        in memory, so its size still grows with all offers, use `iter_offers`
+        to keep only the elements of the top offers
+    :type top_k: int or None
+    :param top_key: (optional) key of offer parsed with "summary" projection,
+        see `PROJECTIONS`, defaults to total amount read right from the element,
+        offers without price go last, offers in different currencies
+        raise ValueError
+    :type top_key: callable or None
     :rtype: AirShoppingResponse
     """
-    offer_elements = resp.findall("./Response/Offer")
-    if not offer_elements:
+    fields = _AIR_SHOPPING
+    if lazy_offers:
+        if projection is not None:
+            raise ValueError("Lazy offers parse fields on access, they take no projection")
+        fields = _LAZY_AIR_SHOPPING
+    elif projection is not None:
+        fields = _projected_air_shopping(projection)
+    response = resp.find("./Response")
+    if response is None:
         return AirShoppingResponse(offers=[], data_lists=DataLists())
-    offers = map(lambda offer: parse_offer(offer), offer_elements)
-    data_lists = parse_data_lists(resp.find("./Response/DataLists"))
-    return AirShoppingResponse(offers, data_lists)
-
-
-def parse_order_view_response(resp):
+    prices = {} if share_prices else None
+    offer_elms = []
+    if pool is not None and not lazy_offers and top_k is None:
+        offer_elms = response.findall("./Offer")
+    if top_k is not None:
+        values = _read(response, dict(fields, Offer=None), prices)
+        parse_offer_elm = fields["Offer"][1]
+        values["offers"] = [
+            parse_offer_elm(elm, prices) for elm in _top_offers(response, top_k, top_key)
+        ]
+    elif len(offer_elms) >= PARALLEL_MIN_OFFERS:
+        values = _read(response, dict(fields, Offer=None), prices)
+        values["offers"] = _parse_offers_in_pool(pool, offer_elms, share_prices, projection)
+    else:
+        values = _read(response, fields, prices)
+    offers = values.get("offers")
+    if not offers:
+        return AirShoppingResponse(offers=[], data_lists=DataLists())
+    return AirShoppingResponse(offers, values.get("data_lists"))
+
+
+def _top_offers(response, k, key=None):
+    """Returns `k` Offer elements with the least key."""
+    top = _TopOffers(k, key)
+    for elm in response.iterchildren("Offer"):
+        top.push(elm)
+    return top.elements()
+
+
+class _TopOffers:
+    def __init__(self, k, key=None):
+        """Bounded heap of Offer elements with the least keys,
+        ties are resolved by position in response.
+
+        :param k: max number of elements
+        :type k: int
+        :param key: (optional) key of offer parsed with "summary" projection,
+            defaults to total amount
+        :type key: callable or None
+        """
+        self.k = k
+        if key is None:
+            self.key = _TotalAmountKey()
+        else:
+            summary = _projected_air_shopping("summary")["Offer"][1]
+            self.key = lambda elm: key(summary(elm))
+        self.heap = []  # the greatest entry on top
+        self.count = 0
+
+    def push(self, elm):
+        """Ranks Offer element.
+
+        :type elm: lxml.etree._Element
+        :return: True if the element is kept, it may be dropped later
+        :rtype: bool
+        """
+        entry = _Ranked((self.key(elm), self.count), elm)
+        self.count += 1
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+            return True
+        if self.heap and entry.rank < self.heap[0].rank:
+            heapq.heapreplace(self.heap, entry)
+            return True
+        return False
+
+    def elements(self):
+        """Returns kept elements, the least key first.
+
+        :rtype: list[lxml.etree._Element]
+        """
+        return [entry.elm for entry in sorted(self.heap, reverse=True)]
+
+
+class _Ranked(object):
+    __slots__ = ("rank", "elm")
+
+    def __init__(self, rank, elm):
+        self.rank = rank
+        self.elm = elm
+
+    def __lt__(self, other):
+        return other.rank < self.rank  # reversed, heapq keeps the least on top
+
+
+class _TotalAmountKey:
+    def __init__(self):
+        """Key of Offer element by total amount, read without parsing the offer."""
+        self.cur_code = None
+
+    def __call__(self, elm):
+        total_amount = elm.find("./TotalPrice/TotalAmount")
+        if total_amount is None or not total_amount.text:
+            return 1, 0  # offers without price go last
+        amount = parse_amount(total_amount)
+        if self.cur_code is None:
+            self.cur_code = amount.cur_code
+        elif amount.cur_code != self.cur_code:
+            raise ValueError(
+                "Offers in {} and {} can't be ranked by total amount, pass top_key".format(
+                    self.cur_code, amount.cur_code
+                )
+            )
+        return 0, amount.amount
+
+
+def _parse_offers_in_pool(pool, elms, share_prices, projection):
+    """Parses offers in worker processes, returns them in order."""
+    chunks = []
+    for start in range(0, len(elms), PARALLEL_CHUNK_OFFERS):
+        content = b"".join(
+            etree.tostring(elm, with_tail=False)
+            for elm in elms[start:start + PARALLEL_CHUNK_OFFERS]
+        )
+        chunks.append((b"<Response>" + content + b"</Response>", share_prices, projection))
+    offers = []
+    for chunk in pool.map(_parse_offers, chunks):
+        offers.extend(chunk)
+    return offers
+
+
+def _parse_offers(chunk):
+    # runs in worker process
+    content, share_prices, projection = chunk
+    fields = _AIR_SHOPPING if projection is None else _projected_air_shopping(projection)
+    values = _read(etree.fromstring(content), fields, {} if share_prices else None)
+    return values.get("offers", [])
+
+
+def _project(fields, names):
+    """Returns fields with the names and names of the rest."""
+    unknown = set(names).difference(name for name, _, _ in fields.values())
+    if unknown:
+        raise ValueError("Unknown fields: {}".format(", ".join(sorted(unknown))))
+    projected = dict((tag, field) for tag, field in fields.items() if field[0] in names)
+    unloaded = tuple(field[0] for field in fields.values() if field[0] not in names)
+    return projected, unloaded
+
+
+def _projected_air_shopping(projection):
+    """Returns fields of AirShoppingRS `Response` read for projection."""
+    key = projection if isinstance(projection, string_types) else frozenset(projection)
+    fields = _projections.get(key)
+    if fields is not None:
+        return fields
+    names = projection
+    if isinstance(projection, string_types):
+        if projection not in PROJECTIONS:
+            raise ValueError("Unknown projection: {}".format(projection))
+        names = PROJECTIONS[projection]
+    if names is None:
+        fields = _AIR_SHOPPING
+    else:
+        offer_names = set(name.split(".", 1)[0] for name in names)
+        if "offer_items" in names:
+            item_names = set(name for name, _, _ in _OFFER_ITEM.values())
+        else:
+            item_names = set(
+                name.split(".", 1)[1] for name in names if name.startswith("offer_items.")
+            )
+        item_fields, item_unloaded = _project(_OFFER_ITEM, item_names)
+        offer_fields, offer_unloaded = _project(dict(_OFFER, OfferItem=(
+            "offer_items",
+            lambda elm, prices=None: _parse_offer_item(elm, prices, item_fields, item_unloaded),
+            MANY,
+        )), offer_names)
+        fields = dict(_AIR_SHOPPING, Offer=(
+            "offers",
+            lambda elm, prices=None: _parse_offer(elm, prices, offer_fields, offer_unloaded),
+            MANY,
+        ))
+    _projections[key] = fields
+    return fields
+
+
+def iter_offers(source, on_data_lists=None, share_prices=False, top_k=None, top_key=None):
+    """Parse air shopping response incrementally, yielding offers
+    as soon as their elements are complete.
+
+    Parsed elements are dropped from the tree, so memory use doesn't grow
+    with the number of offers. With `top_k`, elements of offers which may
+    make it are kept until the response ends, the rest are dropped as soon
+    as their keys are read.
+
+    :param source: raw Mixvel_AirShoppingRS envelope, bytes, file-like object
+        or iterable of chunks, e.g. `requests.Response.iter_content()`
+    :type source: bytes or file or iterable[bytes]
+    :param on_data_lists: (optional) called with `DataLists` once they are
+        parsed, MixVel sends them before offers
+    :type on_data_lists: callable or None
+    :param share_prices: (optional) build equal prices once and share them
+        between offers, shared prices must not be modified, defaults to False
+    :type share_prices: bool
+    :param top_k: (optional) yield only that many offers with the least
+        `top_key`, in its order, once the response ends
+    :type top_k: int or None
+    :param top_key: (optional) key of offer, see `parse_air_shopping_response`
+    :type top_key: callable or None
+    :raises MixvelError: if the response is an error
+    :rtype: collections.Iterator[Offer]
+    """
+    parser = etree.XMLPullParser(events=("end",), tag=("Offer", "DataLists", "Error"))
+    prices = {} if share_prices else None
+    top = _TopOffers(top_k, top_key) if top_k is not None else None
+    for chunk in _chunks(source):
+        parser.feed(chunk)
+        for offer in _read_offers(parser, on_data_lists, prices, top):
+            yield offer
+    parser.close()
+    for offer in _read_offers(parser, on_data_lists, prices, top):
+        yield offer
+    if top is not None:
+        for elm in top.elements():
+            yield parse_offer(elm, prices)
+
+
+def _chunks(source):
+    if isinstance(source, bytes):
+        # libxml2 refuses to take a large document in a single feed
+        return (
+            source[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(source), STREAM_CHUNK_SIZE)
+        )
+    if hasattr(source, "read"):
+        return iter(lambda: source.read(STREAM_CHUNK_SIZE), b"")
+    return source
+
+
+def _read_offers(parser, on_data_lists, prices, top=None):
+    for _, elm in parser.read_events():
+        parent = elm.getparent()
+        if elm.tag == "Error":
+            # MixVel puts Error right into the message root, see `_check_response`
+            app_data = parent.getparent() if parent is not None else None
+            if app_data is not None and app_data.tag == "AppData":
+                raise parse_error(elm)
+            continue
+        if parent is None or parent.tag != "Response":
+            continue
+        if elm.tag == "Offer":
+            if top is None:
+                yield parse_offer(elm, prices)
+            elif top.push(elm):
+                parent.remove(elm)  # kept whole until the response ends
+                continue
+        elif on_data_lists is not None:
+            on_data_lists(parse_data_lists(elm))
+        elm.clear()
+        while elm.getprevious() is not None:
+            del parent[0]
+
+
+def parse_order_view_response(resp, share_prices=False):
     """Parse order view response.
 
     :param resp: text of Mixvel_OrderCancelRS
     :type resp: lxml.etree._Element
+    :param share_prices: (optional) build equal prices once and share them
+        between order items, shared prices must not be modified, defaults to False
+    :type share_prices: bool
     :rtype: OrderViewResponse
     """
-    mix_order = parse_mix_order(resp.find("./Response/MixOrder"))
-    data_lists = parse_data_lists(resp.find("./Response/DataLists"))
-    ticket_doc_info_nodes = resp.findall("./Response/TicketDocInfo")
-    ticket_doc_info = (
-        map(lambda doc: parse_ticket_doc_info(doc), ticket_doc_info_nodes)
-        if ticket_doc_info_nodes
-        else None
-    )
+    values = _read(resp.find("./Response"), _ORDER_VIEW, {} if share_prices else None)
 
-    return OrderViewResponse(mix_order, data_lists, ticket_doc_info=ticket_doc_info)
+    return OrderViewResponse(
+        values.get("mix_order"),
+        values.get("data_lists"),
+        ticket_doc_info=values.get("ticket_doc_info"),
+    )
 
 
 def parse_amount(elm):
@@ -88,7 +556,7 @@ def parse_amount(elm):
     :type elm: lxml.etree._Element
     :rtype: Amount
     """
-    return Amount(int(elm.text.replace(".", "")), elm.get("CurCode"))
+    return Amount(int(elm.text.replace(".", "")), intern_text(elm.get("CurCode")))
 
 
 def parse_booking(elm):
@@ -98,55 +566,30 @@ def parse_booking(elm):
     :type elm: lxml.etree._Element
     :rtype: Booking
     """
-    booking_id = elm.find("./BookingID").text
-    entity = (
-        parse_booking_entity(elm.find("./BookingEntity"))
-        if elm.find("./BookingEntity") is not None
-        else None
-    )
-    type_code = (
-        elm.find("./BookingRefTypeCode").text
-        if elm.find("./BookingRefTypeCode") is not None
-        else None
+    values = _read(elm, _BOOKING)
+    return Booking(
+        values.get("booking_id"), entity=values.get("entity"), type_code=values.get("type_code")
     )
-    return Booking(booking_id, entity=entity, type_code=type_code)
 
 
 def parse_booking_entity(elm):
-    carrier = (
-        parse_carrier(elm.find("./Carrier"))
-        if elm.find("./Carrier") is not None
-        else None
-    )
-    return BookingEntity(carrier=carrier)
+    return BookingEntity(carrier=_read(elm, _BOOKING_ENTITY).get("carrier"))
 
 
 def parse_carrier(elm):
-    airline_desig_code = (
-        elm.find("./AirlineDesigCode").text
-        if elm.find("./AirlineDesigCode") is not None
-        else None
-    )
+    values = _read(elm, _CARRIER)
     mixvel_airline_id = None  # TODO: implement parser
     return Carrier(
-        airline_desig_code=airline_desig_code, mixvel_airline_id=mixvel_airline_id
+        airline_desig_code=values.get("airline_desig_code"), mixvel_airline_id=mixvel_airline_id
     )
 
 
 def parse_coupon(elm):
-    coupon_number = float(elm.find("./CouponNumber").text)
-    fare_basis_code = (
-        elm.find("./FareBasisCode").text
-        if elm.find("./FareBasisCode") is not None
-        else None
-    )
-    pax_segment_ref_ids = map(
-        lambda ref_id: ref_id.text, elm.findall("./SoldAirlineInfo/PaxSegmentRefID")
-    )
+    values = _read(elm, _COUPON)
     return Coupon(
-        coupon_number,
-        fare_basis_code=fare_basis_code,
-        pax_segment_ref_ids=pax_segment_ref_ids,
+        values.get("coupon_number"),
+        fare_basis_code=values.get("fare_basis_code"),
+        pax_segment_ref_ids=values.get("pax_segment_ref_ids", []),
     )
 
 
@@ -157,25 +600,13 @@ def parse_data_lists(elm):
     :type elm: lxml.etree._Element
     :rtype: DataLists
     """
-    origin_dest_list = map(
-        lambda elm: parse_origin_dest(elm), elm.findall("./OriginDestList/OriginDest")
-    )
-    pax_journey_list = map(
-        lambda elm: parse_pax_journey(elm), elm.findall("./PaxJourneyList/PaxJourney")
-    )
-    pax_segment_list = map(
-        lambda elm: parse_pax_segment(elm), elm.findall("./PaxSegmentList/PaxSegment")
-    )
-    validating_party_list = map(
-        lambda validating_party: parse_validating_party(validating_party),
-        elm.findall("./ValidatingPartyList/ValidatingParty"),
-    )
+    values = _read(elm, _DATA_LISTS)
 
     return DataLists(
-        origin_dest_list=origin_dest_list,
-        pax_journey_list=pax_journey_list,
-        pax_segment_list=pax_segment_list,
-        validating_party_list=validating_party_list,
+        origin_dest_list=values.get("origin_dest_list", []),
+        pax_journey_list=values.get("pax_journey_list", []),
+        pax_segment_list=values.get("pax_segment_list", []),
+        validating_party_list=values.get("validating_party_list", []),
     )
 
 
@@ -186,140 +617,157 @@ def parse_dated_marketing_segment(elm):
     :type elm: lxml.etree._Element
     :rtype: DatedMarketingSegment
     """
-    carrier_code = elm.find("./CarrierDesigCode").text
-    flight_number = elm.find("./MarketingCarrierFlightNumberText").text
+    values = _read(elm, _DATED_MARKETING_SEGMENT)
+
+    return DatedMarketingSegment(values.get("carrier_code"), values.get("flight_number"))
+
 
-    return DatedMarketingSegment(carrier_code, flight_number)
+def parse_error(elm):
+    """Parses Error of MixVel message.
 
+    :param elm: Error element
+    :type elm: lxml.etree._Element
+    :return: exception to raise
+    :rtype: MixvelError
+    """
+    code = elm.findtext("./Code") or "UNDEFINED"
+    return error_class(code)(code, elm.findtext("./ErrorType"), elm.findtext("./DescText"))
 
-def parse_fare_component(elm):
+
+def parse_fare_component(elm, prices=None):
     """Parse FareComponentType.
 
     :param elm: FareComponentType element
     :type elm: lxml.etree._Element
+    :param prices: (optional) prices shared within response, see `parse_price`
+    :type prices: dict or None
     :rtype: FareComponent
     """
-    fare_basis_code = elm.find("./FareBasisCode").text
-    rbd = parse_rbd_avail(elm.find("./RBD"))
-    price = parse_price(elm.find("./Price"))
-    pax_segment_ref_id = elm.find("./PaxSegmentRefID").text
+    values = _read(elm, _FARE_COMPONENT, prices)
 
-    return FareComponent(fare_basis_code, rbd, price, pax_segment_ref_id)
+    return FareComponent(
+        values.get("fare_basis_code"),
+        values.get("rbd"),
+        values.get("price"),
+        values.get("pax_segment_ref_id"),
+    )
 
 
-def parse_fare_detail(elm):
+def parse_fare_detail(elm, prices=None):
     """Parse FareDetailType.
 
     :param elm: FareDetailType element
     :type elm: lxml.etree._Element
+    :param prices: (optional) prices shared within response, see `parse_price`
+    :type prices: dict or None
     :rtype: FareDetail
     """
-    fare_components = map(
-        lambda fc: parse_fare_component(fc), elm.findall("./FareComponent")
-    )
-    pax_ref_id = elm.find("./PaxRefID").text
+    values = _read(elm, _FARE_DETAIL, prices)
 
-    return FareDetail(fare_components, pax_ref_id)
+    return FareDetail(values.get("fare_components", []), values.get("pax_ref_id"))
 
 
-def parse_mix_order(elm):
+def parse_mix_order(elm, prices=None):
     """Parses MixOrderType.
 
     :param elm: MixOrderType element
     :type elm: lxml.etree._Element
+    :param prices: (optional) prices shared within response, see `parse_price`
+    :type prices: dict or None
     :rtype: MixOrder
     """
-    mix_order_id = elm.find("./MixOrderID").text
-    orders = []
-    for order_node in elm.findall("./Order"):
-        orders.append(parse_order(order_node))
-    total_amount = parse_amount(elm.find("./TotalAmount"))
+    values = _read(elm, _MIX_ORDER, prices)
 
-    return MixOrder(mix_order_id, orders, total_amount)
+    return MixOrder(
+        values.get("mix_order_id"), values.get("orders", []), values.get("total_amount")
+    )
 
 
-def parse_offer(elm):
+def parse_offer(elm, prices=None):
     """Parse OfferType.
 
     :param elm: OfferType element
     :type elm: lxml.etree._Element
+    :param prices: (optional) prices shared within response, see `parse_price`
+    :type prices: dict or None
     :rtype: OfferItem
     """
-    offer_id = elm.find("./OfferID").text
-    offer_items = map(
-        lambda offer_item: parse_offer_item(offer_item), elm.findall("./OfferItem")
-    )
-    owner_code = elm.find("./OwnerCode").text
-    timelimit = elm.find("./OfferExpirationTimeLimitDateTime").text
-    timelimit = timelimit.split(".")[0].rstrip("Z")
-    timelimit = datetime.datetime.strptime(timelimit, "%Y-%m-%dT%H:%M:%S")
-    ticket_docs_count = (
-        int(elm.find("./TicketDocsCount").text)
-        if elm.find("./TicketDocsCount") is not None
-        else None
-    )
-    total_price = (
-        parse_price(elm.find("./TotalPrice"))
-        if elm.find("./TotalPrice") is not None
-        else None
-    )
+    return _parse_offer(elm, prices, _OFFER)
+
+
+def _parse_offer(elm, prices, fields, unloaded=()):
+    values = _read(elm, fields, prices)
+    for name in unloaded:
+        values[name] = UNLOADED
 
     return Offer(
-        offer_id,
-        offer_items,
-        owner_code,
-        timelimit,
-        ticket_docs_count=ticket_docs_count,
-        total_price=total_price,
+        values.get("offer_id"),
+        values.get("offer_items", []),
+        values.get("owner_code"),
+        values.get("offer_expiration_timelimit_datetime"),
+        ticket_docs_count=values.get("ticket_docs_count"),
+        total_price=values.get("total_price"),
     )
 
 
-def parse_offer_item(elm):
+def parse_offer_item(elm, prices=None):
     """Parse OfferItemType.
 
     :param elm: OfferItemType element
     :type elm: lxml.etree._Element
+    :param prices: (optional) prices shared within response, see `parse_price`
+    :type prices: dict or None
     :rtype: OfferItem
     """
-    offer_item_id = elm.find("./OfferItemID").text
-    price = parse_price(elm.find("./Price"))
-    services = map(lambda service: parse_service(service), elm.findall("./Service"))
-    fare_details = map(
-        lambda fare_detail: parse_fare_detail(fare_detail), elm.findall("./FareDetail")
-    )
+    return _parse_offer_item(elm, prices, _OFFER_ITEM)
 
-    return OfferItem(offer_item_id, price, services, fare_details=fare_details)
 
+def _parse_offer_item(elm, prices, fields, unloaded=()):
+    values = _read(elm, fields, prices)
+    for name in unloaded:
+        values[name] = UNLOADED
 
-def parse_order(elm):
+    return OfferItem(
+        values.get("offer_item_id"),
+        values.get("price"),
+        values.get("services", []),
+        fare_details=values.get("fare_details", []),
+    )
+
+
+def parse_order(elm, prices=None):
     """Parses OrderType.
 
     :param elm: OrderType element
     :type elm: lxml.etree._Element
+    :param prices: (optional) prices shared within response, see `parse_price`
+    :type prices: dict or None
     :rtype: Order
     """
-    order_id = elm.find("./OrderID").text
-    order_items = map(lambda node: parse_order_item(node), elm.findall("./OrderItem"))
-    booking_refs = map(lambda node: parse_booking(node), elm.findall("./BookingRef"))
-    total_price = parse_price(elm.find("./TotalPrice"))
+    values = _read(elm, _ORDER, prices)
 
-    return Order(order_id, booking_refs, order_items, total_price)
+    return Order(
+        values.get("order_id"),
+        values.get("booking_refs", []),
+        values.get("order_items", []),
+        values.get("total_price"),
+    )
 
 
-def parse_order_item(elm):
+def parse_order_item(elm, prices=None):
     """Parses OrderItemType.
 
     :param elm: OrderItemType element
     :type elm: lxml.etree._Element
+    :param prices: (optional) prices shared within response, see `parse_price`
+    :type prices: dict or None
     :rtype: OrderItem
     """
-    order_item_id = elm.find("./OrderItemID").text
-    fare_details = []
-    for fare_detail_node in elm.findall("./FareDetail"):
-        fare_details.append(parse_fare_detail(fare_detail_node))
-    price = parse_price(elm.find("./Price"))
+    values = _read(elm, _ORDER_ITEM, prices)
 
-    return OrderItem(order_item_id, fare_details, price)
+    return OrderItem(
+        values.get("order_item_id"), values.get("fare_details", []), values.get("price")
+    )
 
 
 def parse_origin_dest(elm):
@@ -329,22 +777,13 @@ def parse_origin_dest(elm):
     :type elm: lxml.etree._Element
     :rtype: OriginDest
     """
-    origin_code = elm.find("./OriginCode").text
-    dest_code = elm.find("./DestCode").text
-    origin_dest_id = (
-        elm.find("./OriginDestID").text
-        if elm.find("./OriginDestID") is not None
-        else None
-    )
-    pax_journey_ref_ids = map(
-        lambda ref_id: ref_id.text, elm.findall("./PaxJourneyRefID")
-    )
+    values = _read(elm, _ORIGIN_DEST)
 
     return OriginDest(
-        origin_code,
-        dest_code,
-        origin_dest_id=origin_dest_id,
-        pax_journey_ref_ids=pax_journey_ref_ids,
+        values.get("origin_code"),
+        values.get("dest_code"),
+        origin_dest_id=values.get("origin_dest_id"),
+        pax_journey_ref_ids=values.get("pax_journey_ref_ids", []),
     )
 
 
@@ -355,12 +794,9 @@ def parse_pax_journey(elm):
     :type elm: lxml.etree._Element
     :rtype: PaxJourney
     """
-    pax_journey_id = elm.find("./PaxJourneyID").text
-    pax_segment_ref_ids = map(
-        lambda ref_id: ref_id.text, elm.findall("./PaxSegmentRefID")
-    )
+    values = _read(elm, _PAX_JOURNEY)
 
-    return PaxJourney(pax_journey_id, pax_segment_ref_ids)
+    return PaxJourney(values.get("pax_journey_id"), values.get("pax_segment_ref_ids", []))
 
 
 def parse_pax_segment(elm):
@@ -370,36 +806,43 @@ def parse_pax_segment(elm):
     :type elm: lxml.etree._Element
     :rtype: PaxSegment
     """
-    pax_segment_id = elm.find("./PaxSegmentID").text
-    dep = parse_transport_dep_arrival(elm.find("./Dep"))
-    arrival = parse_transport_dep_arrival(elm.find("./Arrival"))
-    marketing_carrier_info = parse_dated_marketing_segment(
-        elm.find("./MarketingCarrierInfo")
-    )
-    duration = (
-        elm.find("./Duration").text if elm.find("./Duration") is not None else None
-    )
+    values = _read(elm, _PAX_SEGMENT)
 
     return PaxSegment(
-        pax_segment_id, dep, arrival, marketing_carrier_info, duration=duration
+        values.get("pax_segment_id"),
+        values.get("dep"),
+        values.get("arrival"),
+        values.get("marketing_carrier_info"),
+        duration=values.get("duration"),
     )
 
 
-def parse_price(elm):
+def parse_price(elm, prices=None):
     """Parse PriceType.
 
     :param elm: PriceType element
     :type elm: lxml.etree._Element
+    :param prices: (optional) prices already built for the response, keyed
+        by their markup; equal prices are built once and shared
+    :type prices: dict or None
     :rtype: Price
     """
-    tax_summary = (
-        parse_tax_summary(elm.find("./TaxSummary"))
-        if elm.find("./TaxSummary") is not None
-        else TaxSummary([])
-    )
-    total_amount = parse_amount(elm.find("./TotalAmount"))
+    if prices is None:
+        return _parse_price(elm)
+    key = etree.tostring(elm, with_tail=False)
+    price = prices.get(key)
+    if price is None:
+        price = prices[key] = _parse_price(elm)
+    return price
 
-    return Price(tax_summary, total_amount)
+
+def _parse_price(elm):
+    values = _read(elm, _PRICE)
+    tax_summary = values.get("tax_summary")
+    if tax_summary is None:
+        tax_summary = TaxSummary([])
+
+    return Price(tax_summary, values.get("total_amount"))
 
 
 def parse_rbd_avail(elm):
@@ -409,14 +852,9 @@ def parse_rbd_avail(elm):
     :type elm: lxml.etree._Element
     :rtype: RbdAvail
     """
-    rbd_code = elm.find("./RBD_Code").text
-    availability = (
-        int(elm.find("Availability").text)
-        if elm.find("Availability") is not None
-        else None
-    )
+    values = _read(elm, _RBD_AVAIL)
 
-    return RbdAvail(rbd_code, availability=availability)
+    return RbdAvail(values.get("rbd_code"), availability=values.get("availability"))
 
 
 def parse_service(elm):
@@ -426,22 +864,13 @@ def parse_service(elm):
     :type elm: lxml.etree._Element
     :rtype: Service
     """
-    service_id = elm.find("./ServiceID").text
-    pax_ref_ids = map(lambda ref_id: ref_id.text, elm.findall("./PaxRefID"))
-    service_associations = parse_service_offer_associations(
-        elm.find("./ServiceAssociations")
-    )
-    validating_party_ref_id = (
-        elm.find("./ValidatingPartyRefID").text
-        if elm.find("./ValidatingPartyRefID") is not None
-        else None
-    )
+    values = _read(elm, _SERVICE)
 
     return Service(
-        service_id,
-        pax_ref_ids,
-        service_associations,
-        validating_party_ref_id=validating_party_ref_id,
+        values.get("service_id"),
+        values.get("pax_ref_ids", []),
+        values.get("service_associations"),
+        validating_party_ref_id=values.get("validating_party_ref_id"),
         validating_party_type=None,
         pax_types=None,
     )
@@ -454,16 +883,11 @@ def parse_service_offer_associations(elm):
     :type elm: lxml.etree._Element
     :rtype: ServiceOfferAssociations
     """
-    pax_journey_ref_ids = map(
-        lambda ref_id: ref_id.text, elm.findall("./PaxJourneyRef/PaxJourneyRefID")
-    )
-    pax_segment_ref_ids = map(
-        lambda ref_id: ref_id.text, elm.findall("./PaxSegmentRef/PaxSegmentRefID")
-    )
+    values = _read(elm, _SERVICE_OFFER_ASSOCIATIONS)
 
     return ServiceOfferAssociations(
-        pax_journey_ref_ids=pax_journey_ref_ids,
-        pax_segment_ref_ids=pax_segment_ref_ids,
+        pax_journey_ref_ids=values.get("pax_journey_ref_ids", []),
+        pax_segment_ref_ids=values.get("pax_segment_ref_ids", []),
     )
 
 
@@ -474,7 +898,8 @@ def parse_tax(elm):
     :type elm: lxml.etree._Element
     :rtype: Tax
     """
-    return Tax(parse_amount(elm.find("./Amount")), elm.find("./TaxCode").text)
+    values = _read(elm, _TAX)
+    return Tax(values.get("amount"), values.get("tax_code"))
 
 
 def parse_tax_summary(elm):
@@ -484,26 +909,21 @@ def parse_tax_summary(elm):
     :type elm: lxml.etree._Element
     :rtype: TaxSummary
     """
-    taxes = map(lambda tax: parse_tax(tax), elm.findall("./Tax"))
-    total_tax_amount = (
-        parse_amount(elm.find("./TotalTaxAmount"))
-        if elm.find("./TotalTaxAmount") is not None
-        else None
-    )
+    values = _read(elm, _TAX_SUMMARY)
 
-    return TaxSummary(taxes, total_tax_amount=total_tax_amount)
+    return TaxSummary(
+        values.get("taxes", []), total_tax_amount=values.get("total_tax_amount")
+    )
 
 
 def parse_ticket(elm):
-    coupons = map(lambda coupon: parse_coupon(coupon), elm.findall("./Coupon"))
-    ticket_number = elm.find("./TicketNumber").text
-    return Ticket(coupons, ticket_number)
+    values = _read(elm, _TICKET)
+    return Ticket(values.get("coupons", []), values.get("ticket_number"))
 
 
 def parse_ticket_doc_info(elm):
-    pax_ref_id = elm.find("./PaxRefID").text
-    tickets = map(lambda ticket: parse_ticket(ticket), elm.findall("./Ticket"))
-    return TicketDocInfo(pax_ref_id, tickets)
+    values = _read(elm, _TICKET_DOC_INFO)
+    return TicketDocInfo(values.get("pax_ref_id"), values.get("tickets", []))
 
 
 def parse_transport_dep_arrival(elm):
@@ -513,10 +933,8 @@ def parse_transport_dep_arrival(elm):
     :type elm: lxml.etree._Element
     :rtype: TransportDepArrival
     """
-    iata_location_code = elm.find("./IATA_LocationCode").text
-    scheduled_date_time = elm.find("./ScheduledDateTime").text
-    scheduled_date_time = datetime.datetime.strptime(scheduled_date_time, "%Y-%m-%dT%H:%M:%S")
-    return TransportDepArrival(iata_location_code, scheduled_date_time)
+    values = _read(elm, _TRANSPORT_DEP_ARRIVAL)
+    return TransportDepArrival(values.get("iata_location_code"), values.get("scheduled_date_time"))
 
 
 def parse_validating_party(elm):
@@ -526,7 +944,251 @@ def parse_validating_party(elm):
     :type elm: lxml.etree._Element
     :rtype: ValidatingParty
     """
-    validating_party_id = elm.find("./ValidatingPartyID").text
-    validating_party_code = elm.find("./ValidatingPartyCode").text
+    values = _read(elm, _VALIDATING_PARTY)
+
+    return ValidatingParty(values.get("validating_party_id"), values.get("validating_party_code"))
+
+
+# Fields of types by child tag: (name, parse, mode), see `_read`.
+# Parsers above look them up at call time, so the tables may follow them.
+
+_AIR_SHOPPING = {
+    "Offer": ("offers", parse_offer, MANY),
+    "DataLists": ("data_lists", _plain(parse_data_lists), ONE),
+}
+_ORDER_VIEW = {
+    "MixOrder": ("mix_order", parse_mix_order, ONE),
+    "DataLists": ("data_lists", _plain(parse_data_lists), ONE),
+    "TicketDocInfo": ("ticket_doc_info", _plain(parse_ticket_doc_info), MANY),
+}
+_BOOKING = {
+    "BookingID": ("booking_id", _text, ONE),
+    "BookingEntity": ("entity", _plain(parse_booking_entity), ONE),
+    "BookingRefTypeCode": ("type_code", _code, ONE),
+}
+_BOOKING_ENTITY = {
+    "Carrier": ("carrier", _plain(parse_carrier), ONE),
+}
+_CARRIER = {
+    "AirlineDesigCode": ("airline_desig_code", _code, ONE),
+}
+_COUPON = {
+    "CouponNumber": ("coupon_number", _float, ONE),
+    "FareBasisCode": ("fare_basis_code", _code, ONE),
+    "SoldAirlineInfo": ("pax_segment_ref_ids", _codes("PaxSegmentRefID"), ALL),
+}
+_DATA_LISTS = {
+    "OriginDestList": ("origin_dest_list", _each("OriginDest", parse_origin_dest), ALL),
+    "PaxJourneyList": ("pax_journey_list", _each("PaxJourney", parse_pax_journey), ALL),
+    "PaxSegmentList": ("pax_segment_list", _each("PaxSegment", parse_pax_segment), ALL),
+    "ValidatingPartyList": (
+        "validating_party_list", _each("ValidatingParty", parse_validating_party), ALL
+    ),
+}
+_DATED_MARKETING_SEGMENT = {
+    "CarrierDesigCode": ("carrier_code", _code, ONE),
+    "MarketingCarrierFlightNumberText": ("flight_number", _text, ONE),
+}
+_FARE_COMPONENT = {
+    "FareBasisCode": ("fare_basis_code", _code, ONE),
+    "RBD": ("rbd", _plain(parse_rbd_avail), ONE),
+    "Price": ("price", parse_price, ONE),
+    "PaxSegmentRefID": ("pax_segment_ref_id", _code, ONE),
+}
+_FARE_DETAIL = {
+    "FareComponent": ("fare_components", parse_fare_component, MANY),
+    "PaxRefID": ("pax_ref_id", _code, ONE),
+}
+_MIX_ORDER = {
+    "MixOrderID": ("mix_order_id", _text, ONE),
+    "Order": ("orders", parse_order, MANY),
+    "TotalAmount": ("total_amount", _plain(parse_amount), ONE),
+}
+_OFFER = {
+    "OfferID": ("offer_id", _text, ONE),
+    "OfferItem": ("offer_items", parse_offer_item, MANY),
+    "OwnerCode": ("owner_code", _code, ONE),
+    "OfferExpirationTimeLimitDateTime": (
+        "offer_expiration_timelimit_datetime", _datetime, ONE
+    ),
+    "TicketDocsCount": ("ticket_docs_count", _int, ONE),
+    "TotalPrice": ("total_price", parse_price, ONE),
+}
+_OFFER_ITEM = {
+    "OfferItemID": ("offer_item_id", _text, ONE),
+    "Price": ("price", parse_price, ONE),
+    "Service": ("services", _plain(parse_service), MANY),
+    "FareDetail": ("fare_details", parse_fare_detail, MANY),
+}
+_ORDER = {
+    "OrderID": ("order_id", _text, ONE),
+    "OrderItem": ("order_items", parse_order_item, MANY),
+    "BookingRef": ("booking_refs", _plain(parse_booking), MANY),
+    "TotalPrice": ("total_price", parse_price, ONE),
+}
+_ORDER_ITEM = {
+    "OrderItemID": ("order_item_id", _text, ONE),
+    "FareDetail": ("fare_details", parse_fare_detail, MANY),
+    "Price": ("price", parse_price, ONE),
+}
+_ORIGIN_DEST = {
+    "OriginCode": ("origin_code", _code, ONE),
+    "DestCode": ("dest_code", _code, ONE),
+    "OriginDestID": ("origin_dest_id", _text, ONE),
+    "PaxJourneyRefID": ("pax_journey_ref_ids", _code, MANY),
+}
+_PAX_JOURNEY = {
+    "PaxJourneyID": ("pax_journey_id", _text, ONE),
+    "PaxSegmentRefID": ("pax_segment_ref_ids", _code, MANY),
+}
+_PAX_SEGMENT = {
+    "PaxSegmentID": ("pax_segment_id", _text, ONE),
+    "Dep": ("dep", _plain(parse_transport_dep_arrival), ONE),
+    "Arrival": ("arrival", _plain(parse_transport_dep_arrival), ONE),
+    "MarketingCarrierInfo": (
+        "marketing_carrier_info", _plain(parse_dated_marketing_segment), ONE
+    ),
+    "Duration": ("duration", _text, ONE),
+}
+_PRICE = {
+    "TaxSummary": ("tax_summary", _plain(parse_tax_summary), ONE),
+    "TotalAmount": ("total_amount", _plain(parse_amount), ONE),
+}
+_RBD_AVAIL = {
+    "RBD_Code": ("rbd_code", _code, ONE),
+    "Availability": ("availability", _int, ONE),
+}
+_SERVICE = {
+    "ServiceID": ("service_id", _text, ONE),
+    "PaxRefID": ("pax_ref_ids", _code, MANY),
+    "ServiceAssociations": (
+        "service_associations", _plain(parse_service_offer_associations), ONE
+    ),
+    "ValidatingPartyRefID": ("validating_party_ref_id", _code, ONE),
+}
+_SERVICE_OFFER_ASSOCIATIONS = {
+    "PaxJourneyRef": ("pax_journey_ref_ids", _codes("PaxJourneyRefID"), ALL),
+    "PaxSegmentRef": ("pax_segment_ref_ids", _codes("PaxSegmentRefID"), ALL),
+}
+_TAX = {
+    "Amount": ("amount", _plain(parse_amount), ONE),
+    "TaxCode": ("tax_code", _code, ONE),
+}
+_TAX_SUMMARY = {
+    "Tax": ("taxes", _plain(parse_tax), MANY),
+    "TotalTaxAmount": ("total_tax_amount", _plain(parse_amount), ONE),
+}
+_TICKET = {
+    "Coupon": ("coupons", _plain(parse_coupon), MANY),
+    "TicketNumber": ("ticket_number", _text, ONE),
+}
+_TICKET_DOC_INFO = {
+    "PaxRefID": ("pax_ref_id", _text, ONE),
+    "Ticket": ("tickets", _plain(parse_ticket), MANY),
+}
+_TRANSPORT_DEP_ARRIVAL = {
+    "IATA_LocationCode": ("iata_location_code", _code, ONE),
+    "ScheduledDateTime": ("scheduled_date_time", _datetime, ONE),
+}
+_VALIDATING_PARTY = {
+    "ValidatingPartyID": ("validating_party_id", _text, ONE),
+    "ValidatingPartyCode": ("validating_party_code", _code, ONE),
+}
+
+
+class _Lazy(object):
+    """Field of lazy model, parsed from child elements with the tag
+    on first access and kept in the slot of the base model."""
+
+    def __init__(self, slot, tag, parse, mode=ONE):
+        self.slot = slot
+        self.fields = {tag: (None, parse, mode)}
+        self.mode = mode
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        try:
+            return self.slot.__get__(obj, cls)
+        except AttributeError:  # not parsed yet
+            pass
+        value = _read(obj._elm, self.fields, obj._prices).get(None)
+        if value is None and self.mode != ONE:
+            value = []
+        self.slot.__set__(obj, value)
+        return value
+
+    def __set__(self, obj, value):
+        self.slot.__set__(obj, value)
+
+
+class LazyOfferItem(OfferItem):
+    """Offer item backed by its element, fields are parsed on first access.
+
+    Compares, hashes and pickles as `OfferItem`.
+    """
+
+    __slots__ = ("_elm", "_prices")
 
-    return ValidatingParty(validating_party_id, validating_party_code)
+    offer_item_id = _Lazy(OfferItem.offer_item_id, "OfferItemID", _text)
+    price = _Lazy(OfferItem.price, "Price", parse_price)
+    services = _Lazy(OfferItem.services, "Service", _plain(parse_service), MANY)
+    fare_details = _Lazy(OfferItem.fare_details, "FareDetail", parse_fare_detail, MANY)
+
+    def __init__(self, elm, prices=None):
+        """
+        :param elm: OfferItemType element
+        :type elm: lxml.etree._Element
+        :param prices: (optional) prices shared within response, see `parse_price`
+        :type prices: dict or None
+        """
+        self._elm = elm
+        self._prices = prices
+
+    @classmethod
+    def _model(cls):
+        return OfferItem
+
+    def __reduce__(self):
+        return OfferItem, self._values()
+
+
+class LazyOffer(Offer):
+    """Offer backed by its element, fields are parsed on first access.
+
+    Compares, hashes and pickles as `Offer`.
+    """
+
+    __slots__ = ("_elm", "_prices")
+
+    offer_id = _Lazy(Offer.offer_id, "OfferID", _text)
+    offer_items = _Lazy(Offer.offer_items, "OfferItem", LazyOfferItem, MANY)
+    owner_code = _Lazy(Offer.owner_code, "OwnerCode", _code)
+    offer_expiration_timelimit_datetime = _Lazy(
+        Offer.offer_expiration_timelimit_datetime, "OfferExpirationTimeLimitDateTime", _datetime
+    )
+    ticket_docs_count = _Lazy(Offer.ticket_docs_count, "TicketDocsCount", _int)
+    total_price = _Lazy(Offer.total_price, "TotalPrice", parse_price)
+
+    def __init__(self, elm, prices=None):
+        """
+        :param elm: OfferType element
+        :type elm: lxml.etree._Element
+        :param prices: (optional) prices shared within response, see `parse_price`
+        :type prices: dict or None
+        """
+        self._elm = elm
+        self._prices = prices
+
+    @classmethod
+    def _model(cls):
+        return Offer
+
+    def __reduce__(self):
+        return Offer, self._values()
+
+
+_LAZY_AIR_SHOPPING = {
+    "Offer": ("offers", LazyOffer, MANY),
+    "DataLists": ("data_lists", _plain(parse_data_lists), ONE),
+}
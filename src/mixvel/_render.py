@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""
+mixvel._render
+~~~~~~~~~~~~~~
+Provides internal functions for rendering MixVel API requests.
+
+Templates are compiled once per process and shared by all clients.
+Set `MIXVEL_WARM_UP_TEMPLATES=1` to compile them eagerly at import.
+"""
+
+import os
+
+from jinja2 import Environment, FileSystemLoader
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+# templates are shipped with the package and never change at runtime,
+# so there is no need to stat them on every request
+template_env = Environment(
+    loader=FileSystemLoader(os.path.join(here, "templates")),
+    auto_reload=False,
+    cache_size=-1,
+)
+_templates = {}
+
+
+def get_template(name):
+    """Returns compiled request template.
+
+    :param name: file name of request template
+    :type name: str
+    :rtype: jinja2.Template
+    """
+    template = _templates.get(name)
+    if template is None:
+        template = template_env.get_template(name)
+        _templates[name] = template
+    return template
+
+
+def render(name, context):
+    """Renders request template.
+
+    :param name: file name of request template
+    :type name: str
+    :param context: values for request template rendering
+    :type context: dict
+    :return: text of rendered request
+    :rtype: str
+    """
+    return get_template(name).render(context)
+
+
+def warm_up():
+    """Compiles all request templates ahead of the first request."""
+    for name in template_env.list_templates(extensions=["xml"]):
+        get_template(name)
+
+
+if os.environ.get("MIXVEL_WARM_UP_TEMPLATES"):
+    warm_up()
@@ -0,0 +1,592 @@
+# -*- coding: utf-8 -*-
+
+"""
+mixvel.aio
+~~~~~~~~~~~~~~
+This module provides asyncio client for MixVel API.
+
+Requires Python 3.5+ and `aiohttp`, install with `pip install mixvel[async]`.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import threading
+import time
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from mixvel._parsers import (
+    is_cancel_success,
+    parse_air_shopping_response,
+    parse_order_view_response,
+)
+
+from .client import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_ORDER_TTL,
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_TOKEN_REFRESH_MARGIN,
+    PROD_GATEWAY,
+    SERIALIZERS,
+    Exchange,
+    _ResponseFeed,
+    _check_response,
+    _parse_response,
+    _prepare_request,
+    _projection_key,
+    _with_expiration,
+)
+from .endpoint import is_login_endpoint
+from .cache import TTLCache, air_shopping_ttl
+from .tokens import (
+    DEFAULT_TOKEN_TTL,
+    MemoryTokenStore,
+    Token,
+    default_token_store,
+    token_expiration,
+)
+from .utils import air_shopping_key
+
+log = logging.getLogger(__name__)
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of `mixvel.coalescing.SingleFlight`."""
+
+    def __init__(self):
+        self._calls = {}
+        self.calls = 0  # calls actually made
+        self.coalesced = 0  # calls served by a call of another caller
+
+    async def do(self, key, fn):
+        """Awaits `fn()` or joins the in-flight call with the same key.
+
+        :param key: hashable key of the call
+        :param fn: coroutine function without arguments
+        :return: result of `fn()`, errors are raised to all callers
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self.calls += 1
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.coalesced += 1
+        # cancellation of one caller must not cancel the call for others
+        return await asyncio.shield(task)
+
+
+_lock_executor = None
+_lock_executor_guard = threading.Lock()
+
+
+def _get_lock_executor():
+    """Returns executor waiting for token store locks.
+
+    Its thread only waits for locks, which are released without it, so
+    waits never starve store I/O of threads or the other way round.
+    """
+    global _lock_executor
+    with _lock_executor_guard:
+        if _lock_executor is None:
+            _lock_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        return _lock_executor
+
+
+class _StoreLock:
+    def __init__(self, store, key):
+        """Holds `TokenStore.lock` from a thread of its own, so waiting
+        for another thread or process does not block the event loop.
+
+        :type store: mixvel.tokens.TokenStore
+        :type key: str
+        """
+        self._lock = store.lock(key)
+
+    async def __aenter__(self):
+        acquired = asyncio.get_event_loop().run_in_executor(
+            _get_lock_executor(), self._lock.__enter__
+        )
+        try:
+            await asyncio.shield(acquired)
+        except asyncio.CancelledError:
+            # the thread still takes the lock, release it once it does
+            acquired.add_done_callback(
+                lambda f: f.exception() is None and self._lock.__exit__(None, None, None)
+            )
+            raise
+
+    async def __aexit__(self, *args):
+        self._lock.__exit__(None, None, None)  # releasing does not block
+
+
+class AsyncClient:
+    def __init__(
+        self, login, password, structure_unit_id, gateway=PROD_GATEWAY, verify_ssl=True,
+        session=None, pool_maxsize=DEFAULT_POOL_MAXSIZE, on_exchange=None,
+        serializer="jinja", token_store=None, token_ttl=DEFAULT_TOKEN_TTL,
+        token_refresh_margin=DEFAULT_TOKEN_REFRESH_MARGIN,
+        stream=False, chunk_size=DEFAULT_CHUNK_SIZE, coalesce=False,
+        shopping_cache=None, response_cache=None, order_cache=None,
+        order_ttl=DEFAULT_ORDER_TTL, share_prices=False, lazy_offers=False,
+        parse_pool=None, executor=None,
+    ):
+        """MixVel API asyncio client.
+
+        Mirrors `mixvel.Client`, all API methods are coroutines.
+
+        :param gateway: (optional) gateway url, default is `PROD_GATEWAY`
+        :type gateway: str
+        :param verify_ssl: (optional) controls whether we verify the server's SSL certificate, defaults to True
+        :type verify_ssl: bool
+        :param session: (optional) shared HTTP session;
+            if omitted, the client creates and owns its own session
+        :type session: aiohttp.ClientSession or None
+        :param pool_maxsize: (optional) max connections per host of own session
+        :type pool_maxsize: int
+        :param on_exchange: (optional) hook called with `Exchange` of every request
+            once its response is received
+        :type on_exchange: callable or None
+        :param serializer: (optional) request serializer, "jinja" or "lxml"
+        :type serializer: str
+        :param token_store: (optional) auth token store shared with other clients,
+            defaults to process-wide `mixvel.tokens.default_token_store`;
+            stores other than `MemoryTokenStore` are used from executor threads
+        :type token_store: mixvel.tokens.TokenStore or None
+        :param token_ttl: (optional) token lifetime in seconds,
+            used when it can't be taken from the token itself
+        :type token_ttl: float
+        :param token_refresh_margin: (optional) token is refreshed that many seconds
+            before it expires
+        :type token_refresh_margin: float
+        :param stream: (optional) parse responses incrementally while they are
+            downloaded, defaults to False
+        :type stream: bool
+        :param chunk_size: (optional) size of chunks read in stream mode
+        :type chunk_size: int
+        :param coalesce: (optional) share one air shopping request between
+            concurrent tasks with the same itinerary and passengers,
+            see `coalescer` for counters, defaults to False
+        :type coalesce: bool
+        :param shopping_cache: (optional) cache of air shopping responses,
+            entries live until the first offer expires; caches other than
+            `TTLCache` are used from executor threads
+        :type shopping_cache: mixvel.cache.CacheBackend or None
+        :param response_cache: (optional) cache of raw air shopping responses,
+            it may be shared by worker processes
+        :type response_cache: mixvel.cache.CacheBackend or None
+        :param order_cache: (optional) cache of order views, filled by
+            `create_order`, `change_order` and `retrieve_order`, cleared by `cancel_order`
+        :type order_cache: mixvel.cache.CacheBackend or None
+        :param order_ttl: (optional) lifetime of cached order view in seconds
+        :type order_ttl: float
+        :param share_prices: (optional) build equal prices of a response once
+            and share them between its offers and order items, shared prices
+            must not be modified, defaults to False
+        :type share_prices: bool
+        :param lazy_offers: (optional) return air shopping offers which parse
+            their fields on first access, see `mixvel._parsers.LazyOffer`,
+            defaults to False
+        :type lazy_offers: bool
+        :param parse_pool: (optional) process pool parsing offers of air shopping
+            responses with at least `mixvel._parsers.PARALLEL_MIN_OFFERS` offers,
+            it is slower on few cores, see `mixvel._parsers.parse_air_shopping_response`;
+            such responses are parsed in an executor thread waiting for the pool
+        :type parse_pool: multiprocessing.pool.Pool or None
+        :param executor: (optional) executor running blocking calls of caches
+            other than `TTLCache`, token stores other than `MemoryTokenStore`
+            and parsing with `parse_pool`, defaults to the loop's default executor;
+            waits for token store locks never run on it, they have a thread
+            of their own, so a small bounded pool will do
+        :type executor: concurrent.futures.Executor or None
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncClient requires aiohttp, install it with `pip install mixvel[async]`"
+            )
+        if serializer not in SERIALIZERS:
+            raise ValueError("Unknown serializer: {}".format(serializer))
+        self.login = login
+        self.password = password
+        self.structure_unit_id = structure_unit_id
+        self.token_store = token_store if token_store is not None else default_token_store
+        self.token_ttl = token_ttl
+        self.token_refresh_margin = token_refresh_margin
+        self.gateway = gateway
+        self.verify_ssl = verify_ssl
+        self.pool_maxsize = pool_maxsize
+        self.on_exchange = on_exchange
+        self.serializer = serializer
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.coalescer = AsyncSingleFlight() if coalesce else None
+        self.shopping_cache = shopping_cache
+        self.response_cache = response_cache
+        self.order_cache = order_cache
+        self.order_ttl = order_ttl
+        self.share_prices = share_prices
+        self.lazy_offers = lazy_offers
+        self.parse_pool = parse_pool
+        self.executor = executor
+        self._own_session = session is None
+        self._session = session
+        self._auth_lock = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """Closes HTTP session, if it is owned by the client.
+
+        A shared session passed to the constructor is left open.
+        """
+        if self._own_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def token_key(self):
+        """Key of client credentials in token store.
+
+        :rtype: str
+        """
+        return "{} {} {}".format(self.gateway, self.login, self.structure_unit_id)
+
+    @property
+    def token(self):
+        """Current auth token, empty if the client is not logged in.
+
+        :rtype: str
+        """
+        token = self.token_store.get(self.token_key)
+        return token.value if token is not None else ""
+
+    def _get_session(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit_per_host=self.pool_maxsize)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def _request(self, endpoint, context, on_exchange=None):
+        """Constructs and executes request.
+
+        :param endpoint: method endpoint, e.g. "/api/Accounts/login"
+        :type endpoint: str
+        :param context: request variables.
+        :type context: dict
+        :param on_exchange: (optional) hook called with `Exchange` of this request
+        :type on_exchange: callable or None
+        :return: content of response `Body` node.
+        :rtype: lxml.etree._Element
+        """
+        url = "{gateway}{endpoint}".format(gateway=self.gateway, endpoint=endpoint)
+        headers = {
+            "Content-Type": "application/xml",
+        }
+        data = _prepare_request(endpoint, context, self.serializer)
+        ssl = None if self.verify_ssl else False
+        authorized = not is_login_endpoint(endpoint)
+        retry = authorized
+        while True:
+            if authorized:
+                token = await self._ensure_token()
+                headers["Authorization"] = "Bearer {token}".format(token=token)
+            exchange = Exchange(endpoint, url, data)
+            log.info(url)
+            log.info(data)
+            started = time.time()
+            async with self._get_session().post(
+                url, data=data, headers=headers, ssl=ssl
+            ) as r:
+                exchange.status_code = r.status
+                resp = None
+                if self.stream and r.status < 400:
+                    feed = _ResponseFeed(
+                        keep=self.response_cache is not None or log.isEnabledFor(logging.INFO)
+                    )
+                    async for chunk in r.content.iter_chunked(self.chunk_size):
+                        feed.feed(chunk)
+                    resp = feed.close(exchange)
+                else:
+                    exchange.response = await r.read()
+                    exchange.size = len(exchange.response)
+                exchange.elapsed = time.time() - started
+                log.info(exchange.response)
+                if self.on_exchange is not None:
+                    self.on_exchange(exchange)
+                if on_exchange is not None:
+                    on_exchange(exchange)
+                if r.status == 401 and retry:
+                    # token has expired or was revoked, login and retry once
+                    retry = False
+                    await self._invalidate_token(token)
+                    continue
+                r.raise_for_status()
+            break
+        if resp is None:
+            return _parse_response(exchange.response)
+        return _check_response(resp)
+
+    async def _ensure_token(self):
+        """Returns valid auth token, logins if there is no token yet
+        or it is about to expire.
+
+        Only one task logs in, others wait and take its token.
+
+        :rtype: str
+        """
+        key = self.token_key
+        token = await self._call(self.token_store, "get", key)
+        if token is not None and not token.expires_within(self.token_refresh_margin):
+            return token.value
+        # tasks of this client queue here, so at most one of them
+        # waits for the store lock
+        async with self._get_auth_lock():
+            async with _StoreLock(self.token_store, key):
+                # another task or process may have logged in while we waited
+                token = await self._call(self.token_store, "get", key)
+                if token is not None and not token.expires_within(self.token_refresh_margin):
+                    return token.value
+                return await self.auth()
+
+    async def _invalidate_token(self, value):
+        """Drops rejected token, unless it has already been replaced.
+
+        :param value: rejected token
+        :type value: str
+        """
+        key = self.token_key
+        async with self._get_auth_lock():
+            async with _StoreLock(self.token_store, key):
+                token = await self._call(self.token_store, "get", key)
+                if token is not None and token.value == value:
+                    await self._call(self.token_store, "delete", key)
+
+    async def _call(self, backend, method, *args, **kwargs):
+        """Calls method of cache backend or token store.
+
+        Backends other than `TTLCache` and `MemoryTokenStore` read files or
+        the network, they are called on `executor`, so they don't block
+        the event loop.
+
+        :type backend: mixvel.cache.CacheBackend or mixvel.tokens.TokenStore
+        :param method: name of method, e.g. "get"
+        :type method: str
+        """
+        fn = getattr(backend, method)
+        if isinstance(backend, (TTLCache, MemoryTokenStore)):
+            return fn(*args, **kwargs)
+        return await asyncio.get_event_loop().run_in_executor(
+            self.executor, functools.partial(fn, *args, **kwargs)
+        )
+
+    def _get_auth_lock(self):
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        return self._auth_lock
+
+    async def auth(self):
+        """Logins to MixVel API.
+
+        :return: auth token
+        :rtype: str
+        """
+        context = {
+            "login": self.login,
+            "password": self.password,
+            "structure_unit_id": self.structure_unit_id,
+        }
+        resp = await self._request("/api/Accounts/login", context)
+        token = resp.find("./Token").text
+        await self._call(
+            self.token_store, "set",
+            self.token_key, Token(token, token_expiration(token, self.token_ttl)),
+        )
+
+        return token
+
+    async def air_shopping(
+        self, itinerary, paxes, projection=None, top_k=None, top_key=None,
+    ):
+        """Executes air shopping request.
+
+        If the client coalesces requests, concurrent tasks with
+        the same itinerary and passengers share one request and get
+        the same `AirShoppingResponse` object, which must not be modified.
+        The same applies to responses returned from the shopping cache.
+
+        :param itinerary: itinerary
+        :type itinerary: list[Leg]
+        :param paxes: paxes
+        :type paxes: list[AnonymousPassenger]
+        :param projection: (optional) fields of offers to parse, name of preset,
+            e.g. "summary", or set of field names, see `mixvel._parsers.PROJECTIONS`,
+            defaults to all fields; clients with caches also parse offer expiration
+        :type projection: str or set[str] or None
+        :param top_k: (optional) keep only that many offers with the least
+            `top_key`, the rest are not parsed in full
+        :type top_k: int or None
+        :param top_key: (optional) key of offer summary, defaults to total
+            amount; responses ranked by custom keys are not put in the shopping cache
+        :type top_key: callable or None
+        :rtype: AirShoppingResponse
+        """
+        context = {
+            "itinerary": itinerary,
+            "paxes": paxes,
+        }
+        options = {"projection": projection, "top_k": top_k, "top_key": top_key}
+        if self.coalescer is None and self.shopping_cache is None and self.response_cache is None:
+            return await self._air_shopping(None, None, context, options)
+        # responses depend on the gateway and agency, caches may be shared by clients
+        key = (self.gateway, self.structure_unit_id) + air_shopping_key(itinerary, paxes)
+        # parsed responses also depend on parse options, raw ones don't
+        shopping_key = key + _projection_key(projection)
+        if top_k is not None:
+            shopping_key += (top_k, top_key)
+        if self.shopping_cache is not None or self.response_cache is not None:
+            options["projection"] = _with_expiration(projection)
+        if self.shopping_cache is not None and top_key is None:
+            cached = await self._call(self.shopping_cache, "get", shopping_key)
+            if cached is not None:
+                return cached
+        if self.coalescer is None:
+            return await self._air_shopping(key, shopping_key, context, options)
+        return await self.coalescer.do(
+            shopping_key, lambda: self._air_shopping(key, shopping_key, context, options)
+        )
+
+    async def _air_shopping(self, key, shopping_key, context, options):
+        content = None
+        raw_key = ("response",) + key if key is not None else None
+        if self.response_cache is not None:
+            content = await self._call(self.response_cache, "get", raw_key)
+        if content is not None:
+            resp = _parse_response(content)
+            shopping = await self._parse_air_shopping(resp, options)
+            size = len(content)
+        else:
+            exchanges = []
+            resp = await self._request("/api/Order/AirShopping", context, exchanges.append)
+            shopping = await self._parse_air_shopping(resp, options)
+            size = exchanges[-1].size
+        # keys of callers' functions are not the same in other processes
+        shopping_cache = self.shopping_cache if options["top_key"] is None else None
+        if shopping_cache is None and self.response_cache is None:
+            return shopping
+        ttl = air_shopping_ttl(shopping)
+        # expiration of offers left out by top-K is unknown
+        if content is None and self.response_cache is not None and options["top_k"] is None:
+            await self._call(
+                self.response_cache, "set", raw_key, exchanges[-1].response, ttl=ttl
+            )
+        if shopping_cache is not None:
+            await self._call(shopping_cache, "set", shopping_key, shopping, ttl=ttl, size=size)
+        return shopping
+
+    async def _parse_air_shopping(self, resp, options):
+        parse = functools.partial(
+            parse_air_shopping_response, resp, self.share_prices, self.lazy_offers, **options
+        )
+        if self.parse_pool is None:
+            return parse()
+        # waiting for the pool would block the event loop
+        return await asyncio.get_event_loop().run_in_executor(
+            self.executor, functools.partial(parse, pool=self.parse_pool)
+        )
+
+    async def create_order(self, selected_offer, paxes):
+        """Creates order.
+
+        :param selected_offer: selected offer
+        :type selected_offer: SelectedOffer
+        :param paxes: passengers
+        :type paxes: list[Passenger]
+        :rtype: OrderViewResponse
+        """
+        context = {
+            "selected_offer": selected_offer,
+            "paxes": paxes,
+        }
+        exchanges = []
+        resp = await self._request("/api/Order/Create", context, exchanges.append)
+        view = parse_order_view_response(resp, self.share_prices)
+        return await self._cache_order(view, exchanges[-1])
+
+    async def retrieve_order(self, mix_order_id):
+        """Retrieves order.
+
+        :param mix_order_id: aggregated order id
+        :type mix_order_id: str
+        :rtype: OrderViewResponse
+        """
+        if self.order_cache is not None:
+            cached = await self._call(self.order_cache, "get", self._order_key(mix_order_id))
+            if cached is not None:
+                return cached
+        context = {
+            "mix_order_id": mix_order_id,
+        }
+        exchanges = []
+        resp = await self._request("/api/Order/Retrieve", context, exchanges.append)
+
+        view = parse_order_view_response(resp, self.share_prices)
+        return await self._cache_order(view, exchanges[-1])
+
+    async def change_order(self, mix_order_id, amount):
+        """Issues tickets.
+
+        :param mix_order_id: aggregated order id
+        :type mix_order_id: str
+        :param amount: amount
+        :type amount: int
+        """
+        context = {
+            "mix_order_id": mix_order_id,
+            "amount": amount,
+        }
+        await self._forget_order(mix_order_id)
+        exchanges = []
+        resp = await self._request("/api/Order/Change", context, exchanges.append)
+
+        view = parse_order_view_response(resp, self.share_prices)
+        return await self._cache_order(view, exchanges[-1])
+
+    async def cancel_order(self, mix_order_id):
+        """Cancels order.
+
+        :param mix_order_id: order id
+        :type mix_order_id: str
+        :rtype: bool
+        """
+        context = {
+            "mix_order_id": mix_order_id,
+        }
+        try:
+            resp = await self._request("/api/Order/Cancel", context)
+        finally:
+            await self._forget_order(mix_order_id)
+        return is_cancel_success(resp)
+
+    def _order_key(self, mix_order_id):
+        return "order", self.gateway, self.structure_unit_id, mix_order_id
+
+    async def _cache_order(self, view, exchange):
+        if self.order_cache is not None:
+            await self._call(
+                self.order_cache, "set", self._order_key(view.mix_order.mix_order_id), view,
+                ttl=self.order_ttl, size=exchange.size,
+            )
+        return view
+
+    async def _forget_order(self, mix_order_id):
+        if self.order_cache is not None:
+            await self._call(self.order_cache, "delete", self._order_key(mix_order_id))
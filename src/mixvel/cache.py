@@ -0,0 +1,504 @@
+# -*- coding: utf-8 -*-
+
+"""
+mixvel.cache
+~~~~~~~~~~~~~~
+This module provides caches of MixVel API responses.
+
+All caches implement `CacheBackend`: in process memory (`TTLCache`),
+on local disk (`DiskCache`) and in a networked key-value store
+(`KeyValueCache`). Disk and network backends keep values pickled
+and compressed, so any picklable value can be cached.
+"""
+
+import collections
+import datetime
+import errno
+import fnmatch
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import timeit
+import zlib
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from .models import UNLOADED
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+DEFAULT_MAX_TTL = 300  # seconds
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 256 * 1024 * 1024
+DISK_SCAN_INTERVAL = 100  # sets between scans of cache directory
+STALE_TEMP_AGE = 600  # seconds, temp files older than that are left by crashed writers
+
+_header = struct.Struct("<d")  # expiration time of entry
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+try:
+    buffer
+except NameError:  # Python 3
+    def _decompress_from(data, offset):
+        view = memoryview(data)
+        try:
+            tail = view[offset:]
+            try:
+                return zlib.decompress(tail)
+            finally:
+                tail.release()
+        finally:
+            view.release()
+else:
+    def _decompress_from(data, offset):
+        return zlib.decompress(buffer(data, offset))
+
+
+def _key_string(key):
+    return key if isinstance(key, string_types) else repr(key)
+
+
+def _dumps(value, compress_level):
+    return zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL), compress_level)
+
+
+def _loads(data):
+    return pickle.loads(zlib.decompress(data))
+
+
+class LatencyStats:
+    """Latency of cache operation."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0  # seconds
+        self.max = 0.0  # seconds
+
+    def add(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    @property
+    def mean(self):
+        """Mean latency in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+
+class CacheBackend:
+    """Base class of caches.
+
+    Subclasses implement `_get`, `_set`, `_delete` and `clear`,
+    public methods cap entry lifetime and record hits, misses and latency.
+    """
+
+    def __init__(self, max_ttl=DEFAULT_MAX_TTL):
+        self.max_ttl = max_ttl
+        self.hits = 0
+        self.misses = 0
+        self.get_latency = LatencyStats()
+        self.set_latency = LatencyStats()
+        self._stats_lock = threading.Lock()  # backends are shared by threads
+
+    def get(self, key):
+        """Returns cached value.
+
+        :param key: hashable key, disk and network backends take
+            strings and tuples of strings
+        :return: value or None if there is no live entry
+        """
+        started = timeit.default_timer()
+        value = self._get(key)
+        elapsed = timeit.default_timer() - started
+        with self._stats_lock:
+            self.get_latency.add(elapsed)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None, size=0):
+        """Caches value.
+
+        :param key: hashable key
+        :param value: value
+        :param ttl: (optional) lifetime in seconds, capped by `max_ttl`
+        :type ttl: float or None
+        :param size: (optional) approximate size of value, in bytes,
+            used by backends which do not serialize values
+        :type size: int
+        """
+        ttl = self.max_ttl if ttl is None else min(ttl, self.max_ttl)
+        if ttl <= 0:
+            return
+        started = timeit.default_timer()
+        self._set(key, value, ttl, size)
+        elapsed = timeit.default_timer() - started
+        with self._stats_lock:
+            self.set_latency.add(elapsed)
+
+    def delete(self, key):
+        """Drops cached value, if any.
+
+        :param key: hashable key
+        """
+        self._delete(key)
+
+    def clear(self):
+        raise NotImplementedError
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, value, ttl, size):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        raise NotImplementedError
+
+
+class TTLCache(CacheBackend):
+    def __init__(
+        self, max_ttl=DEFAULT_MAX_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+        max_bytes=DEFAULT_MAX_BYTES,
+    ):
+        """Thread-safe in-memory cache with per-entry lifetime and LRU eviction.
+
+        Values are kept as they are, without serialization.
+
+        :param max_ttl: (optional) max lifetime of entry in seconds
+        :type max_ttl: float
+        :param max_entries: (optional) max number of entries
+        :type max_entries: int
+        :param max_bytes: (optional) max total approximate size of entries
+        :type max_bytes: int
+        """
+        CacheBackend.__init__(self, max_ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()  # key: (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0  # entries dropped to fit the limits
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """Total approximate size of entries, in bytes."""
+        return self._bytes
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and entry[0] <= time.time():
+                self._bytes -= entry[1]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                return None
+            self._entries[key] = entry  # most recently used
+            return entry[2]
+
+    def _set(self, key, value, ttl, size):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.time() + ttl, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def _delete(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+
+class DiskCache(CacheBackend):
+    def __init__(
+        self, path, max_ttl=DEFAULT_MAX_TTL, max_bytes=DEFAULT_MAX_DISK_BYTES,
+        compress_level=1,
+    ):
+        """On-disk cache shared by worker processes.
+
+        Entries are files of compressed pickled values, written atomically and
+        memory-mapped on read, so processes can read and write concurrently.
+        File modification time tracks last use, least recently used entries
+        are evicted once total size exceeds `max_bytes`. Each process adds up
+        sizes of entries it writes and scans the directory when the sum exceeds
+        `max_bytes` or every `DISK_SCAN_INTERVAL` writes, to count entries of
+        other processes.
+
+        :param path: cache directory, created if missing
+        :type path: str
+        :param max_ttl: (optional) max lifetime of entry in seconds
+        :type max_ttl: float
+        :param max_bytes: (optional) max total size of entry files
+        :type max_bytes: int
+        :param compress_level: (optional) zlib compression level, defaults to 1
+        :type compress_level: int
+        """
+        CacheBackend.__init__(self, max_ttl)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self.evictions = 0
+        self.expirations = 0
+        self._bytes = None  # estimated total size of entries, None until scanned
+        self._sets = 0
+
+    def _filename(self, key):
+        name = hashlib.sha1(_key_string(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.path, name)
+
+    def _get(self, key):
+        filename = self._filename(key)
+        content = None
+        try:
+            with open(filename, "rb") as f:
+                read = os.fstat(f.fileno())
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    expires_at, = _header.unpack_from(data, 0)
+                    if expires_at > time.time():
+                        content = _decompress_from(data, _header.size)
+                finally:
+                    data.close()
+        except (IOError, OSError, ValueError, struct.error, zlib.error):
+            # missing, concurrently evicted or broken entry
+            return None
+        if content is None:
+            with self._stats_lock:
+                self.expirations += 1
+            self._remove_expired(filename, read)
+            return None
+        try:
+            os.utime(filename, None)  # most recently used
+        except OSError:
+            pass
+        return pickle.loads(content)
+
+    def _set(self, key, value, ttl, size):
+        fd, tmp = tempfile.mkstemp(dir=self.path, prefix=".")
+        with os.fdopen(fd, "wb") as f:
+            f.write(_header.pack(time.time() + ttl))
+            f.write(_dumps(value, self.compress_level))
+            written = f.tell()
+        os.rename(tmp, self._filename(key))  # atomic on POSIX
+        with self._stats_lock:
+            self._sets += 1
+            if self._bytes is not None:
+                self._bytes += written  # replaced entries are counted twice until scan
+            scan = (
+                self._bytes is None or self._bytes > self.max_bytes
+                or self._sets % DISK_SCAN_INTERVAL == 0
+            )
+        if scan:
+            self._evict()
+
+    def _delete(self, key):
+        self._remove(self._filename(key))
+
+    def clear(self):
+        for name in os.listdir(self.path):
+            if not name.startswith("."):
+                self._remove(os.path.join(self.path, name))
+        with self._stats_lock:
+            self._bytes = None
+
+    def _remove(self, filename):
+        try:
+            os.remove(filename)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+
+    def _remove_expired(self, filename, read):
+        """Removes expired entry, unless another process has replaced it
+        with a fresh one since it was read.
+
+        :param read: stat of the expired entry
+        :type read: os.stat_result
+        """
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return
+        if (stat.st_dev, stat.st_ino, stat.st_mtime) == (read.st_dev, read.st_ino, read.st_mtime):
+            self._remove(filename)
+
+    def _evict(self):
+        with open(os.path.join(self.path, ".lock"), "a") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except (IOError, OSError):
+                    return  # another process is evicting right now
+            entries = []
+            total = 0
+            stale = time.time() - STALE_TEMP_AGE
+            for name in os.listdir(self.path):
+                filename = os.path.join(self.path, name)
+                try:
+                    stat = os.stat(filename)
+                except OSError:
+                    continue
+                if name.startswith("."):
+                    if name != ".lock" and stat.st_mtime < stale:
+                        self._remove(filename)  # left by crashed writer
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, filename))
+                total += stat.st_size
+            entries.sort()
+            evicted = 0
+            for _, size, filename in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove(filename)
+                total -= size
+                evicted += 1
+            with self._stats_lock:
+                self._bytes = total
+                self.evictions += evicted
+
+
+class KeyValueCache(CacheBackend):
+    def __init__(self, client, prefix="mixvel:", max_ttl=DEFAULT_MAX_TTL, compress_level=1):
+        """Cache in a networked key-value store shared by hosts.
+
+        The store is expected to expire entries by itself.
+
+        :param client: store client with `get`, `set(name, value, px=...)`,
+            `delete` and `scan_iter(match=...)` methods, e.g. `redis.Redis`
+            or `LocalKeyValueStore`
+        :param prefix: (optional) prefix of store keys
+        :type prefix: str
+        :param max_ttl: (optional) max lifetime of entry in seconds
+        :type max_ttl: float
+        :param compress_level: (optional) zlib compression level, defaults to 1
+        :type compress_level: int
+        """
+        CacheBackend.__init__(self, max_ttl)
+        self.client = client
+        self.prefix = prefix
+        self.compress_level = compress_level
+
+    def _name(self, key):
+        return self.prefix + _key_string(key)
+
+    def _get(self, key):
+        data = self.client.get(self._name(key))
+        if data is None:
+            return None
+        return _loads(data)
+
+    def _set(self, key, value, ttl, size):
+        self.client.set(
+            self._name(key), _dumps(value, self.compress_level),
+            px=max(1, int(ttl * 1000)),
+        )
+
+    def _delete(self, key):
+        self.client.delete(self._name(key))
+
+    def clear(self):
+        for name in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(name)
+
+
+class LocalKeyValueStore:
+    """In-process stand-in of networked key-value store.
+
+    Implements the part of `redis.Redis` API used by `KeyValueCache`,
+    for tests and local development.
+    """
+
+    def __init__(self):
+        self._data = {}  # name: (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            entry = self._data.get(name)
+            if entry is None:
+                return None
+            if entry[0] is not None and entry[0] <= time.time():
+                del self._data[name]
+                return None
+            return entry[1]
+
+    def set(self, name, value, ex=None, px=None):
+        expires_at = None
+        if px is not None:
+            expires_at = time.time() + px / 1000.0
+        elif ex is not None:
+            expires_at = time.time() + ex
+        with self._lock:
+            self._data[name] = (expires_at, bytes(value))
+        return True
+
+    def delete(self, *names):
+        deleted = 0
+        with self._lock:
+            for name in names:
+                if self._data.pop(name, None) is not None:
+                    deleted += 1
+        return deleted
+
+    def scan_iter(self, match=None):
+        with self._lock:
+            names = list(self._data)
+        return iter([name for name in names if match is None or fnmatch.fnmatchcase(name, match)])
+
+
+def air_shopping_ttl(resp):
+    """Returns lifetime of air shopping response, it ends
+    when the first of its offers expires.
+
+    :param resp: air shopping response
+    :type resp: AirShoppingResponse
+    :return: seconds, 0 if there are no offers or their expiration
+        is unknown, :meth:`CacheBackend.set` does not store such responses
+    :rtype: float
+    """
+    expirations = [
+        offer.offer_expiration_timelimit_datetime for offer in resp.offers
+        if offer.offer_expiration_timelimit_datetime not in (None, UNLOADED)
+    ]
+    if not expirations:
+        return 0
+    return (min(expirations) - datetime.datetime.utcnow()).total_seconds()
@@ -1,16 +1,20 @@
 # -*- coding: utf-8 -*-
 import datetime
 import logging
-import os
+import threading
+import time
 import uuid
 
-from jinja2 import Environment, FileSystemLoader
 from lxml import etree
 import requests
+from requests.adapters import HTTPAdapter
 
 from mixvel._parsers import (
+    PROJECTIONS,
     is_cancel_success,
+    iter_offers,
     parse_air_shopping_response,
+    parse_error,
     parse_order_view_response,
 )
 from mixvel.models import (
@@ -19,52 +23,384 @@ from mixvel.models import (
 )
 from mixvel.models import AirShoppingResponse
 
+from ._builders import serialize
+from ._render import render
+from .cache import air_shopping_ttl
+from .coalescing import SingleFlight
 from .endpoint import is_login_endpoint, request_template
-from .exceptions import NoOrdersToCancel
-from .utils import lxml_remove_namespaces
+from .tokens import DEFAULT_TOKEN_TTL, Token, default_token_store, token_expiration
+from .utils import air_shopping_key, strip_envelope_namespaces
 
 PROD_GATEWAY = "https://api.mixvel.com"
 TEST_GATEWAY = "https://api-test.mixvel.com"
 
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_TOKEN_REFRESH_MARGIN = 60  # seconds
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_ORDER_TTL = 30  # seconds
+
+SERIALIZERS = {
+    "jinja": render,
+    "lxml": serialize,
+}
+
 log = logging.getLogger(__name__)
-here = os.path.dirname(os.path.abspath(__file__))
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+
+def create_session(
+    pool_connections=DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize=DEFAULT_POOL_MAXSIZE,
+    pool_block=False,
+):
+    """Creates HTTP session with keep-alive connection pool.
+
+    The session can be shared by many `Client` instances,
+    so they reuse the same warm connections to the gateway.
+
+    :param pool_connections: (optional) number of per-host pools to cache
+    :type pool_connections: int
+    :param pool_maxsize: (optional) max number of connections kept per host
+    :type pool_maxsize: int
+    :param pool_block: (optional) block when no free connection is available
+        instead of opening an extra one, defaults to False
+    :type pool_block: bool
+    :rtype: requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _prepare_request(endpoint, context, serializer="jinja"):
+    """Constructs request.
+
+    :param endpoint: method endpoint, e.g. "/api/Accounts/login"
+    :type endpoint: str
+    :param context: values for request template rendering
+    :type context: dict
+    :param serializer: (optional) name of serializer, one of `SERIALIZERS`
+    :type serializer: str
+    :return: text of rendered request
+    :rtype: str or bytes
+    """
+    template = request_template(endpoint)
+    if template is None:
+        raise ValueError("Unknown endpoint: {}".format(endpoint))
+    context["message_id"] = uuid.uuid4()
+    context["time_sent"] = datetime.datetime.utcnow()
+    return SERIALIZERS[serializer](template, context)
+
+
+def _projection_key(projection):
+    """Returns part of air shopping cache key for offer projection.
+
+    :param projection: name of preset or set of field names, or None
+    :type projection: str or set[str] or None
+    :rtype: tuple
+    """
+    if projection is None or projection == "full":
+        return ()
+    if isinstance(projection, string_types):
+        return (projection,)
+    return (tuple(sorted(projection)),)  # stable across processes, unlike sets
+
+
+def _with_expiration(projection):
+    """Returns projection that also parses offer expiration,
+    lifetime of cached air shopping responses depends on it.
+
+    :param projection: name of preset or set of field names, or None
+    :type projection: str or set[str] or None
+    :rtype: str or frozenset[str] or None
+    """
+    names = projection
+    if isinstance(projection, string_types):
+        names = PROJECTIONS.get(projection)  # unknown presets are left to the parser
+    if names is None or "offer_expiration_timelimit_datetime" in names:
+        return projection
+    return frozenset(names).union(["offer_expiration_timelimit_datetime"])
+
+
+def _parse_response(content):
+    """Parses response and raises error returned by MixVel API.
+
+    :param content: raw response
+    :type content: bytes
+    :return: content of response `Body` node.
+    :rtype: lxml.etree._Element
+    """
+    return _check_response(etree.fromstring(content))
+
+
+def _check_response(resp):
+    """Cleans up parsed response and raises error returned by MixVel API.
+
+    :param resp: response envelope
+    :type resp: lxml.etree._Element
+    :return: content of response `Body` node.
+    :rtype: lxml.etree._Element
+    """
+    strip_envelope_namespaces(resp)
+    message = resp.find("./Body/AppData/")
+    # MixVel puts Error right into the message root,
+    # so successful responses are never scanned in full
+    err = message.find("./Error") if message is not None else None
+    if err is not None:
+        raise parse_error(err)
+    return message
+
+
+class Exchange:
+    def __init__(self, endpoint, url, request):
+        """Single request/response round trip with MixVel API.
+
+        :param endpoint: method endpoint, e.g. "/api/Order/AirShopping"
+        :type endpoint: str
+        :param url: request url
+        :type url: str
+        :param request: sent request
+        :type request: str
+        """
+        self.endpoint = endpoint
+        self.url = url
+        self.request = request
+        self.response = None  # raw response, None until it is received
+        self.size = None  # bytes received
+        self.status_code = None
+        self.elapsed = None  # seconds
+
+
+class _ResponseFeed:
+    def __init__(self, keep=False):
+        """Feeds response chunks into incremental parser as they arrive,
+        so parsing overlaps with transfer.
+
+        :param keep: (optional) keep raw response, defaults to False
+        :type keep: bool
+        """
+        self.parser = etree.XMLParser()
+        self.keep = keep
+        self.chunks = []
+        self.size = 0
+
+    def feed(self, chunk):
+        self.parser.feed(chunk)
+        self.size += len(chunk)
+        if self.keep:
+            self.chunks.append(chunk)
+
+    def close(self, exchange):
+        """Finishes parsing and records received response in exchange.
+
+        :rtype: lxml.etree._Element
+        """
+        exchange.size = self.size
+        if self.keep:
+            exchange.response = b"".join(self.chunks)
+        return self.parser.close()
 
 
 class Client:
     def __init__(
-        self, login, password, structure_unit_id, gateway=PROD_GATEWAY, verify_ssl=True
+        self, login, password, structure_unit_id, gateway=PROD_GATEWAY, verify_ssl=True,
+        session=None, pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE, on_exchange=None, serializer="jinja",
+        token_store=None, token_ttl=DEFAULT_TOKEN_TTL,
+        token_refresh_margin=DEFAULT_TOKEN_REFRESH_MARGIN,
+        stream=False, chunk_size=DEFAULT_CHUNK_SIZE, coalesce=False,
+        shopping_cache=None, response_cache=None, order_cache=None,
+        order_ttl=DEFAULT_ORDER_TTL, share_prices=False, lazy_offers=False,
+        parse_pool=None,
     ):
         """MixVel API Client.
 
+        The client is thread-safe, one instance can be shared by a thread pool.
+
         :param gateway: (optional) gateway url, default is `PROD_GATEWAY`
         :type gateway: str
         :param verify_ssl: (optional) controls whether we verify the server's SSL certificate, defaults to True
         :type verify_ssl: bool
+        :param session: (optional) shared HTTP session, see `create_session`;
+            if omitted, the client creates and owns its own session
+        :type session: requests.Session or None
+        :param pool_connections: (optional) number of per-host pools of own session
+        :type pool_connections: int
+        :param pool_maxsize: (optional) max connections per host of own session
+        :type pool_maxsize: int
+        :param on_exchange: (optional) hook called with `Exchange` of every request
+            once its response is received, e.g. for audit logging
+        :type on_exchange: callable or None
+        :param serializer: (optional) request serializer, "jinja" renders templates,
+            "lxml" builds compact requests without templates, defaults to "jinja"
+        :type serializer: str
+        :param token_store: (optional) auth token store shared with other clients,
+            defaults to process-wide `mixvel.tokens.default_token_store`
+        :type token_store: mixvel.tokens.TokenStore or None
+        :param token_ttl: (optional) token lifetime in seconds,
+            used when it can't be taken from the token itself
+        :type token_ttl: float
+        :param token_refresh_margin: (optional) token is refreshed that many seconds
+            before it expires
+        :type token_refresh_margin: float
+        :param stream: (optional) parse responses incrementally while they are
+            downloaded, raw response is kept only if `mixvel` logging is enabled
+            at INFO level, defaults to False
+        :type stream: bool
+        :param chunk_size: (optional) size of chunks read in stream mode
+        :type chunk_size: int
+        :param coalesce: (optional) share one air shopping request between
+            concurrent callers with the same itinerary and passengers,
+            see `coalescer` for counters, defaults to False
+        :type coalesce: bool
+        :param shopping_cache: (optional) cache of air shopping responses,
+            entries live until the first offer expires
+        :type shopping_cache: mixvel.cache.CacheBackend or None
+        :param response_cache: (optional) cache of raw air shopping responses,
+            it may be shared by worker processes, a hit is parsed without
+            a request to the gateway
+        :type response_cache: mixvel.cache.CacheBackend or None
+        :param order_cache: (optional) cache of order views, filled by
+            `create_order`, `change_order` and `retrieve_order`, cleared by `cancel_order`
+        :type order_cache: mixvel.cache.CacheBackend or None
+        :param order_ttl: (optional) lifetime of cached order view in seconds,
+            covers changes made by other processes
+        :type order_ttl: float
+        :param share_prices: (optional) build equal prices of a response once
+            and share them between its offers and order items, shared prices
+            must not be modified, defaults to False
+        :type share_prices: bool
+        :param lazy_offers: (optional) return air shopping offers which parse
+            their fields on first access, see `mixvel._parsers.LazyOffer`,
+            defaults to False
+        :type lazy_offers: bool
+        :param parse_pool: (optional) process pool parsing offers of air shopping
+            responses with at least `mixvel._parsers.PARALLEL_MIN_OFFERS` offers,
+            it is slower on few cores, see `mixvel._parsers.parse_air_shopping_response`
+        :type parse_pool: multiprocessing.pool.Pool or None
         """
+        if serializer not in SERIALIZERS:
+            raise ValueError("Unknown serializer: {}".format(serializer))
         self.login = login
         self.password = password
         self.structure_unit_id = structure_unit_id
-        self.token = ""
+        self.token_store = token_store if token_store is not None else default_token_store
+        self.token_ttl = token_ttl
+        self.token_refresh_margin = token_refresh_margin
+        self.on_exchange = on_exchange
+        self.serializer = serializer
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.coalescer = SingleFlight() if coalesce else None
+        self.shopping_cache = shopping_cache
+        self.response_cache = response_cache
+        self.order_cache = order_cache
+        self.order_ttl = order_ttl
+        self.share_prices = share_prices
+        self.lazy_offers = lazy_offers
+        self.parse_pool = parse_pool
+        self._local = threading.local()
         self.gateway = gateway
         self.verify_ssl = verify_ssl
+        self._own_session = session is None
+        if session is None:
+            session = create_session(
+                pool_connections=pool_connections, pool_maxsize=pool_maxsize
+            )
+        self.session = session
 
-    def __prepare_request(self, template, context):
-        """Constructs request.
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Closes HTTP session, if it is owned by the client.
+
+        A shared session passed to the constructor is left open.
+        """
+        if self._own_session:
+            self.session.close()
+
+    @property
+    def last_exchange(self):
+        """Last exchange made by the current thread.
+
+        :rtype: Exchange or None
+        """
+        return getattr(self._local, "exchange", None)
+
+    @property
+    def sent(self):
+        """Last request sent by the current thread."""
+        exchange = self.last_exchange
+        return exchange.request if exchange is not None else None
+
+    @property
+    def recv(self):
+        """Last response received by the current thread."""
+        exchange = self.last_exchange
+        return exchange.response if exchange is not None else None
+
+    @property
+    def token_key(self):
+        """Key of client credentials in token store.
 
-        :param template: file name of request template
-        :type template: str
-        :param context: values for request template rendering
-        :type context: dict
-        :return: text of rendered request
         :rtype: str
         """
-        context["message_id"] = uuid.uuid4()
-        context["time_sent"] = datetime.datetime.utcnow()
-        template_env = Environment(
-            loader=FileSystemLoader(os.path.join(here, "templates"))
-        )
-        request_template = template_env.get_template(template)
-        return request_template.render(context)
+        return "{} {} {}".format(self.gateway, self.login, self.structure_unit_id)
+
+    @property
+    def token(self):
+        """Current auth token, empty if the client is not logged in.
+
+        :rtype: str
+        """
+        token = self.token_store.get(self.token_key)
+        return token.value if token is not None else ""
+
+    def __ensure_token(self):
+        """Returns valid auth token, logins if there is no token yet
+        or it is about to expire.
+
+        Only one caller logs in, others wait and take its token.
+
+        :rtype: str
+        """
+        key = self.token_key
+        token = self.token_store.get(key)
+        if token is not None and not token.expires_within(self.token_refresh_margin):
+            return token.value
+        with self.token_store.lock(key):
+            # another caller may have logged in while we waited for the lock
+            token = self.token_store.get(key)
+            if token is not None and not token.expires_within(self.token_refresh_margin):
+                return token.value
+            return self.auth()
+
+    def __invalidate_token(self, value):
+        """Drops rejected token, unless it has already been replaced.
+
+        :param value: rejected token
+        :type value: str
+        """
+        key = self.token_key
+        with self.token_store.lock(key):
+            token = self.token_store.get(key)
+            if token is not None and token.value == value:
+                self.token_store.delete(key)
 
     def __request(self, endpoint, context):
         """Constructs and executes request.
@@ -80,41 +416,51 @@ class Client:
         headers = {
             "Content-Type": "application/xml",
         }
-        if not is_login_endpoint(endpoint):
-            if not self.token:
-                self.auth()
-            headers["Authorization"] = "Bearer {token}".format(token=self.token)
-        template = request_template(endpoint)
-        if template is None:
-            raise ValueError("Unknown endpoint: {}".format(endpoint))
-        data = self.__prepare_request(template, context)
-        self.sent = data
-        log.info(url)
-        log.info(self.sent)
-        self.recv = None
-        r = requests.post(url, data=data, headers=headers, verify=self.verify_ssl)
-        self.recv = r.content
-        log.info(self.recv)
-        r.raise_for_status()
-        resp = etree.fromstring(self.recv)
-        lxml_remove_namespaces(resp)
-        err = resp.find(".//Error")
-        if err is not None:
-            typ = err.find("./ErrorType").text
-            code = err.find("./Code").text if err.find("./Code") is not None else ""
-            desc = (
-                err.find("./DescText").text.encode("utf-8")
-                if err.find("./DescText") is not None
-                else ""
+        data = _prepare_request(endpoint, context, self.serializer)
+        authorized = not is_login_endpoint(endpoint)
+        retry = authorized
+        while True:
+            if authorized:
+                token = self.__ensure_token()
+                headers["Authorization"] = "Bearer {token}".format(token=token)
+            exchange = Exchange(endpoint, url, data)
+            self._local.exchange = exchange
+            log.info(url)
+            log.info(data)
+            started = time.time()
+            r = self.session.post(
+                url, data=data, headers=headers, verify=self.verify_ssl,
+                stream=self.stream,
             )
-            if code == "MIX-106001":
-                raise NoOrdersToCancel
-            if code == "":
-                code = "UNDEFINED"
-            raise IOError(
-                "{code}: {type}: {desc}".format(code=code, type=typ, desc=desc)
-            )
-        return resp.find(".//Body/AppData/")
+            resp = None
+            try:
+                exchange.status_code = r.status_code
+                if self.stream and r.status_code < 400:
+                    feed = _ResponseFeed(
+                        keep=self.response_cache is not None or log.isEnabledFor(logging.INFO)
+                    )
+                    for chunk in r.iter_content(chunk_size=self.chunk_size):
+                        feed.feed(chunk)
+                    resp = feed.close(exchange)
+                else:
+                    exchange.response = r.content
+                    exchange.size = len(exchange.response)
+            finally:
+                r.close()
+            exchange.elapsed = time.time() - started
+            log.info(exchange.response)
+            if self.on_exchange is not None:
+                self.on_exchange(exchange)
+            if r.status_code == 401 and retry:
+                # token has expired or was revoked, login and retry once
+                retry = False
+                self.__invalidate_token(token)
+                continue
+            break
+        r.raise_for_status()
+        if resp is None:
+            return _parse_response(exchange.response)
+        return _check_response(resp)
 
     def auth(self):
         """Logins to MixVel API.
@@ -129,25 +475,174 @@ class Client:
         }
         resp = self.__request("/api/Accounts/login", context)
         token = resp.find("./Token").text
-        self.token = token
+        self.token_store.set(
+            self.token_key, Token(token, token_expiration(token, self.token_ttl))
+        )
 
         return token
 
-    def air_shopping(self, itinerary, paxes):
+    def air_shopping(
+        self, itinerary, paxes, projection=None, top_k=None, top_key=None,
+    ):
         """Executes air shopping request.
 
+        If the client coalesces requests, concurrent callers with
+        the same itinerary and passengers share one request and get
+        the same `AirShoppingResponse` object, which must not be modified.
+        The same applies to responses returned from the shopping cache.
+
         :param itinerary: itinerary
         :type itinerary: list[Leg]
         :param paxes: paxes
         :type paxes: list[AnonymousPassenger]
+        :param projection: (optional) fields of offers to parse, name of preset,
+            e.g. "summary", or set of field names, see `mixvel._parsers.PROJECTIONS`,
+            defaults to all fields; clients with caches also parse offer expiration
+        :type projection: str or set[str] or None
+        :param top_k: (optional) keep only that many offers with the least
+            `top_key`, the rest are not parsed in full
+        :type top_k: int or None
+        :param top_key: (optional) key of offer summary, defaults to total
+            amount; responses ranked by custom keys are not put in the shopping cache
+        :type top_key: callable or None
         :rtype: AirShoppingResponse
         """
         context = {
             "itinerary": itinerary,
             "paxes": paxes,
         }
-        resp = self.__request("/api/Order/AirShopping", context)
-        return parse_air_shopping_response(resp)
+        options = {"projection": projection, "top_k": top_k, "top_key": top_key}
+        if self.coalescer is None and self.shopping_cache is None and self.response_cache is None:
+            return self.__air_shopping(None, None, context, options)
+        # responses depend on the gateway and agency, caches may be shared by clients
+        key = (self.gateway, self.structure_unit_id) + air_shopping_key(itinerary, paxes)
+        # parsed responses also depend on parse options, raw ones don't
+        shopping_key = key + _projection_key(projection)
+        if top_k is not None:
+            shopping_key += (top_k, top_key)
+        if self.shopping_cache is not None or self.response_cache is not None:
+            options["projection"] = _with_expiration(projection)
+        if self.shopping_cache is not None and top_key is None:
+            cached = self.shopping_cache.get(shopping_key)
+            if cached is not None:
+                return cached
+        if self.coalescer is None:
+            return self.__air_shopping(key, shopping_key, context, options)
+        return self.coalescer.do(
+            shopping_key, lambda: self.__air_shopping(key, shopping_key, context, options)
+        )
+
+    def iter_air_shopping(self, itinerary, paxes, on_data_lists=None, top_k=None, top_key=None):
+        """Executes air shopping request, yielding offers while
+        the response is being downloaded.
+
+        Memory use doesn't grow with the number of offers. The request
+        is sent when iteration starts, caches and coalescing are bypassed.
+
+        :param itinerary: itinerary
+        :type itinerary: list[Leg]
+        :param paxes: paxes
+        :type paxes: list[AnonymousPassenger]
+        :param on_data_lists: (optional) called with `DataLists` of response
+            before the first offer is yielded
+        :type on_data_lists: callable or None
+        :param top_k: (optional) yield only that many offers with the least
+            `top_key` once the response ends, memory use grows with `top_k` only
+        :type top_k: int or None
+        :param top_key: (optional) key of offer summary, defaults to total amount
+        :type top_key: callable or None
+        :rtype: collections.Iterator[Offer]
+        """
+        context = {
+            "itinerary": itinerary,
+            "paxes": paxes,
+        }
+        chunks = self.__stream("/api/Order/AirShopping", context)
+        return iter_offers(chunks, on_data_lists, self.share_prices, top_k, top_key)
+
+    def __stream(self, endpoint, context):
+        """Constructs and executes request, yielding chunks of response
+        as they arrive.
+
+        :param endpoint: method endpoint, e.g. "/api/Order/AirShopping"
+        :type endpoint: str
+        :param context: request variables.
+        :type context: dict
+        :rtype: collections.Iterator[bytes]
+        """
+        url = "{gateway}{endpoint}".format(gateway=self.gateway, endpoint=endpoint)
+        data = _prepare_request(endpoint, context, self.serializer)
+        retry = True
+        while True:
+            token = self.__ensure_token()
+            headers = {
+                "Content-Type": "application/xml",
+                "Authorization": "Bearer {token}".format(token=token),
+            }
+            exchange = Exchange(endpoint, url, data)
+            self._local.exchange = exchange
+            log.info(url)
+            log.info(data)
+            started = time.time()
+            r = self.session.post(
+                url, data=data, headers=headers, verify=self.verify_ssl, stream=True,
+            )
+            try:
+                exchange.status_code = r.status_code
+                keep = log.isEnabledFor(logging.INFO) or r.status_code >= 400
+                chunks = []
+                exchange.size = 0
+                for chunk in r.iter_content(chunk_size=self.chunk_size):
+                    exchange.size += len(chunk)
+                    if keep:
+                        chunks.append(chunk)
+                    if r.status_code < 400:
+                        yield chunk
+                if keep:
+                    exchange.response = b"".join(chunks)
+            finally:
+                r.close()
+            exchange.elapsed = time.time() - started
+            log.info(exchange.response)
+            if self.on_exchange is not None:
+                self.on_exchange(exchange)
+            if r.status_code == 401 and retry:
+                # token has expired or was revoked, login and retry once
+                retry = False
+                self.__invalidate_token(token)
+                continue
+            r.raise_for_status()
+            return
+
+    def __air_shopping(self, key, shopping_key, context, options):
+        content = None
+        raw_key = ("response",) + key if key is not None else None
+        if self.response_cache is not None:
+            content = self.response_cache.get(raw_key)
+        if content is not None:
+            # cached by this or another process, no request to the gateway
+            resp = _parse_response(content)
+            shopping = parse_air_shopping_response(
+                resp, self.share_prices, self.lazy_offers, pool=self.parse_pool, **options
+            )
+            size = len(content)
+        else:
+            resp = self.__request("/api/Order/AirShopping", context)
+            shopping = parse_air_shopping_response(
+                resp, self.share_prices, self.lazy_offers, pool=self.parse_pool, **options
+            )
+            size = self.last_exchange.size
+        # keys of callers' functions are not the same in other processes
+        shopping_cache = self.shopping_cache if options["top_key"] is None else None
+        if shopping_cache is None and self.response_cache is None:
+            return shopping
+        ttl = air_shopping_ttl(shopping)
+        # expiration of offers left out by top-K is unknown
+        if content is None and self.response_cache is not None and options["top_k"] is None:
+            self.response_cache.set(raw_key, self.last_exchange.response, ttl=ttl)
+        if shopping_cache is not None:
+            shopping_cache.set(shopping_key, shopping, ttl=ttl, size=size)
+        return shopping
 
     def create_order(self, selected_offer, paxes):
         """Creates order.
@@ -163,7 +658,7 @@ class Client:
             "paxes": paxes,
         }
         resp = self.__request("/api/Order/Create", context)
-        return parse_order_view_response(resp)
+        return self.__cache_order(parse_order_view_response(resp, self.share_prices))
 
     def retrieve_order(self, mix_order_id):
         """Retrieves order.
@@ -172,12 +667,16 @@ class Client:
         :type mix_order_id: str
         :rtype: OrderViewResponse
         """
+        if self.order_cache is not None:
+            cached = self.order_cache.get(self.__order_key(mix_order_id))
+            if cached is not None:
+                return cached
         context = {
             "mix_order_id": mix_order_id,
         }
         resp = self.__request("/api/Order/Retrieve", context)
 
-        return parse_order_view_response(resp)
+        return self.__cache_order(parse_order_view_response(resp, self.share_prices))
 
     def change_order(self, mix_order_id, amount):
         """Issues tickets.
@@ -191,9 +690,11 @@ class Client:
             "mix_order_id": mix_order_id,
             "amount": amount,
         }
+        # the order is changing, its cached view must not outlive a failed request
+        self.__forget_order(mix_order_id)
         resp = self.__request("/api/Order/Change", context)
 
-        return parse_order_view_response(resp)
+        return self.__cache_order(parse_order_view_response(resp, self.share_prices))
 
     def cancel_order(self, mix_order_id):
         """Cancels order.
@@ -205,5 +706,28 @@ class Client:
         context = {
             "mix_order_id": mix_order_id,
         }
-        resp = self.__request("/api/Order/Cancel", context)
+        try:
+            resp = self.__request("/api/Order/Cancel", context)
+        finally:
+            self.__forget_order(mix_order_id)
         return is_cancel_success(resp)
+
+    def __order_key(self, mix_order_id):
+        return "order", self.gateway, self.structure_unit_id, mix_order_id
+
+    def __cache_order(self, view):
+        """Caches order view, if the client has order cache.
+
+        :type view: OrderViewResponse
+        :rtype: OrderViewResponse
+        """
+        if self.order_cache is not None:
+            self.order_cache.set(
+                self.__order_key(view.mix_order.mix_order_id), view,
+                ttl=self.order_ttl, size=self.last_exchange.size,
+            )
+        return view
+
+    def __forget_order(self, mix_order_id):
+        if self.order_cache is not None:
+            self.order_cache.delete(self.__order_key(mix_order_id))
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""
+mixvel.coalescing
+~~~~~~~~~~~~~~
+This module provides coalescing of identical in-flight requests.
+"""
+
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs one call per key at a time, concurrent callers
+    with the same key wait for it and share its result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0  # calls actually made
+        self.coalesced = 0  # calls served by a call of another caller
+
+    def do(self, key, fn):
+        """Calls `fn` or joins the in-flight call with the same key.
+
+        :param key: hashable key of the call
+        :param fn: function without arguments
+        :type fn: callable
+        :return: result of `fn`, errors are raised to all callers
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as e:  # followers must not get None for interrupts either
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
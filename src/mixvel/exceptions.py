@@ -1,3 +1,48 @@
-class NoOrdersToCancel(IOError):
+class MixvelError(IOError):
+    """MixVel API returned an error."""
+
+    def __init__(self, code="UNDEFINED", error_type=None, desc=None):
+        """
+        :param code: error code, e.g. "MIX-106001"
+        :type code: str
+        :param error_type: error type, e.g. "BadRequest"
+        :type error_type: str or None
+        :param desc: error description
+        :type desc: str or None
+        """
+        self.code = code
+        self.error_type = error_type
+        self.desc = desc
+        if desc is None:
+            desc = ""
+        elif not isinstance(desc, str):  # unicode on Python 2
+            desc = desc.encode("utf-8")
+        IOError.__init__(
+            self, "{code}: {type}: {desc}".format(code=code, type=error_type, desc=desc)
+        )
+
+
+class AuthenticationFailed(MixvelError):
+    """Login or password is invalid."""
+    pass
+
+
+class NoOrdersToCancel(MixvelError):
     """There are no orders available for cancellation in the Mix Order."""
     pass
+
+
+errors = {
+    "MIX-101002": AuthenticationFailed,
+    "MIX-106001": NoOrdersToCancel,
+}
+
+
+def error_class(code):
+    """Returns exception class for MixVel error code.
+
+    :param code: error code, e.g. "MIX-106001"
+    :type code: str
+    :rtype: type
+    """
+    return errors.get(code, MixvelError)
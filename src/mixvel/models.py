@@ -9,8 +9,83 @@ This module contains the primary objects.
 
 import datetime
 
+_fields = {}  # model class: names of its fields, private slots excluded
+
+
+class _Unloaded(object):
+    __slots__ = ()
+
+    def __repr__(self):
+        return "UNLOADED"
+
+    def __reduce__(self):
+        return "UNLOADED"  # the module global, pickles stay singletons
+
+
+UNLOADED = _Unloaded()  # value of a field left out by parsing projection
+
+
+def _field_names(cls):
+    names = _fields.get(cls)
+    if names is None:
+        names = []
+        for klass in reversed(cls.__mro__):
+            names.extend(
+                name for name in klass.__dict__.get("__slots__", ())
+                if not name.startswith("_")
+            )
+        names = _fields[cls] = tuple(names)
+    return names
+
+
+class Model(object):
+    """Base of models.
+
+    Models keep fields in `__slots__` instead of a per-instance `__dict__`,
+    compare by value and are picklable with any protocol. They are mutable
+    and cached responses are shared, so they hash by identity: equal
+    models are different keys of sets and dicts.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def _model(cls):
+        """Returns model class instances are compared as, subclasses
+        which only change how fields are loaded return their base."""
+        return cls
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in _field_names(type(self)))
+
+    def __eq__(self, other):
+        if not isinstance(other, Model) or self._model() is not other._model():
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = object.__hash__  # Python 3 drops it when `__eq__` is defined
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, ", ".join(
+            "{}={!r}".format(name, value)
+            for name, value in zip(_field_names(type(self)), self._values())
+        ))
+
+    def __getstate__(self):
+        return self._values()
+
+    def __setstate__(self, state):
+        for name, value in zip(_field_names(type(self)), state):
+            setattr(self, name, value)
+
+
+class AirShoppingResponse(Model):
+    __slots__ = ("offers", "data_lists", "_offer_table")
 
-class AirShoppingResponse:
     def __init__(self, offers, data_lists):
         """Air Shopping Response
         
@@ -22,8 +97,23 @@ class AirShoppingResponse:
         self.offers = offers
         self.data_lists = data_lists
 
+    @property
+    def offer_table(self):
+        """Columnar view of offers, built on first access, requires `numpy`.
+
+        :rtype: mixvel.table.OfferTable
+        """
+        try:
+            return self._offer_table
+        except AttributeError:
+            from .table import OfferTable  # numpy is optional
+            self._offer_table = OfferTable(self.offers, self.data_lists)
+            return self._offer_table
+
+
+class OrderViewResponse(Model):
+    __slots__ = ("mix_order", "data_lists", "ticket_doc_info")
 
-class OrderViewResponse:
     def __init__(self, mix_order, data_lists, ticket_doc_info=None):
         """Order View Response.
         
@@ -39,7 +129,9 @@ class OrderViewResponse:
         self.ticket_doc_info = ticket_doc_info
 
 
-class Amount:
+class Amount(Model):
+    __slots__ = ("amount", "cur_code")
+
     def __init__(self, amount, cur_code):
         """Amount.
 
@@ -52,7 +144,9 @@ class Amount:
         self.cur_code = cur_code
 
 
-class AnonymousPassenger:
+class AnonymousPassenger(Model):
+    __slots__ = ("pax_id", "ptc")
+
     def __init__(self, pax_id, ptc):
         """Anonymous passenger.
 
@@ -65,7 +159,9 @@ class AnonymousPassenger:
         self.ptc = ptc
 
 
-class Booking:
+class Booking(Model):
+    __slots__ = ("booking_id", "booking_entity", "booking_ref_type_code")
+
     def __init__(self, booking_id, entity=None, type_code=None):
         """Booking.
 
@@ -81,7 +177,9 @@ class Booking:
         self.booking_ref_type_code = type_code
 
 
-class BookingEntity:
+class BookingEntity(Model):
+    __slots__ = ("carrier",)
+
     def __init__(self, carrier=None):
         """BookingEntity.
         
@@ -92,7 +190,9 @@ class BookingEntity:
         # self.org = org  # Mixvel.Api.Schema.Models.OrgType
 
 
-class Carrier:
+class Carrier(Model):
+    __slots__ = ("airline_desig_code", "mixvel_airline_id")
+
     def __init__(self, airline_desig_code=None, mixvel_airline_id=None):
         """Carrier.
 
@@ -105,7 +205,9 @@ class Carrier:
         self.mixvel_airline_id = mixvel_airline_id
 
 
-class Coupon:
+class Coupon(Model):
+    __slots__ = ("coupon_number", "fare_basis_code", "pax_segment_ref_ids")
+
     def __init__(self, coupon_number,
         fare_basis_code=None, pax_segment_ref_ids=None):
         """Coupon.
@@ -122,7 +224,14 @@ class Coupon:
         self.pax_segment_ref_ids = pax_segment_ref_ids
 
 
-class DataLists:
+class DataLists(Model):
+    __slots__ = (
+        "origin_dest_list",
+        "pax_journey_list",
+        "pax_segment_list",
+        "validating_party_list",
+    )
+
     def __init__(self, origin_dest_list=None, pax_journey_list=None, pax_segment_list=None,
         validating_party_list=None):
         """Data lists.
@@ -142,7 +251,9 @@ class DataLists:
         self.validating_party_list = validating_party_list
 
 
-class DatedMarketingSegment:
+class DatedMarketingSegment(Model):
+    __slots__ = ("carrier_desig_code", "marketing_carrier_flight_number_text")
+
     def __init__(self, carrier_desig_code, marketing_carrier_flight_number_text):
         """Dated marketing segment.
         
@@ -156,7 +267,7 @@ class DatedMarketingSegment:
             = marketing_carrier_flight_number_text
 
 
-class FareComponent:
+class FareComponent(Model):
     """Fare component.
     :param fare_basis_code: fare basis code
     :type fare_basis_code: str
@@ -167,6 +278,8 @@ class FareComponent:
     :param pax_segment_ref_id: passenger segment reference id
     :type pax_segment_ref_id: str
     """
+    __slots__ = ("fare_basis_code", "rbd", "price", "pax_segment_ref_id")
+
     def __init__(self, fare_basis_code, rbd, price, pax_segment_ref_id):
         self.fare_basis_code = fare_basis_code
         self.rbd = rbd
@@ -174,7 +287,9 @@ class FareComponent:
         self.pax_segment_ref_id = pax_segment_ref_id
 
 
-class FareDetail:
+class FareDetail(Model):
+    __slots__ = ("fare_components", "pax_ref_id")
+
     def __init__(self, fare_components, pax_ref_id):
         """Fare.
 
@@ -187,7 +302,9 @@ class FareDetail:
         self.pax_ref_id = pax_ref_id
 
 
-class IdentityDocument:
+class IdentityDocument(Model):
+    __slots__ = ("doc_id", "type_code", "issuing_country_code", "expiry_date")
+
     def __init__(self, doc_id, type_code, issuing_country_code, expiry_date):
         """Identity document.
 
@@ -206,7 +323,9 @@ class IdentityDocument:
         self.expiry_date = expiry_date
 
 
-class Individual:
+class Individual(Model):
+    __slots__ = ("given_name", "middle_name", "surname", "gender", "birthdate")
+
     def __init__(self, given_name, middle_name, surname,
                  gender, birthdate):
         """Individual.
@@ -229,7 +348,9 @@ class Individual:
         self.birthdate = birthdate
 
 
-class Leg:
+class Leg(Model):
+    __slots__ = ("origin", "destination", "departure", "cabin")
+
     def __init__(self, origin, destination, departure,
                  cabin="Economy"):
         """Flight leg.
@@ -249,7 +370,9 @@ class Leg:
         self.cabin = cabin
 
 
-class MixOrder:
+class MixOrder(Model):
+    __slots__ = ("mix_order_id", "orders", "total_amount")
+
     def __init__(self, mix_order_id, orders, total_amount):
         """MixOrder.
 
@@ -265,7 +388,16 @@ class MixOrder:
         self.total_amount = total_amount
 
 
-class Offer:
+class Offer(Model):
+    __slots__ = (
+        "offer_id",
+        "offer_items",
+        "owner_code",
+        "offer_expiration_timelimit_datetime",
+        "ticket_docs_count",
+        "total_price",
+    )
+
     def __init__(self, offer_id, offer_items, owner_code, offer_expiration_timelimit_datetime,
         ticket_docs_count=None, total_price=None):
         """Offer.
@@ -291,7 +423,9 @@ class Offer:
         self.total_price = total_price
 
 
-class OfferItem:
+class OfferItem(Model):
+    __slots__ = ("offer_item_id", "price", "services", "fare_details")
+
     def __init__(self, offer_item_id, price, services,
                  fare_details=None):
         """Offer item.
@@ -311,7 +445,9 @@ class OfferItem:
         self.fare_details = fare_details
 
 
-class Order:
+class Order(Model):
+    __slots__ = ("order_id", "booking_refs", "order_items", "total_price")
+
     def __init__(self, order_id, booking_refs, order_items, total_price):
         """Order.
         
@@ -330,7 +466,9 @@ class Order:
         self.total_price = total_price
 
 
-class OrderItem:
+class OrderItem(Model):
+    __slots__ = ("order_item_id", "fare_details", "price")
+
     def __init__(self, order_item_id, fare_details, price):
         """Order item.
 
@@ -346,7 +484,9 @@ class OrderItem:
         self.price = price
 
 
-class OriginDest:
+class OriginDest(Model):
+    __slots__ = ("origin_code", "dest_code", "origin_dest_id", "pax_journey_ref_ids")
+
     def __init__(self, origin_code, dest_code,
         origin_dest_id=None, pax_journey_ref_ids=None):
         """OriginDest.
@@ -367,6 +507,8 @@ class OriginDest:
 
 
 class Passenger(AnonymousPassenger):
+    __slots__ = ("individual", "doc", "phone", "email")
+
     def __init__(self, pax_id, ptc, individual, doc,
                  phone=None, email=None):
         """Passenger.
@@ -391,7 +533,9 @@ class Passenger(AnonymousPassenger):
         self.email = email
 
 
-class PaxJourney:
+class PaxJourney(Model):
+    __slots__ = ("pax_journey_id", "pax_segment_ref_ids")
+
     def __init__(self, pax_journey_id, pax_segment_ref_ids):
         """PaxJourney.
         
@@ -404,7 +548,15 @@ class PaxJourney:
         self.pax_segment_ref_ids = pax_segment_ref_ids
 
 
-class PaxSegment:
+class PaxSegment(Model):
+    __slots__ = (
+        "pax_segment_id",
+        "dep",
+        "arrival",
+        "marketing_carrier_info",
+        "duration",
+    )
+
     def __init__(self, pax_segment_id, dep, arrival, marketing_carrier_info,
         duration=None):
         """PaxSegment.
@@ -427,7 +579,9 @@ class PaxSegment:
         self.duration = duration  # FIXME: return timdedelta
 
 
-class Price:
+class Price(Model):
+    __slots__ = ("tax_summary", "total_amount")
+
     def __init__(self, tax_summary, total_amount):
         """Price.
         
@@ -449,7 +603,9 @@ class Price:
         self.total_amount = total_amount
 
 
-class RbdAvail:
+class RbdAvail(Model):
+    __slots__ = ("rbd_code", "availability")
+
     def __init__(self, rbd_code, availability=None):
         """RBD Availability.
 
@@ -462,7 +618,9 @@ class RbdAvail:
         self.availability = availability
 
 
-class SelectedOffer:
+class SelectedOffer(Model):
+    __slots__ = ("offer_ref_id", "selected_offer_items")
+
     def __init__(self, offer_ref_id, selected_offer_items):
         """Selected offer.
 
@@ -475,7 +633,9 @@ class SelectedOffer:
         self.selected_offer_items = selected_offer_items
 
 
-class SelectedOfferItem:
+class SelectedOfferItem(Model):
+    __slots__ = ("offer_item_ref_id", "pax_ref_ids")
+
     def __init__(self, offer_item_ref_id, pax_ref_ids):
         """Selected offer item.
         
@@ -488,7 +648,16 @@ class SelectedOfferItem:
         self.pax_ref_ids = pax_ref_ids
 
 
-class Service:
+class Service(Model):
+    __slots__ = (
+        "service_id",
+        "pax_ref_ids",
+        "service_associations",
+        "validating_party_ref_id",
+        "validating_party_type",
+        "pax_types",
+    )
+
     def __init__(self, service_id, pax_ref_ids, service_associations,
                  validating_party_ref_id=None, validating_party_type=None, pax_types=None):
         """Service.
@@ -514,7 +683,9 @@ class Service:
         self.pax_types = pax_types
 
 
-class ServiceOfferAssociations:
+class ServiceOfferAssociations(Model):
+    __slots__ = ("pax_journey_ref_ids", "pax_segment_ref_ids")
+
     def __init__(self, pax_journey_ref_ids=None, pax_segment_ref_ids=None):
         """ServiceOfferAssociations.
 
@@ -527,7 +698,9 @@ class ServiceOfferAssociations:
         self.pax_segment_ref_ids = pax_segment_ref_ids
 
 
-class Tax:
+class Tax(Model):
+    __slots__ = ("amount", "tax_code")
+
     def __init__(self, amount, tax_code):
         """Tax.
         
@@ -540,7 +713,9 @@ class Tax:
         self.tax_code = tax_code
 
 
-class TaxSummary:
+class TaxSummary(Model):
+    __slots__ = ("taxes", "total_tax_amount")
+
     def __init__(self, taxes,
         total_tax_amount=None):
         """TaxSummary.
@@ -554,7 +729,9 @@ class TaxSummary:
         self.total_tax_amount = total_tax_amount
 
 
-class Ticket:
+class Ticket(Model):
+    __slots__ = ("coupons", "ticket_number")
+
     def __init__(self, coupons, ticket_number):
         """Ticket.
         
@@ -567,7 +744,9 @@ class Ticket:
         self.ticket_number = ticket_number
 
 
-class TicketDocInfo:
+class TicketDocInfo(Model):
+    __slots__ = ("pax_ref_id", "tickets")
+
     def __init__(self, pax_ref_id, tickets):
         """TicketDocInfo.
 
@@ -580,7 +759,9 @@ class TicketDocInfo:
         self.tickets = tickets
 
 
-class TransportDepArrival:
+class TransportDepArrival(Model):
+    __slots__ = ("iata_location_code", "scheduled_date_time")
+
     def __init__(self, iata_location_code, scheduled_date_time):
         """TransportDepArrival.
         
@@ -593,7 +774,9 @@ class TransportDepArrival:
         self.scheduled_date_time = scheduled_date_time
 
 
-class ValidatingParty:
+class ValidatingParty(Model):
+    __slots__ = ("validating_party_id", "validating_party_code")
+
     def __init__(self, validating_party_id, validating_party_code):
         """Validating party.
         
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+"""
+mixvel.table
+~~~~~~~~~~~~~~
+This module provides columnar view of air shopping offers.
+
+Offers are filtered, sorted and grouped with vectorized NumPy operations
+instead of Python loops. Requires `numpy`, install with `pip install mixvel[table]`.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .models import UNLOADED
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+MISSING = -1  # value of integer columns which could not be read
+
+
+class OfferTable:
+    def __init__(self, offers, data_lists=None):
+        """Columns of air shopping offers.
+
+        Columns are NumPy arrays, element `i` describes `offers[i]`:
+
+        * `total_amount`: total price in minor units, int64
+        * `cur_code`: index of currency code in `currencies`, int32
+        * `owner_code`: index of owner code in `owners`, int32
+        * `expiration`: offer expiration in UTC, datetime64[s]
+        * `segment_count`: number of flight segments, int32
+        * `stop_count`: number of stops, that is segments beyond
+          the first one of every journey, int32
+
+        Integer values which are missing or left out by projection are
+        `MISSING`, such expirations are NaT and such codes point to None.
+
+        :param offers: offers, may be lazy
+        :type offers: list[Offer]
+        :param data_lists: (optional) data lists of response, used to count stops
+        :type data_lists: DataLists or None
+        """
+        if np is None:
+            raise ImportError(
+                "OfferTable requires numpy, install it with `pip install mixvel[table]`"
+            )
+        self.offers = offers
+        journeys = {}  # segment id: journey id
+        if data_lists is not None:
+            for journey in data_lists.pax_journey_list or []:
+                for segment_id in journey.pax_segment_ref_ids:
+                    journeys[segment_id] = journey.pax_journey_id
+        currencies = {}  # code: index
+        owners = {}
+        count = len(offers)
+        self.total_amount = np.full(count, MISSING, dtype=np.int64)
+        self.cur_code = np.zeros(count, dtype=np.int32)
+        self.owner_code = np.zeros(count, dtype=np.int32)
+        self.expiration = np.full(count, "NaT", dtype="datetime64[s]")
+        self.segment_count = np.full(count, MISSING, dtype=np.int32)
+        self.stop_count = np.full(count, MISSING, dtype=np.int32)
+        for i, offer in enumerate(offers):
+            amount = _total_amount(offer)
+            if amount is not None:
+                self.total_amount[i] = amount.amount
+                self.cur_code[i] = currencies.setdefault(amount.cur_code, len(currencies))
+            else:
+                self.cur_code[i] = currencies.setdefault(None, len(currencies))
+            owner_code = offer.owner_code
+            if owner_code is UNLOADED:
+                owner_code = None
+            self.owner_code[i] = owners.setdefault(owner_code, len(owners))
+            expiration = offer.offer_expiration_timelimit_datetime
+            if expiration is not None and expiration is not UNLOADED:
+                self.expiration[i] = np.datetime64(expiration, "s")
+            segments = _segments(offer, data_lists)
+            if segments is not None:
+                self.segment_count[i] = len(segments)
+                self.stop_count[i] = len(segments) - len(
+                    set(journeys.get(segment_id, segment_id) for segment_id in segments)
+                )
+        self.currencies = _categories(currencies)
+        self.owners = _categories(owners)
+
+    def __len__(self):
+        return len(self.offers)
+
+    def filter(self, owner_code=None, cur_code=None, min_amount=None, max_amount=None,
+               expires_after=None, max_segments=None, max_stops=None):
+        """Returns indices of offers which match all given conditions.
+
+        :param owner_code: (optional) owner code
+        :type owner_code: str or None
+        :param cur_code: (optional) currency code
+        :type cur_code: str or None
+        :param min_amount: (optional) min total amount, in minor units
+        :type min_amount: int or None
+        :param max_amount: (optional) max total amount, in minor units
+        :type max_amount: int or None
+        :param expires_after: (optional) offers expiring later, in UTC
+        :type expires_after: datetime.datetime or None
+        :param max_segments: (optional) max number of segments
+        :type max_segments: int or None
+        :param max_stops: (optional) max number of stops
+        :type max_stops: int or None
+        :rtype: numpy.ndarray
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if owner_code is not None:
+            mask &= self.owner_code == _index(self.owners, owner_code)
+        if cur_code is not None:
+            mask &= self.cur_code == _index(self.currencies, cur_code)
+        if min_amount is not None:
+            mask &= self.total_amount >= min_amount
+        if max_amount is not None:
+            mask &= (self.total_amount <= max_amount) & (self.total_amount != MISSING)
+        if expires_after is not None:
+            mask &= self.expiration > np.datetime64(expires_after, "s")
+        if max_segments is not None:
+            mask &= (self.segment_count <= max_segments) & (self.segment_count != MISSING)
+        if max_stops is not None:
+            mask &= (self.stop_count <= max_stops) & (self.stop_count != MISSING)
+        return np.flatnonzero(mask)
+
+    def sort(self, by="total_amount", indices=None, descending=False):
+        """Returns indices of offers ordered by columns, ties keep
+        the order of response. Missing values come last in both directions.
+
+        :param by: (optional) column name or list of names, the first
+            is the primary key, defaults to "total_amount"
+        :type by: str or list[str]
+        :param indices: (optional) offers to sort, e.g. returned by `filter`,
+            defaults to all offers
+        :type indices: numpy.ndarray or None
+        :param descending: (optional) defaults to False
+        :type descending: bool
+        :rtype: numpy.ndarray
+        """
+        names = [by] if isinstance(by, string_types) else list(by)
+        if indices is None:
+            indices = np.arange(len(self))
+        keys = []
+        for name in reversed(names):  # lexsort takes the primary key last
+            column = getattr(self, name)[indices]
+            keys.append(_descending(column) if descending else column)
+            keys.append(_missing(column))
+        return indices[np.lexsort(keys)]
+
+    def group_by(self, by, indices=None):
+        """Groups offers by column values.
+
+        :param by: column name, e.g. "owner_code" or "stop_count"
+        :type by: str
+        :param indices: (optional) offers to group, e.g. returned by `filter`,
+            defaults to all offers
+        :type indices: numpy.ndarray or None
+        :return: indices of offers by column value, codes for `owner_code`
+            and `cur_code`, groups keep the order of indices
+        :rtype: dict
+        """
+        if indices is None:
+            indices = np.arange(len(self))
+        column = getattr(self, by)[indices]
+        values, inverse = np.unique(column, return_inverse=True)
+        order = np.argsort(inverse, kind="mergesort")
+        bounds = np.cumsum(np.bincount(inverse, minlength=len(values)))[:-1]
+        labels = {"owner_code": self.owners, "cur_code": self.currencies}.get(by)
+        groups = {}
+        for value, group in zip(values, np.split(indices[order], bounds)):
+            groups[labels[value] if labels is not None else value.item()] = group
+        return groups
+
+    def take(self, indices):
+        """Returns offers by indices, lazy offers are parsed only when
+        their fields are read.
+
+        :type indices: numpy.ndarray or list[int]
+        :rtype: list[Offer]
+        """
+        return [self.offers[i] for i in indices]
+
+
+def _total_amount(offer):
+    price = offer.total_price
+    if price is None or price is UNLOADED or price.total_amount is None:
+        return None
+    return price.total_amount
+
+
+def _segments(offer, data_lists):
+    """Returns ids of segments the offer flies, None if its services were not parsed."""
+    if offer.offer_items is UNLOADED:
+        return None
+    segments = set()
+    journeys = set()
+    for item in offer.offer_items:
+        if item.services is UNLOADED:
+            return None
+        for service in item.services:
+            associations = service.service_associations
+            if associations is not None:
+                segments.update(associations.pax_segment_ref_ids)
+                journeys.update(associations.pax_journey_ref_ids)
+    if journeys and data_lists is not None:
+        for journey in data_lists.pax_journey_list or []:
+            if journey.pax_journey_id in journeys:
+                segments.update(journey.pax_segment_ref_ids)
+    return segments
+
+
+def _categories(indices):
+    categories = [None] * len(indices)
+    for code, index in indices.items():
+        categories[index] = code
+    return categories
+
+
+def _index(categories, code):
+    try:
+        return categories.index(code)
+    except ValueError:
+        return MISSING  # matches no offer
+
+
+def _missing(column):
+    if column.dtype.kind == "M":  # datetime64
+        return np.isnat(column)
+    return column == MISSING
+
+
+def _descending(key):
+    if key.dtype.kind == "M":  # datetime64
+        key = key.astype(np.int64)
+    return -key
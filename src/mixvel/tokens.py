@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+"""
+mixvel.tokens
+~~~~~~~~~~~~~~
+This module provides stores for MixVel API auth tokens.
+
+A store is shared by clients with the same credentials, in one process
+(`MemoryTokenStore`) or across worker processes (`FileTokenStore`),
+so they reuse one token instead of logging in one by one.
+"""
+
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+DEFAULT_TOKEN_TTL = 3600  # seconds, used when token has no `exp` claim
+
+
+class Token:
+    def __init__(self, value, expires_at):
+        """Auth token.
+
+        :param value: token
+        :type value: str
+        :param expires_at: expiration time, unix timestamp
+        :type expires_at: float
+        """
+        self.value = value
+        self.expires_at = expires_at
+
+    def expires_within(self, seconds):
+        """Checks if token expires in the given number of seconds.
+
+        :type seconds: float
+        :rtype: bool
+        """
+        return self.expires_at - seconds <= time.time()
+
+
+def token_expiration(value, default_ttl=DEFAULT_TOKEN_TTL):
+    """Returns token expiration time.
+
+    Takes `exp` claim if the token is a JWT, otherwise counts
+    `default_ttl` from now.
+
+    :param value: token
+    :type value: str
+    :param default_ttl: (optional) token lifetime in seconds
+    :type default_ttl: float
+    :return: unix timestamp
+    :rtype: float
+    """
+    try:
+        payload = value.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(str(payload)).decode("utf-8"))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return time.time() + default_ttl
+
+
+class TokenStore:
+    """Base class of token stores.
+
+    Stores are keyed by credentials, see `Client.token_key`.
+    """
+
+    def get(self, key):
+        """Returns stored token.
+
+        :type key: str
+        :rtype: Token or None
+        """
+        raise NotImplementedError
+
+    def set(self, key, token):
+        """Stores token.
+
+        :type key: str
+        :type token: Token
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Deletes stored token, if any.
+
+        :type key: str
+        """
+        raise NotImplementedError
+
+    def lock(self, key):
+        """Returns context manager guarding token refresh,
+        only one holder at a time logs in.
+
+        :type key: str
+        """
+        raise NotImplementedError
+
+
+class MemoryTokenStore(TokenStore):
+    """Keeps tokens in process memory, shared by threads."""
+
+    def __init__(self):
+        self._tokens = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def get(self, key):
+        return self._tokens.get(key)
+
+    def set(self, key, token):
+        self._tokens[key] = token
+
+    def delete(self, key):
+        self._tokens.pop(key, None)
+
+    def lock(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+
+class FileTokenStore(TokenStore):
+    def __init__(self, path):
+        """Keeps tokens on disk, shared by worker processes.
+
+        Refresh is serialized with `flock`, so only one process logs in.
+
+        :param path: directory of token files, created if missing
+        :type path: str
+        """
+        if fcntl is None:
+            raise ImportError("FileTokenStore requires fcntl, it is not available")
+        self.path = path
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self._memory = MemoryTokenStore()
+
+    def _filename(self, key, suffix):
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, name + suffix)
+
+    def get(self, key):
+        try:
+            with open(self._filename(key, ".json")) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+        return Token(data["token"], data["expires_at"])
+
+    def set(self, key, token):
+        fd, tmp = tempfile.mkstemp(dir=self.path)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"token": token.value, "expires_at": token.expires_at}, f)
+        os.rename(tmp, self._filename(key, ".json"))  # atomic on POSIX
+
+    def delete(self, key):
+        try:
+            os.remove(self._filename(key, ".json"))
+        except OSError:
+            pass
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        # flock serializes processes, the in-memory lock serializes threads
+        with self._memory.lock(key):
+            with open(self._filename(key, ".lock"), "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+default_token_store = MemoryTokenStore()
@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+
+import pytest
+
+from .test_client import ITINERARY, RESPONSES, SHOPPING_PAXES
+from .utils import here
+from mixvel import _parsers, aio as aio_module
+from mixvel.cache import DiskCache, TTLCache
+from mixvel.exceptions import AuthenticationFailed, NoOrdersToCancel
+from mixvel.models import UNLOADED
+from mixvel.tokens import FileTokenStore, MemoryTokenStore, Token
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from mixvel.aio import AsyncClient, AsyncSingleFlight  # noqa: E402
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class FakeContent:
+    def __init__(self, content):
+        self.content = content
+
+    def iter_chunked(self, n):
+        return FakeChunks([self.content[i:i + n] for i in range(0, len(self.content), n)])
+
+
+class FakeChunks:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.chunks:
+            raise StopAsyncIteration
+        return self.chunks.pop(0)
+
+
+class FakeAsyncResponse:
+    def __init__(self, content, status=200):
+        self.content = FakeContent(content)
+        self.status = status
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def read(self):
+        return self.content.content
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(None, (), status=self.status)
+
+
+class FakeAsyncSession:
+    """aiohttp session stub replaying saved responses, keyed by endpoint."""
+
+    def __init__(self, responses, delay=0, statuses=None):
+        self.responses = responses
+        self.delay = delay
+        self.statuses = statuses or {}  # endpoint: error statuses to reply first
+        self.calls = []
+        self.closed = False
+
+    def post(self, url, data=None, headers=None, ssl=None):
+        self.calls.append((url, data, headers))
+        return _FakePost(self, url)
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakePost:
+    def __init__(self, session, url):
+        self.session = session
+        self.url = url
+
+    async def __aenter__(self):
+        session = self.session
+        await asyncio.sleep(session.delay)
+        endpoint = self.url[self.url.index("/api/"):]
+        if session.statuses.get(endpoint):
+            return FakeAsyncResponse(b"", status=session.statuses[endpoint].pop(0))
+        with open(os.path.join(here, session.responses[endpoint]), "rb") as f:
+            return FakeAsyncResponse(f.read())
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class FakePool:
+    """Process pool stub mapping in the calling thread."""
+
+    def __init__(self):
+        self.threads = []
+
+    def map(self, fn, iterable):
+        self.threads.append(threading.get_ident())
+        return list(map(fn, iterable))
+
+
+def endpoints(session):
+    return [c[0][c[0].index("/api/"):] for c in session.calls]
+
+
+class TestAsyncSingleFlight:
+    def test_do(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return object()
+
+        async def main():
+            return await asyncio.gather(*[flight.do("key", fn) for _ in range(5)])
+
+        results = run(main())
+        assert len(set(map(id, results))) == 1
+        assert len(calls) == 1
+        assert (flight.calls, flight.coalesced) == (1, 4)
+        assert flight._calls == {}
+
+    def test_error(self):
+        flight = AsyncSingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ValueError("failed")
+
+        async def main():
+            return await asyncio.gather(
+                *[flight.do("key", fn) for _ in range(3)], return_exceptions=True
+            )
+
+        errors = run(main())
+        assert all(isinstance(e, ValueError) for e in errors)
+        assert flight.calls == 1
+
+
+class TestAsyncClient:
+    def test_shared_session(self):
+        session = FakeAsyncSession(RESPONSES)
+
+        async def main():
+            async with AsyncClient("login", "password", "unit", session=session,
+                                   token_store=MemoryTokenStore()) as client:
+                await client.retrieve_order("00001-210317-MA1234")
+
+        run(main())
+        assert endpoints(session) == ["/api/Accounts/login", "/api/Order/Retrieve"]
+        assert session.calls[1][2]["Authorization"] == "Bearer c2VjcmV0LXRva2Vu"
+        assert not session.closed
+
+    def test_concurrent_auth(self):
+        session = FakeAsyncSession(RESPONSES, delay=0.01)
+        client = AsyncClient("login", "password", "unit", session=session,
+                             token_store=MemoryTokenStore())
+
+        async def main():
+            await asyncio.gather(
+                *[client.cancel_order("MIX-{}".format(n)) for n in range(8)]
+            )
+
+        run(main())
+        assert endpoints(session).count("/api/Accounts/login") == 1
+        assert len(session.calls) == 9
+
+    @pytest.mark.parametrize("file_store", [False, True])
+    def test_shared_token_store(self, file_store, tmpdir):
+        session = FakeAsyncSession(RESPONSES)
+        store = FileTokenStore(str(tmpdir)) if file_store else MemoryTokenStore()
+        for _ in range(3):
+            client = AsyncClient("login", "password", "unit", session=session,
+                                 token_store=store)
+            run(client.cancel_order("00001-210317-MA1234"))
+        assert endpoints(session).count("/api/Accounts/login") == 1
+        assert client.token == "c2VjcmV0LXRva2Vu"
+
+    def test_token_refresh_before_expiration(self):
+        session = FakeAsyncSession(RESPONSES)
+        store = MemoryTokenStore()
+        client = AsyncClient("login", "password", "unit", session=session, token_store=store,
+                             token_refresh_margin=60)
+        store.set(client.token_key, Token("old", time.time() + 30))
+        run(client.cancel_order("00001-210317-MA1234"))
+        assert endpoints(session) == ["/api/Accounts/login", "/api/Order/Cancel"]
+        assert session.calls[1][2]["Authorization"] == "Bearer c2VjcmV0LXRva2Vu"
+
+    def test_reauth_on_unauthorized(self):
+        session = FakeAsyncSession(RESPONSES, statuses={"/api/Order/Cancel": [401]})
+        store = MemoryTokenStore()
+        client = AsyncClient("login", "password", "unit", session=session, token_store=store)
+        store.set(client.token_key, Token("revoked", time.time() + 3600))
+        assert run(client.cancel_order("00001-210317-MA1234"))
+        assert endpoints(session) == [
+            "/api/Order/Cancel", "/api/Accounts/login", "/api/Order/Cancel",
+        ]
+        assert client.token == "c2VjcmV0LXRva2Vu"
+        # retried only once
+        session.statuses["/api/Order/Cancel"] = [401, 401]
+        with pytest.raises(aiohttp.ClientResponseError) as e:
+            run(client.cancel_order("00001-210317-MA1234"))
+        assert e.value.status == 401
+        assert endpoints(session)[3:] == [
+            "/api/Order/Cancel", "/api/Accounts/login", "/api/Order/Cancel",
+        ]
+
+    def test_concurrent_unauthorized(self, tmpdir):
+        calls = 12
+        session = FakeAsyncSession(
+            RESPONSES, statuses={"/api/Order/Retrieve": [401] * 2 * calls}
+        )
+        client = AsyncClient("login", "password", "unit", session=session,
+                             token_store=FileTokenStore(str(tmpdir)))
+
+        async def main():
+            asyncio.get_event_loop().set_default_executor(
+                concurrent.futures.ThreadPoolExecutor(max_workers=2)
+            )
+            return await asyncio.wait_for(asyncio.gather(*[
+                client.retrieve_order("00001-210317-MA1234") for _ in range(calls)
+            ], return_exceptions=True), timeout=10)
+
+        errors = run(main())
+        assert all(isinstance(e, aiohttp.ClientResponseError) for e in errors)
+        assert [e.status for e in errors] == [401] * calls
+
+    def test_auth_error(self):
+        responses = dict(RESPONSES)
+        responses["/api/Accounts/login"] = "responses/accounts/login_error.xml"
+        client = AsyncClient("login", "password", "unit", session=FakeAsyncSession(responses),
+                             token_store=MemoryTokenStore())
+        with pytest.raises(AuthenticationFailed):
+            run(client.retrieve_order("00001-210317-MA1234"))
+
+    def test_api_error(self):
+        responses = dict(RESPONSES)
+        responses["/api/Order/Cancel"] = "responses/order/cancel_no-orders.xml"
+        client = AsyncClient("login", "password", "unit", session=FakeAsyncSession(responses),
+                             token_store=MemoryTokenStore())
+        with pytest.raises(NoOrdersToCancel) as e:
+            run(client.cancel_order("00001-210317-MA1234"))
+        assert e.value.code == "MIX-106001"
+
+    def test_http_error(self):
+        session = FakeAsyncSession(RESPONSES, statuses={"/api/Order/Retrieve": [500]})
+        exchanges = []
+        client = AsyncClient("login", "password", "unit", session=session,
+                             token_store=MemoryTokenStore(), on_exchange=exchanges.append)
+        with pytest.raises(aiohttp.ClientResponseError) as e:
+            run(client.retrieve_order("00001-210317-MA1234"))
+        assert e.value.status == 500
+        assert exchanges[-1].status_code == 500
+
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_air_shopping(self, stream):
+        client = AsyncClient("login", "password", "unit", session=FakeAsyncSession(RESPONSES),
+                             token_store=MemoryTokenStore(), stream=stream, chunk_size=512)
+        got = run(client.air_shopping(ITINERARY, SHOPPING_PAXES))
+        assert len(got.offers) == 1
+        assert got.offers[0].offer_id
+
+    def test_parse_pool(self, monkeypatch):
+        monkeypatch.setattr(_parsers, "PARALLEL_MIN_OFFERS", 1)
+        pool = FakePool()
+        client = AsyncClient("login", "password", "unit", session=FakeAsyncSession(RESPONSES),
+                             token_store=MemoryTokenStore(), parse_pool=pool)
+        got = run(client.air_shopping(ITINERARY, SHOPPING_PAXES))
+        assert len(got.offers) == 1
+        assert pool.threads and threading.get_ident() not in pool.threads
+
+    def test_coalesce_air_shopping(self):
+        session = FakeAsyncSession(RESPONSES, delay=0.01)
+        client = AsyncClient("login", "password", "unit", session=session,
+                             token_store=MemoryTokenStore(), coalesce=True)
+        reordered_paxes = list(reversed(SHOPPING_PAXES))
+
+        async def main():
+            await client.auth()
+            return await asyncio.gather(*[
+                client.air_shopping(ITINERARY, reordered_paxes if n % 2 else SHOPPING_PAXES)
+                for n in range(8)
+            ])
+
+        results = run(main())
+        assert len(set(map(id, results))) == 1
+        assert client.coalescer.calls == 1
+        assert client.coalescer.coalesced == 7
+        assert endpoints(session).count("/api/Order/AirShopping") == 1
+
+    def test_shopping_cache(self, monkeypatch):
+        monkeypatch.setattr(aio_module, "air_shopping_ttl", lambda resp: 60)
+        session = FakeAsyncSession(RESPONSES)
+        cache = TTLCache()
+        client = AsyncClient("login", "password", "unit", session=session,
+                             token_store=MemoryTokenStore(), shopping_cache=cache)
+
+        async def main():
+            got = await client.air_shopping(ITINERARY, SHOPPING_PAXES)
+            assert await client.air_shopping(ITINERARY, SHOPPING_PAXES) is got
+            assert await client.air_shopping(ITINERARY, SHOPPING_PAXES, top_k=1) is not got
+
+        run(main())
+        assert (cache.hits, cache.misses) == (1, 2)
+        assert endpoints(session).count("/api/Order/AirShopping") == 2
+
+    def test_cache_parses_expiration(self, monkeypatch):
+        expirations = []
+
+        def ttl(resp):
+            expirations.extend(o.offer_expiration_timelimit_datetime for o in resp.offers)
+            return 60
+
+        monkeypatch.setattr(aio_module, "air_shopping_ttl", ttl)
+        client = AsyncClient("login", "password", "unit", session=FakeAsyncSession(RESPONSES),
+                             token_store=MemoryTokenStore(), shopping_cache=TTLCache())
+        got = run(client.air_shopping(ITINERARY, SHOPPING_PAXES, projection={"offer_id"}))
+        assert got.offers[0].offer_items is UNLOADED
+        assert expirations and not any(e is UNLOADED for e in expirations)
+
+    def test_response_cache(self, monkeypatch):
+        monkeypatch.setattr(aio_module, "air_shopping_ttl", lambda resp: 60)
+        cache = TTLCache()
+        session = FakeAsyncSession(RESPONSES)
+        client = AsyncClient("login", "password", "unit", session=session,
+                             token_store=MemoryTokenStore(), response_cache=cache, stream=True)
+        got = run(client.air_shopping(ITINERARY, SHOPPING_PAXES))
+        other_session = FakeAsyncSession(RESPONSES)
+        other = AsyncClient("login", "password", "unit", session=other_session,
+                            token_store=MemoryTokenStore(), response_cache=cache)
+        cached = run(other.air_shopping(ITINERARY, SHOPPING_PAXES))
+        assert other_session.calls == []
+        assert cached == got
+
+    def test_order_cache(self):
+        session = FakeAsyncSession(RESPONSES)
+        client = AsyncClient("login", "password", "unit", session=session,
+                             token_store=MemoryTokenStore(), order_cache=TTLCache())
+        mix_order_id = "01138-250530-MHY6279"
+
+        async def main():
+            view = await client.change_order(mix_order_id, 1000)
+            assert await client.retrieve_order(mix_order_id) is view
+            assert len(session.calls) == 2  # login and change
+            assert await client.cancel_order(mix_order_id)
+            assert await client.retrieve_order(mix_order_id) is not view
+
+        run(main())
+        assert endpoints(session)[2:] == ["/api/Order/Cancel", "/api/Order/Retrieve"]
+
+    def test_disk_caches_off_loop(self, monkeypatch, tmpdir):
+        monkeypatch.setattr(aio_module, "air_shopping_ttl", lambda resp: 60)
+        threads = []
+
+        class Cache(DiskCache):
+            def _get(self, key):
+                threads.append(threading.get_ident())
+                return DiskCache._get(self, key)
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        client = AsyncClient("login", "password", "unit", session=FakeAsyncSession(RESPONSES),
+                             token_store=MemoryTokenStore(),
+                             response_cache=Cache(str(tmpdir.mkdir("responses"))),
+                             order_cache=Cache(str(tmpdir.mkdir("orders"))),
+                             executor=executor)
+        run(client.air_shopping(ITINERARY, SHOPPING_PAXES))
+        run(client.retrieve_order("01138-250530-MHY6279"))
+        view = run(client.retrieve_order("01138-250530-MHY6279"))
+        assert view.mix_order.mix_order_id == "01138-250530-MHY6279"
+        assert threads == [executor.submit(threading.get_ident).result()] * 3
+        executor.shutdown()
+
+    def test_order_cache_cancel_error(self):
+        responses = dict(RESPONSES)
+        responses["/api/Order/Cancel"] = "responses/order/cancel_no-orders.xml"
+        cache = TTLCache()
+        client = AsyncClient("login", "password", "unit", session=FakeAsyncSession(responses),
+                             token_store=MemoryTokenStore(), order_cache=cache)
+        mix_order_id = "01138-250530-MHY6279"
+        run(client.retrieve_order(mix_order_id))
+        with pytest.raises(NoOrdersToCancel):
+            run(client.cancel_order(mix_order_id))
+        assert len(cache) == 0
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import datetime
+import uuid
+
+from lxml import etree
+
+from mixvel._builders import serialize
+from mixvel._render import render
+from mixvel.models import (
+    AnonymousPassenger,
+    IdentityDocument,
+    Individual,
+    Leg,
+    Passenger,
+    SelectedOffer,
+    SelectedOfferItem,
+)
+
+import pytest
+
+BASE_CONTEXT = {
+    "message_id": uuid.UUID("353e2391-fdea-4e35-b49d-bce507a493ea"),
+    "time_sent": datetime.datetime(2025, 5, 30, 9, 36, 40),
+}
+
+
+def normalize(data):
+    """Returns canonical form of request without insignificant whitespace."""
+    if not isinstance(data, bytes):
+        data = data.encode("utf-8")
+    parser = etree.XMLParser(remove_blank_text=True)
+    return etree.tostring(etree.fromstring(data, parser), method="c14n")
+
+
+def passenger(pax_id, ptc, middle_name="", phone=None, email=None):
+    return Passenger(
+        pax_id, ptc,
+        Individual("Francis", middle_name, "Bacon", "M", datetime.date(1961, 1, 22)),
+        IdentityDocument("4509511001", "PS", "RU", datetime.date(2035, 1, 1)),
+        phone=phone, email=email,
+    )
+
+
+class TestBuilders:
+    @pytest.mark.parametrize(
+        "template,context",
+        [
+            (
+                "accounts_login.xml",
+                {"login": "user@mixvel.com", "password": "p", "structure_unit_id": "1_A"},
+            ),
+            (
+                "order_air-shopping.xml",
+                {
+                    "itinerary": [
+                        Leg("MOW", "AER", datetime.date(2025, 6, 13)),
+                        Leg("AER", "MOW", datetime.date(2025, 6, 21), cabin="Business"),
+                    ],
+                    "paxes": [
+                        AnonymousPassenger("Pax-1", "ADT"),
+                        AnonymousPassenger("Pax-2", "CNN"),
+                    ],
+                },
+            ),
+            (
+                "order_create.xml",
+                {
+                    "selected_offer": SelectedOffer(
+                        "d21832f0", [SelectedOfferItem("979aa343", ["Pax-1", "Pax-2"])]
+                    ),
+                    "paxes": [
+                        passenger("Pax-1", "ADT", "Nikolas", "+79651112233", "me@bacon.com"),
+                        passenger("Pax-2", "ADT", phone="+79651112234"),
+                        passenger("Pax-3", "CNN"),
+                    ],
+                },
+            ),
+            ("order_retrieve.xml", {"mix_order_id": "00001-210317-MA1234"}),
+            ("order_change.xml", {"mix_order_id": "00001-210317-MA1234", "amount": 1807}),
+            ("order_cancel.xml", {"mix_order_id": "00001-210317-MA1234"}),
+        ],
+    )
+    def test_serialize_matches_template(self, template, context):
+        context.update(BASE_CONTEXT)
+        got = serialize(template, context)
+        assert isinstance(got, bytes)
+        assert normalize(got) == normalize(render(template, context))
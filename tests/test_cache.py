@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+import datetime
+import os
+import threading
+import time
+
+import pytest
+
+from mixvel import cache as cache_module
+from mixvel.cache import (
+    DiskCache,
+    KeyValueCache,
+    LocalKeyValueStore,
+    TTLCache,
+    air_shopping_ttl,
+)
+from mixvel.models import AirShoppingResponse, DataLists, Offer
+
+
+def offer(expires_in):
+    timelimit = None
+    if expires_in is not None:
+        timelimit = datetime.datetime.utcnow() + datetime.timedelta(seconds=expires_in)
+    return Offer("offer", [], "TCH", timelimit)
+
+
+class TestBackends:
+    @pytest.fixture(params=["memory", "disk", "key-value"])
+    def cache(self, request, tmpdir):
+        if request.param == "memory":
+            return TTLCache(max_ttl=0.05)
+        if request.param == "disk":
+            return DiskCache(str(tmpdir), max_ttl=0.05)
+        return KeyValueCache(LocalKeyValueStore(), max_ttl=0.05)
+
+    def test_get_set(self, cache):
+        key = ("gateway", "unit", "MOW", "AER")
+        assert cache.get(key) is None
+        cache.set(key, {"offers": [1, 2, 3]})
+        assert cache.get(key) == {"offers": [1, 2, 3]}
+        assert (cache.hits, cache.misses) == (1, 1)
+        cache.delete(key)
+        assert cache.get(key) is None
+
+    def test_expiration(self, cache):
+        cache.set("key", b"value", ttl=60)
+        time.sleep(0.06)
+        assert cache.get("key") is None
+
+    def test_clear(self, cache):
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.clear()
+        assert cache.get("a") is None
+        assert cache.get("b") is None
+
+    def test_latency(self, cache):
+        cache.set("key", "value")
+        cache.get("key")
+        cache.get("missing")
+        assert cache.set_latency.count == 1
+        assert cache.get_latency.count == 2
+        assert 0 <= cache.get_latency.mean <= cache.get_latency.max
+
+
+class TestTTLCache:
+    def test_get_set(self):
+        cache = TTLCache()
+        assert cache.get("key") is None
+        cache.set("key", "value", ttl=60, size=10)
+        assert cache.get("key") == "value"
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.size == 10
+        cache.delete("key")
+        assert cache.get("key") is None
+        assert cache.size == 0
+
+    def test_expiration(self):
+        cache = TTLCache(max_ttl=0.05)
+        cache.set("key", "value", ttl=60)
+        assert cache.get("key") == "value"
+        time.sleep(0.06)
+        assert cache.get("key") is None
+        assert cache.expirations == 1
+        assert len(cache) == 0
+
+    def test_not_cached_when_expired(self):
+        cache = TTLCache()
+        cache.set("key", "value", ttl=-1)
+        assert len(cache) == 0
+
+    def test_evict_by_entries(self):
+        cache = TTLCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    def test_evict_by_bytes(self):
+        cache = TTLCache(max_bytes=100)
+        cache.set("a", 1, size=60)
+        cache.set("b", 2, size=30)
+        cache.set("c", 3, size=30)
+        assert cache.get("a") is None
+        assert cache.size == 60
+        cache.set("d", 4, size=200)
+        assert cache.get("d") is None
+        assert cache.evictions == 1
+
+
+class TestStats:
+    def test_concurrent_gets(self):
+        cache = TTLCache()
+        cache.set("hit", "value")
+
+        def worker():
+            for _ in range(1000):
+                cache.get("hit")
+                cache.get("miss")
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert (cache.hits, cache.misses) == (8000, 8000)
+        assert cache.get_latency.count == 16000
+
+
+class TestDiskCache:
+    def test_get_set(self, tmpdir):
+        cache = DiskCache(str(tmpdir))
+        assert cache.get("key") is None
+        cache.set("key", b"<response/>" * 100, ttl=60)
+        assert cache.get("key") == b"<response/>" * 100
+        assert (cache.hits, cache.misses) == (1, 1)
+        cache.delete("key")
+        assert cache.get("key") is None
+
+    def test_compressed(self, tmpdir):
+        cache = DiskCache(str(tmpdir))
+        cache.set("key", b"<response/>" * 1000)
+        assert os.path.getsize(cache._filename("key")) < 1000
+
+    def test_not_cached_when_expired(self, tmpdir):
+        cache = DiskCache(str(tmpdir))
+        cache.set("key", b"value", ttl=-1)
+        assert os.listdir(str(tmpdir)) == []
+
+    def test_shared(self, tmpdir):
+        DiskCache(str(tmpdir)).set("key", b"value")
+        assert DiskCache(str(tmpdir)).get("key") == b"value"
+
+    def test_expiration(self, tmpdir):
+        cache = DiskCache(str(tmpdir), max_ttl=0.05)
+        cache.set("key", b"value", ttl=60)
+        assert cache.get("key") == b"value"
+        time.sleep(0.06)
+        assert cache.get("key") is None
+        assert cache.expirations == 1
+        assert os.listdir(str(tmpdir)) == [".lock"]
+
+    def test_expired_entry_replaced(self, monkeypatch, tmpdir):
+        cache = DiskCache(str(tmpdir))
+        cache.set("key", b"old", ttl=60)
+        header = cache_module._header
+
+        class Header:
+            size = header.size
+            pack = staticmethod(header.pack)
+
+            def unpack_from(self, data, offset):
+                # another process writes a fresh entry right after it is read
+                DiskCache(str(tmpdir)).set("key", b"fresh", ttl=60)
+                return (time.time() - 1,)
+
+        monkeypatch.setattr(cache_module, "_header", Header())
+        assert cache.get("key") is None
+        assert cache.expirations == 1
+        monkeypatch.setattr(cache_module, "_header", header)
+        assert cache.get("key") == b"fresh"
+
+    def test_broken_entry(self, tmpdir):
+        cache = DiskCache(str(tmpdir))
+        with open(cache._filename("key"), "wb") as f:
+            f.write(b"broken")
+        assert cache.get("key") is None
+
+    def test_evict_least_recently_used(self, tmpdir):
+        cache = DiskCache(str(tmpdir), max_bytes=100)
+        cache.set("a", b"a")
+        cache.set("b", b"b")
+        size = os.path.getsize(cache._filename("a"))
+        os.utime(cache._filename("a"), (1, 1))
+        os.utime(cache._filename("b"), (2, 2))
+        cache.get("a")
+        cache.max_bytes = 2 * size
+        cache.set("c", b"c")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"a"
+        assert cache.get("c") == b"c"
+        assert cache.evictions == 1
+
+    def test_scan_interval(self, monkeypatch, tmpdir):
+        monkeypatch.setattr(cache_module, "DISK_SCAN_INTERVAL", 3)
+        cache = DiskCache(str(tmpdir), max_bytes=10000)
+        scans = []
+        evict = cache._evict
+        monkeypatch.setattr(cache, "_evict", lambda: scans.append(evict()))
+        for n in range(7):
+            cache.set(str(n), b"value")
+        assert len(scans) == 3  # first set and every third one
+
+    def test_evict_entries_of_other_process(self, monkeypatch, tmpdir):
+        monkeypatch.setattr(cache_module, "DISK_SCAN_INTERVAL", 2)
+        cache = DiskCache(str(tmpdir))
+        cache.set("a", b"a")
+        size = os.path.getsize(cache._filename("a"))
+        other = DiskCache(str(tmpdir))
+        for key in "bcd":
+            other.set(key, b"x")
+        cache.max_bytes = 2 * size
+        cache.set("e", b"e")  # second set of this process scans
+        assert len([name for name in os.listdir(str(tmpdir)) if name != ".lock"]) == 2
+        assert cache.get("e") == b"e"
+
+    def test_remove_stale_temp_files(self, tmpdir):
+        stale = tmpdir.join(".stale")
+        stale.write(b"partial")
+        os.utime(str(stale), (1, 1))
+        fresh = tmpdir.join(".fresh")
+        fresh.write(b"partial")
+        DiskCache(str(tmpdir)).set("key", b"value")
+        assert not stale.exists()
+        assert fresh.exists()
+
+
+class TestKeyValueCache:
+    def test_shared(self):
+        store = LocalKeyValueStore()
+        KeyValueCache(store).set("key", b"value")
+        assert KeyValueCache(store).get("key") == b"value"
+        assert KeyValueCache(store, prefix="other:").get("key") is None
+
+    def test_clear_own_keys(self):
+        store = LocalKeyValueStore()
+        store.set("foreign", b"value")
+        cache = KeyValueCache(store)
+        cache.set("key", b"value")
+        cache.clear()
+        assert store.get("foreign") == b"value"
+        assert list(store.scan_iter()) == ["foreign"]
+
+
+class TestAirShoppingTTL:
+    def test_earliest_offer_expiration(self):
+        resp = AirShoppingResponse([offer(600), offer(120), offer(900)], DataLists())
+        assert 115 < air_shopping_ttl(resp) <= 120
+
+    def test_no_offers(self):
+        assert air_shopping_ttl(AirShoppingResponse([], DataLists())) == 0
+
+    def test_missing_expiration(self):
+        resp = AirShoppingResponse([offer(600), offer(None), offer(120)], DataLists())
+        assert 115 < air_shopping_ttl(resp) <= 120
+        assert air_shopping_ttl(AirShoppingResponse([offer(None)], DataLists())) == 0
+
+    def test_unknown_expiration_not_cached(self):
+        cache = TTLCache()
+        ttl = air_shopping_ttl(AirShoppingResponse([offer(None)], DataLists()))
+        cache.set("key", "value", ttl=ttl)
+        assert cache.get("key") is None
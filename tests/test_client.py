@@ -2,12 +2,22 @@
 import datetime
 import os
 import logging
+import threading
+import time
 
 import pytest
 
+from .utils import FakeSession, here
+from mixvel import client as client_module
+from mixvel.cache import DiskCache, TTLCache
+from mixvel.client import _parse_response
+from mixvel.exceptions import AuthenticationFailed, MixvelError
+from mixvel.tokens import MemoryTokenStore, Token
 from mixvel import (
+    PROD_GATEWAY,
     TEST_GATEWAY,
     Client,
+    create_session,
     Leg,
     AnonymousPassenger,
     SelectedOffer,
@@ -15,6 +25,8 @@ from mixvel import (
     Passenger,
     Individual,
     IdentityDocument,
+    NoOrdersToCancel,
+    UNLOADED,
 )
 
 # configure logging to output to console during tests
@@ -22,6 +34,297 @@ logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+RESPONSES = {
+    "/api/Accounts/login": "responses/accounts/login.xml",
+    "/api/Order/AirShopping": "responses/order/air-shopping__RT-2ADT1CNN.xml",
+    "/api/Order/Retrieve": "responses/order/view.xml",
+    "/api/Order/Change": "responses/order/view.xml",
+    "/api/Order/Cancel": "responses/order/cancel_success.xml",
+}
+ITINERARY = [
+    Leg("MOW", "AER", datetime.date(2025, 6, 13)),
+    Leg("AER", "MOW", datetime.date(2025, 6, 21)),
+]
+SHOPPING_PAXES = [
+    AnonymousPassenger("Pax-1", "ADT"),
+    AnonymousPassenger("Pax-2", "ADT"),
+    AnonymousPassenger("Pax-3", "CNN"),
+]
+
+
+def read_response(path):
+    with open(os.path.join(here, path), "rb") as f:
+        return f.read()
+
+
+class TestResponse:
+    @pytest.mark.parametrize("resp_path,exc,code", [
+        ("responses/accounts/login_error.xml", AuthenticationFailed, "MIX-101002"),
+        ("responses/order/cancel_no-orders.xml", NoOrdersToCancel, "MIX-106001"),
+    ])
+    def test_error(self, resp_path, exc, code):
+        with pytest.raises(exc) as e:
+            _parse_response(read_response(resp_path))
+        assert isinstance(e.value, MixvelError)
+        assert isinstance(e.value, IOError)
+        assert e.value.code == code
+        assert e.value.error_type == "BadRequest"
+        assert str(e.value).startswith(code + ": BadRequest: ")
+
+    def test_unknown_error(self):
+        content = read_response("responses/accounts/login_error.xml")
+        with pytest.raises(MixvelError) as e:
+            _parse_response(content.replace(b"MIX-101002", b"MIX-199999"))
+        assert type(e.value) is MixvelError
+        assert e.value.code == "MIX-199999"
+
+    def test_success(self):
+        got = _parse_response(read_response("responses/order/air-shopping__RT-2ADT1CNN.xml"))
+        assert got.tag == "Mixvel_AirShoppingRS"
+
+
+class TestClient:
+    def test_shared_session(self):
+        session = FakeSession(RESPONSES)
+        clients = [
+            Client("login", "password", "unit", session=session,
+                   token_store=MemoryTokenStore())
+            for _ in range(2)
+        ]
+        for client in clients:
+            assert client.session is session
+            with client:
+                client.retrieve_order("00001-210317-MA1234")
+        assert len(session.calls) == 4
+        assert not session.closed
+
+    def test_own_session(self):
+        client = Client("login", "password", "unit", pool_maxsize=32)
+        adapter = client.session.get_adapter(PROD_GATEWAY)
+        assert adapter._pool_maxsize == 32
+        client.close()
+
+    def test_concurrent_use(self):
+        session = FakeSession(RESPONSES, delay=0.01)
+        exchanges = []
+        client = Client("login", "password", "unit", session=session,
+                        on_exchange=exchanges.append, token_store=MemoryTokenStore())
+        sent = {}
+
+        def worker(n):
+            client.cancel_order("MIX-{}".format(n))
+            sent[n] = client.sent
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        logins = [c for c in session.calls if c[0].endswith("/api/Accounts/login")]
+        assert len(logins) == 1
+        assert len(exchanges) == 17
+        for n, data in sent.items():
+            assert "<MixOrderID>MIX-{}</MixOrderID>".format(n) in data
+        assert client.last_exchange is None
+
+    def test_shared_token_store(self):
+        session = FakeSession(RESPONSES)
+        store = MemoryTokenStore()
+        for _ in range(3):
+            client = Client("login", "password", "unit", session=session, token_store=store)
+            client.cancel_order("00001-210317-MA1234")
+        logins = [c for c in session.calls if c[0].endswith("/api/Accounts/login")]
+        assert len(logins) == 1
+        assert client.token == "c2VjcmV0LXRva2Vu"
+
+    def test_token_refresh_before_expiration(self):
+        session = FakeSession(RESPONSES)
+        store = MemoryTokenStore()
+        client = Client("login", "password", "unit", session=session, token_store=store,
+                        token_refresh_margin=60)
+        store.set(client.token_key, Token("old", time.time() + 30))
+        client.cancel_order("00001-210317-MA1234")
+        assert session.calls[0][0].endswith("/api/Accounts/login")
+        assert session.calls[1][2]["Authorization"] == "Bearer c2VjcmV0LXRva2Vu"
+
+    def test_reauth_on_unauthorized(self):
+        session = FakeSession(RESPONSES, statuses={"/api/Order/Cancel": [401]})
+        store = MemoryTokenStore()
+        client = Client("login", "password", "unit", session=session, token_store=store)
+        store.set(client.token_key, Token("revoked", time.time() + 3600))
+        assert client.cancel_order("00001-210317-MA1234")
+        endpoints = [c[0][len(PROD_GATEWAY):] for c in session.calls]
+        assert endpoints == ["/api/Order/Cancel", "/api/Accounts/login", "/api/Order/Cancel"]
+        assert client.token == "c2VjcmV0LXRva2Vu"
+
+    @pytest.mark.parametrize("log_level,keep", [
+        (logging.DEBUG, True),
+        (logging.WARNING, False),
+    ])
+    def test_stream(self, log_level, keep):
+        client = Client("login", "password", "unit", session=FakeSession(RESPONSES),
+                        token_store=MemoryTokenStore(), stream=True, chunk_size=512)
+        logger = logging.getLogger("mixvel.client")
+        level = logger.level
+        logger.setLevel(log_level)
+        try:
+            got = client.retrieve_order("00001-210317-MA1234")
+        finally:
+            logger.setLevel(level)
+        assert got.mix_order.mix_order_id
+        assert client.last_exchange.size > 0
+        assert (client.recv is not None) == keep
+
+    def test_iter_air_shopping(self):
+        session = FakeSession(RESPONSES, statuses={"/api/Order/AirShopping": [401]})
+        client = Client("login", "password", "unit", session=session,
+                        token_store=MemoryTokenStore(), chunk_size=512)
+        data_lists = []
+        got = list(client.iter_air_shopping(ITINERARY, SHOPPING_PAXES, data_lists.append))
+        want = client.air_shopping(ITINERARY, SHOPPING_PAXES)
+        assert got == want.offers
+        assert data_lists == [want.data_lists]
+        endpoints = [c[0][len(PROD_GATEWAY):] for c in session.calls]
+        assert endpoints[:3] == [
+            "/api/Accounts/login", "/api/Order/AirShopping", "/api/Accounts/login",
+        ]
+        got = list(client.iter_air_shopping(ITINERARY, SHOPPING_PAXES, top_k=0))
+        assert got == []
+
+    def test_coalesce_air_shopping(self):
+        session = FakeSession(RESPONSES, delay=0.05)
+        client = Client("login", "password", "unit", session=session,
+                        token_store=MemoryTokenStore(), coalesce=True)
+        client.auth()
+        results = []
+
+        def worker(paxes):
+            results.append(client.air_shopping(ITINERARY, paxes))
+
+        reordered_paxes = list(reversed(SHOPPING_PAXES))
+        threads = [
+            threading.Thread(
+                target=worker, args=(reordered_paxes if n % 2 else SHOPPING_PAXES,)
+            )
+            for n in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(set(map(id, results))) == 1
+        assert client.coalescer.calls == 1
+        assert client.coalescer.coalesced == 7
+        assert len(session.calls) == 2
+
+    def test_shopping_cache(self, monkeypatch):
+        monkeypatch.setattr(client_module, "air_shopping_ttl", lambda resp: 60)
+        session = FakeSession(RESPONSES)
+        cache = TTLCache(max_ttl=30)
+        client = Client("login", "password", "unit", session=session,
+                        token_store=MemoryTokenStore(), shopping_cache=cache)
+        got = client.air_shopping(ITINERARY, SHOPPING_PAXES)
+        assert client.air_shopping(ITINERARY, list(reversed(SHOPPING_PAXES))) is got
+        assert client.air_shopping(ITINERARY[:1], SHOPPING_PAXES) is not got
+        assert (cache.hits, cache.misses) == (1, 2)
+        assert cache.size > 0
+
+    def test_shopping_cache_projection(self, monkeypatch):
+        monkeypatch.setattr(client_module, "air_shopping_ttl", lambda resp: 60)
+        client = Client("login", "password", "unit", session=FakeSession(RESPONSES),
+                        token_store=MemoryTokenStore(), shopping_cache=TTLCache())
+        got = client.air_shopping(ITINERARY, SHOPPING_PAXES, projection="summary")
+        assert client.air_shopping(ITINERARY, SHOPPING_PAXES, projection="summary") is got
+        full = client.air_shopping(ITINERARY, SHOPPING_PAXES)
+        assert full is not got
+        assert full.offers[0].offer_items
+        assert client.air_shopping(ITINERARY, SHOPPING_PAXES, projection="full") is full
+
+    def test_cache_parses_expiration(self, monkeypatch):
+        expirations = []
+
+        def ttl(resp):
+            expirations.extend(o.offer_expiration_timelimit_datetime for o in resp.offers)
+            return 60
+
+        monkeypatch.setattr(client_module, "air_shopping_ttl", ttl)
+        session = FakeSession(RESPONSES)
+        client = Client("login", "password", "unit", session=session,
+                        token_store=MemoryTokenStore(), response_cache=TTLCache())
+        got = client.air_shopping(ITINERARY, SHOPPING_PAXES, projection={"offer_id"})
+        assert got.offers[0].offer_items is UNLOADED
+        assert expirations and not any(e is UNLOADED for e in expirations)
+        # full parse of the shared raw response
+        assert client.air_shopping(ITINERARY, SHOPPING_PAXES).offers[0].offer_items
+        assert len(session.calls) == 2  # login and shopping
+
+    def test_shopping_cache_top_k(self, monkeypatch):
+        monkeypatch.setattr(client_module, "air_shopping_ttl", lambda resp: 60)
+        cache = TTLCache()
+        client = Client("login", "password", "unit", session=FakeSession(RESPONSES),
+                        token_store=MemoryTokenStore(), shopping_cache=cache)
+        got = client.air_shopping(ITINERARY, SHOPPING_PAXES, top_k=1)
+        assert client.air_shopping(ITINERARY, SHOPPING_PAXES, top_k=1) is got
+        assert client.air_shopping(ITINERARY, SHOPPING_PAXES) is not got
+        # ranked by caller's function, not cached
+        client.air_shopping(ITINERARY, SHOPPING_PAXES, top_k=1, top_key=lambda o: o.offer_id)
+        assert len(cache) == 2
+
+    def test_response_cache(self, monkeypatch, tmpdir):
+        monkeypatch.setattr(client_module, "air_shopping_ttl", lambda resp: 60)
+        cache = DiskCache(str(tmpdir))
+        session = FakeSession(RESPONSES)
+        client = Client("login", "password", "unit", session=session,
+                        token_store=MemoryTokenStore(), response_cache=cache)
+        got = client.air_shopping(ITINERARY, SHOPPING_PAXES)
+        # another worker with the same agency gets the response without a request
+        other_session = FakeSession(RESPONSES)
+        other = Client("login", "password", "unit", session=other_session,
+                       token_store=MemoryTokenStore(), response_cache=DiskCache(str(tmpdir)))
+        cached = other.air_shopping(ITINERARY, SHOPPING_PAXES)
+        assert len(other_session.calls) == 0
+        assert [o.offer_id for o in cached.offers] == [o.offer_id for o in got.offers]
+        # responses of another agency are not shared
+        Client("login", "password", "unit2", session=other_session,
+               token_store=MemoryTokenStore(), response_cache=cache,
+               ).air_shopping(ITINERARY, SHOPPING_PAXES)
+        assert len(other_session.calls) == 2
+
+    def test_response_cache_stream(self, monkeypatch, tmpdir):
+        monkeypatch.setattr(client_module, "air_shopping_ttl", lambda resp: 60)
+        cache = DiskCache(str(tmpdir))
+        client = Client("login", "password", "unit", session=FakeSession(RESPONSES),
+                        token_store=MemoryTokenStore(), response_cache=cache, stream=True)
+        client.air_shopping(ITINERARY, SHOPPING_PAXES)
+        assert len(os.listdir(str(tmpdir))) == 2  # entry and eviction lock
+
+    def test_order_cache(self):
+        session = FakeSession(RESPONSES)
+        cache = TTLCache()
+        client = Client("login", "password", "unit", session=session,
+                        token_store=MemoryTokenStore(), order_cache=cache)
+        mix_order_id = "01138-250530-MHY6279"
+        view = client.change_order(mix_order_id, 1000)
+        assert client.retrieve_order(mix_order_id) is view
+        assert len(session.calls) == 2  # login and change
+        assert client.cancel_order(mix_order_id)
+        assert client.retrieve_order(mix_order_id) is not view
+        assert len(session.calls) == 4
+
+    def test_order_cache_ttl(self):
+        session = FakeSession(RESPONSES)
+        client = Client("login", "password", "unit", session=session,
+                        token_store=MemoryTokenStore(), order_cache=TTLCache(), order_ttl=0)
+        client.retrieve_order("01138-250530-MHY6279")
+        client.retrieve_order("01138-250530-MHY6279")
+        assert len(session.calls) == 3
+
+    def test_create_session(self):
+        session = create_session(pool_connections=2, pool_maxsize=64)
+        adapter = session.get_adapter(TEST_GATEWAY)
+        assert adapter._pool_connections == 2
+        assert adapter._pool_maxsize == 64
+
 
 def test_e2e_full_flow():
     login = os.getenv("MIXVEL_LOGIN")
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+from mixvel.coalescing import SingleFlight
+
+import pytest
+
+
+def run_concurrently(fn, count):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fn())) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+class TestSingleFlight:
+    def test_do_coalesces_concurrent_calls(self):
+        flight = SingleFlight()
+
+        def call():
+            time.sleep(0.05)
+            return object()
+
+        results = run_concurrently(lambda: flight.do("key", call), 8)
+        assert len(set(map(id, results))) == 1
+        assert flight.calls == 1
+        assert flight.coalesced == 7
+
+    def test_do_sequential_calls(self):
+        flight = SingleFlight()
+        assert flight.do("key", lambda: 1) == 1
+        assert flight.do("key", lambda: 2) == 2
+        assert (flight.calls, flight.coalesced) == (2, 0)
+
+    def test_do_raises_error(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise IOError("MIX-100000")
+
+        with pytest.raises(IOError):
+            flight.do("key", fail)
+        assert flight.do("key", lambda: 1) == 1
+
+    def test_do_raises_base_exception_to_followers(self):
+        class Abort(BaseException):
+            pass
+
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def fail():
+            started.set()
+            release.wait()
+            raise Abort()
+
+        def caller(fn):
+            try:
+                flight.do("key", fn)
+            except Abort as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=caller, args=(fail,))
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=caller, args=(lambda: 1,))
+        follower.start()
+        while flight.coalesced == 0:
+            time.sleep(0.001)
+        release.set()
+        leader.join()
+        follower.join()
+        assert len(errors) == 2
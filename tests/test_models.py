@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import pickle
+
+import pytest
+
+from .utils import parse_xml
+from mixvel._parsers import parse_offer
+from mixvel.models import (
+    Amount,
+    IdentityDocument,
+    Individual,
+    Passenger,
+    Price,
+    SelectedOfferItem,
+)
+
+
+def passenger():
+    individual = Individual("Ivan", None, "Ivanov", "Male", "1990-01-01")
+    doc = IdentityDocument("1234567890", "PS", "RUS", "2030-01-01")
+    return Passenger("Pax-1", "ADT", individual, doc, phone="+79001234567")
+
+
+class TestModel:
+    def test_no_dict(self):
+        amount = Amount(100, "RUB")
+        assert not hasattr(amount, "__dict__")
+        with pytest.raises(AttributeError):
+            amount.unknown = 1
+
+    def test_eq(self):
+        assert Amount(100, "RUB") == Amount(100, "RUB")
+        assert Amount(100, "RUB") != Amount(100, "EUR")
+        assert Amount(100, "RUB") != (100, "RUB")
+        assert Price(None, Amount(100, "RUB")) == Price(None, Amount(100, "RUB"))
+
+    def test_hash(self):
+        item = SelectedOfferItem("OfferItem-1", ["Pax-1", "Pax-2"])
+        items = {item}
+        item.pax_ref_ids.append("Pax-3")
+        assert item in items  # mutable, hashed by identity
+        assert SelectedOfferItem("OfferItem-1", ["Pax-1", "Pax-2", "Pax-3"]) not in items
+
+    def test_repr(self):
+        assert repr(Amount(100, "RUB")) == "Amount(amount=100, cur_code='RUB')"
+
+    def test_inheritance(self):
+        pax = passenger()
+        assert not hasattr(pax, "__dict__")
+        assert pax == passenger()
+        assert repr(pax).startswith("Passenger(pax_id='Pax-1', ptc='ADT', individual=Individual(")
+
+    @pytest.mark.parametrize("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+    def test_pickle(self, protocol):
+        pax = passenger()
+        assert pickle.loads(pickle.dumps(pax, protocol)) == pax
+        offer = parse_offer(parse_xml("models/offer.xml"))
+        assert pickle.loads(pickle.dumps(offer, protocol)) == offer
@@ -1,17 +1,26 @@
 # -*- coding: utf-8 -*-
 import datetime
+import multiprocessing
+import os
+import pickle
 
-from .utils import parse_xml, parse_xml_response
+from .utils import here, multiply_offers, parse_xml, parse_xml_response
 from mixvel._parsers import (
     is_cancel_success,
     parse_air_shopping_response,
     parse_order_view_response,
 )
+from mixvel import _parsers
+from mixvel._parsers import LazyOffer, LazyOfferItem, iter_offers
+from mixvel.client import _parse_response
+from mixvel.exceptions import AuthenticationFailed
 from mixvel._parsers import (
     parse_amount,
     parse_booking,
     parse_data_lists,
     parse_dated_marketing_segment,
+    parse_datetime,
+    intern_text,
     parse_fare_component,
     parse_fare_detail,
     parse_mix_order,
@@ -36,6 +45,7 @@ from mixvel.models import (
     AirShoppingResponse,
     OrderViewResponse,
 )
+from mixvel.models import UNLOADED
 from mixvel.models import (
     Amount,
     Booking,
@@ -65,6 +75,7 @@ from mixvel.models import (
     ValidatingParty,
 )
 
+from lxml import etree
 import pytest
 
 
@@ -100,6 +111,165 @@ class TestParsers:
         assert isinstance(got.offers[0], Offer)
         assert isinstance(got.data_lists, DataLists)
 
+    @pytest.mark.parametrize(
+        "resp_path",
+        [
+            "responses/order/air-shopping__RT-2ADT1CNN.xml",
+            "responses/order/air-shopping__with-stop.xml",
+        ],
+    )
+    def test_parse_air_shopping_response_lazy_offers(self, resp_path):
+        resp = parse_xml_response(resp_path)
+        want = parse_air_shopping_response(resp)
+        got = parse_air_shopping_response(resp, lazy_offers=True)
+        assert isinstance(got.offers[0], LazyOffer)
+        assert got.offers == want.offers
+        assert got.data_lists == want.data_lists
+
+    @pytest.mark.parametrize("projection", [None, "summary"])
+    def test_parse_air_shopping_response_pool(self, monkeypatch, projection):
+        monkeypatch.setattr(_parsers, "PARALLEL_MIN_OFFERS", 2)
+        monkeypatch.setattr(_parsers, "PARALLEL_CHUNK_OFFERS", 1)
+        resp = multiply_offers(
+            parse_xml_response("responses/order/air-shopping__RT-2ADT1CNN.xml"),
+            [{"OfferID": "offer-{}".format(n)} for n in range(4)],
+        )
+        want = parse_air_shopping_response(resp, projection=projection)
+        pool = multiprocessing.Pool(2)
+        try:
+            got = parse_air_shopping_response(resp, projection=projection, pool=pool)
+        finally:
+            pool.close()
+            pool.join()
+        assert len(got.offers) == 5
+        assert got == want
+
+    def test_parse_air_shopping_response_pool_threshold(self):
+        resp = parse_xml_response("responses/order/air-shopping__RT-2ADT1CNN.xml")
+        got = parse_air_shopping_response(resp, pool=object())  # not used
+        assert got == parse_air_shopping_response(resp)
+
+    def test_parse_air_shopping_response_top_k(self):
+        resp = multiply_offers(
+            parse_xml_response("responses/order/air-shopping__RT-2ADT1CNN.xml"),
+            [
+                {"OfferID": "offer-{}".format(n), "TotalPrice/TotalAmount": amount}
+                for n, amount in enumerate(["3000.00", "9000.00", "3000.00"])
+            ],
+        )
+        want = parse_air_shopping_response(resp)
+        got = parse_air_shopping_response(resp, top_k=2)
+        assert [o.offer_id for o in got.offers] == ["offer-0", "offer-2"]
+        assert got.offers[0] == want.offers[1]
+        assert got.data_lists == want.data_lists
+        got = parse_air_shopping_response(
+            resp, top_k=1, top_key=lambda o: -o.total_price.total_amount.amount
+        )
+        assert [o.offer_id for o in got.offers] == ["offer-1"]
+        assert len(parse_air_shopping_response(resp, top_k=10).offers) == 4
+        got = parse_air_shopping_response(resp, top_k=1, lazy_offers=True)
+        assert isinstance(got.offers[0], LazyOffer)
+        assert got.offers[0] == want.offers[1]
+        got = parse_air_shopping_response(resp, top_k=1, projection="summary")
+        assert got.offers[0].offer_items is UNLOADED
+
+    def test_parse_air_shopping_response_top_k_currencies(self):
+        resp = multiply_offers(
+            parse_xml_response("responses/order/air-shopping__RT-2ADT1CNN.xml"),
+            [{"OfferID": "unpriced", "TotalPrice": None}, {"OfferID": "usd"}],
+        )
+        offer_id = resp.find("./Response/Offer/OfferID").text
+        got = parse_air_shopping_response(resp, top_k=3)
+        assert [o.offer_id for o in got.offers] == [offer_id, "usd", "unpriced"]
+        resp.find("./Response/Offer[3]/TotalPrice/TotalAmount").set("CurCode", "USD")
+        with pytest.raises(ValueError):
+            parse_air_shopping_response(resp, top_k=1)
+        got = parse_air_shopping_response(resp, top_k=1, top_key=lambda o: o.offer_id)
+        assert [o.offer_id for o in got.offers] == [min(offer_id, "unpriced", "usd")]
+
+    def test_parse_air_shopping_response_summary(self):
+        resp = parse_xml_response("responses/order/air-shopping__RT-2ADT1CNN.xml")
+        want = parse_air_shopping_response(resp).offers[0]
+        got = parse_air_shopping_response(resp, projection="summary").offers[0]
+        assert got.offer_id == want.offer_id
+        assert got.owner_code == want.owner_code
+        assert got.offer_expiration_timelimit_datetime == want.offer_expiration_timelimit_datetime
+        assert got.total_price == want.total_price
+        assert got.offer_items is UNLOADED
+        assert got.ticket_docs_count is UNLOADED
+
+    def test_parse_air_shopping_response_pricing(self):
+        resp = parse_xml_response("responses/order/air-shopping__RT-2ADT1CNN.xml")
+        want = parse_air_shopping_response(resp).offers[0]
+        got = parse_air_shopping_response(resp, projection="pricing").offers[0]
+        assert got.ticket_docs_count == want.ticket_docs_count
+        item = got.offer_items[0]
+        assert item.price == want.offer_items[0].price
+        assert item.fare_details == want.offer_items[0].fare_details
+        assert item.services is UNLOADED
+
+    def test_parse_air_shopping_response_projection(self):
+        resp = parse_xml_response("responses/order/air-shopping__RT-2ADT1CNN.xml")
+        want = parse_air_shopping_response(resp)
+        assert parse_air_shopping_response(resp, projection="full") == want
+        got = parse_air_shopping_response(resp, projection={"offer_id", "offer_items.services"})
+        assert got.offers[0].owner_code is UNLOADED
+        assert got.offers[0].offer_items[0].services == want.offers[0].offer_items[0].services
+        assert got.offers[0].offer_items[0].price is UNLOADED
+        assert pickle.loads(pickle.dumps(got)) == got
+        for projection in ["unknown", {"offer_id", "offer_items.unknown"}]:
+            with pytest.raises(ValueError):
+                parse_air_shopping_response(resp, projection=projection)
+        with pytest.raises(ValueError):
+            parse_air_shopping_response(resp, lazy_offers=True, projection="summary")
+
+    @pytest.mark.parametrize(
+        "resp_path",
+        [
+            "responses/order/air-shopping__RT-2ADT1CNN.xml",
+            "responses/order/air-shopping__with-stop.xml",
+            "responses/order/air-shopping__no-offers.xml",
+        ],
+    )
+    def test_iter_offers(self, resp_path):
+        with open(os.path.join(here, resp_path), "rb") as f:
+            content = f.read()
+        want = parse_air_shopping_response(_parse_response(content))
+        data_lists = []
+        chunks = [content[i:i + 100] for i in range(0, len(content), 100)]
+        assert list(iter_offers(chunks, data_lists.append)) == want.offers
+        if want.offers:
+            assert data_lists == [want.data_lists]
+        assert list(iter_offers(content)) == want.offers
+        with open(os.path.join(here, resp_path), "rb") as f:
+            assert list(iter_offers(f)) == want.offers
+
+    def test_iter_offers_bytes_chunks(self, monkeypatch):
+        monkeypatch.setattr(_parsers, "STREAM_CHUNK_SIZE", 100)
+        assert [len(chunk) for chunk in _parsers._chunks(b"x" * 250)] == [100, 100, 50]
+
+    def test_iter_offers_top_k(self):
+        envelope = parse_xml("responses/order/air-shopping__RT-2ADT1CNN.xml").getroot()
+        multiply_offers(envelope.find(".//Response").getparent(), [
+            {"OfferID": "offer-{}".format(n), "TotalPrice/TotalAmount": amount}
+            for n, amount in enumerate(["3000.00", "9000.00", "3000.00", "1000.00"])
+        ])
+        content = etree.tostring(envelope)
+        resp = _parse_response(content)
+        for top_k in [0, 2, 10]:
+            want = parse_air_shopping_response(resp, top_k=top_k).offers
+            chunks = [content[i:i + 100] for i in range(0, len(content), 100)]
+            assert list(iter_offers(chunks, top_k=top_k)) == want
+        assert [o.offer_id for o in iter_offers(content, top_k=2)] == ["offer-3", "offer-0"]
+        top_key = lambda o: o.offer_id  # noqa: E731
+        got = list(iter_offers(content, top_k=2, top_key=top_key))
+        assert got == parse_air_shopping_response(resp, top_k=2, top_key=top_key).offers
+
+    def test_iter_offers_error(self):
+        with open(os.path.join(here, "responses/accounts/login_error.xml"), "rb") as f:
+            with pytest.raises(AuthenticationFailed):
+                list(iter_offers(f))
+
     @pytest.mark.parametrize(
         "resp_path",
         [
@@ -114,6 +284,38 @@ class TestParsers:
         assert isinstance(got.data_lists, DataLists)
 
 
+class TestParseDatetime:
+    @pytest.mark.parametrize("text,want", [
+        ("2025-06-13T10:05:00", datetime.datetime(2025, 6, 13, 10, 5, 0)),
+        ("2025-05-28T09:46:00Z", datetime.datetime(2025, 5, 28, 9, 46, 0)),
+        ("2025-05-30T10:21:40.854636Z", datetime.datetime(2025, 5, 30, 10, 21, 40)),
+        ("2025-6-3T10:05:00", datetime.datetime(2025, 6, 3, 10, 5, 0)),  # strptime
+    ])
+    def test_parse_datetime(self, text, want):
+        assert parse_datetime(text) == want
+        assert parse_datetime(text) is parse_datetime(text)
+
+    @pytest.mark.parametrize("text", ["2025-06-13", "2025-13-13T10:05:00", "2025-06-13T10:05:xx"])
+    def test_parse_datetime_invalid(self, text):
+        with pytest.raises(ValueError):
+            parse_datetime(text)
+
+
+class TestInternText:
+    def test_intern_text(self):
+        code = "".join(["intern", "-", "test"])
+        assert intern_text(code) is code
+        assert intern_text("".join(["intern", "-", "test"])) is code
+        assert intern_text(None) is None
+
+    def test_shared_by_models(self):
+        path = "responses/order/air-shopping__RT-2ADT1CNN.xml"
+        first = parse_air_shopping_response(parse_xml_response(path)).offers[0]
+        second = parse_air_shopping_response(parse_xml_response(path)).offers[0]
+        assert first.owner_code is second.owner_code
+        assert first.total_price.total_amount.cur_code is second.total_price.total_amount.cur_code
+
+
 class TestTypeParsers:
     @pytest.mark.parametrize(
         "model_path,want",
@@ -441,6 +643,41 @@ class TestTypeParsers:
         assert isinstance(got.tax_summary, TaxSummary)
         assert got.total_amount.amount == want.total_amount.amount
 
+    def test_parse_price_shared(self):
+        prices = {}
+        got = parse_price(parse_xml("models/price.xml"), prices)
+        assert parse_price(parse_xml("models/price.xml"), prices) is got
+        assert parse_price(parse_xml("models/price.xml")) is not got
+        assert got.total_amount.amount == 326900
+
+    def test_parse_offer_shared_prices(self):
+        prices = {}
+        first = parse_offer(parse_xml("models/offer.xml"), prices)
+        second = parse_offer(parse_xml("models/offer.xml"), prices)
+        assert first.total_price is second.total_price
+        assert first.offer_items[0].price is second.offer_items[0].price
+
+    def test_lazy_offer(self):
+        want = parse_offer(parse_xml("models/offer.xml"))
+        got = LazyOffer(parse_xml("models/offer.xml").getroot())
+        with pytest.raises(AttributeError):
+            Offer.offer_items.__get__(got)  # not parsed yet
+        assert got.offer_id == want.offer_id
+        assert got.total_price == want.total_price
+        item = got.offer_items[0]
+        assert isinstance(item, LazyOfferItem)
+        assert got.offer_items[0] is item  # parsed once
+        assert item.fare_details == want.offer_items[0].fare_details
+        assert got == want
+        got.owner_code = "S7"
+        assert got.owner_code == "S7"
+
+    def test_lazy_offer_pickled_as_offer(self):
+        got = pickle.loads(pickle.dumps(LazyOffer(parse_xml("models/offer.xml").getroot())))
+        assert type(got) is Offer
+        assert type(got.offer_items[0]) is OfferItem
+        assert got == parse_offer(parse_xml("models/offer.xml"))
+
     @pytest.mark.parametrize(
         "model_path,want",
         [
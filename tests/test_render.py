@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+from mixvel import _render
+
+
+class TestRender:
+    def test_get_template_is_cached(self):
+        template = _render.get_template("order_cancel.xml")
+        assert _render.get_template("order_cancel.xml") is template
+
+    def test_warm_up(self):
+        _render.warm_up()
+        assert "order_air-shopping.xml" in _render._templates
+        assert "_base.xml" in _render._templates
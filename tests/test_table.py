@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import pytest
+
+from .utils import multiply_offers, parse_xml_response
+from mixvel._parsers import parse_air_shopping_response
+from mixvel.table import MISSING, OfferTable
+
+np = pytest.importorskip("numpy")
+
+
+def shopping(projection=None, lazy_offers=False):
+    """Round trip response with offers of different owners and prices."""
+    resp = multiply_offers(
+        parse_xml_response("responses/order/air-shopping__RT-2ADT1CNN.xml"),
+        [
+            {"OfferID": "offer-{}".format(n), "OwnerCode": owner_code,
+             "TotalPrice/TotalAmount": amount}
+            for n, (owner_code, amount) in enumerate([("S7", "3000.00"), ("SU", "5000.00")])
+        ],
+    )
+    return parse_air_shopping_response(resp, projection=projection, lazy_offers=lazy_offers)
+
+
+class TestOfferTable:
+    def test_columns(self):
+        table = shopping().offer_table
+        assert len(table) == 3
+        assert table.total_amount.tolist() == [486300, 300000, 500000]
+        assert [table.currencies[i] for i in table.cur_code] == ["RUB"] * 3
+        assert [table.owners[i] for i in table.owner_code] == ["TCH", "S7", "SU"]
+        assert table.expiration[0] == np.datetime64("2025-05-30T10:21:40")
+        assert table.segment_count.tolist() == [2, 2, 2]
+        assert table.stop_count.tolist() == [0, 0, 0]
+
+    def test_stops(self):
+        resp = parse_xml_response("responses/order/air-shopping__with-stop.xml")
+        table = parse_air_shopping_response(resp).offer_table
+        assert table.segment_count.tolist() == [2]
+        assert table.stop_count.tolist() == [1]
+
+    def test_filter(self):
+        table = shopping().offer_table
+        assert table.filter(max_amount=490000).tolist() == [0, 1]
+        assert table.filter(owner_code="SU").tolist() == [2]
+        assert table.filter(owner_code="XX").tolist() == []
+        assert table.filter(cur_code="RUB", min_amount=400000, max_stops=0).tolist() == [0, 2]
+        assert table.filter(expires_after=datetime.datetime(2025, 6, 1)).tolist() == []
+
+    def test_sort(self):
+        table = shopping().offer_table
+        assert table.sort().tolist() == [1, 0, 2]
+        assert table.sort(descending=True).tolist() == [2, 0, 1]
+        assert table.sort(["stop_count", "total_amount"]).tolist() == [1, 0, 2]
+        assert table.sort(indices=table.filter(min_amount=400000)).tolist() == [0, 2]
+
+    def test_sort_missing(self):
+        resp = multiply_offers(
+            parse_xml_response("responses/order/air-shopping__RT-2ADT1CNN.xml"),
+            [{"OfferID": "unpriced", "TotalPrice": None}, {"OfferID": "cheapest"}],
+        )
+        resp.find("./Response/Offer[3]/TotalPrice/TotalAmount").text = "100.00"
+        table = parse_air_shopping_response(resp).offer_table
+        assert table.total_amount.tolist() == [486300, MISSING, 10000]
+        assert table.sort().tolist() == [2, 0, 1]
+        assert table.sort(descending=True).tolist() == [0, 2, 1]
+        table.expiration[0] = np.datetime64("NaT")
+        assert table.sort("expiration").tolist() == [1, 2, 0]
+
+    def test_group_by(self):
+        table = shopping().offer_table
+        groups = table.group_by("owner_code")
+        assert sorted(groups) == ["S7", "SU", "TCH"]
+        assert groups["SU"].tolist() == [2]
+        assert table.group_by("stop_count")[0].tolist() == [0, 1, 2]
+
+    def test_take_lazy(self):
+        resp = shopping(lazy_offers=True)
+        table = resp.offer_table
+        offers = table.take(table.sort()[:2])
+        assert [o.offer_id for o in offers] == ["offer-0", resp.offers[0].offer_id]
+        assert resp.offer_table is table
+
+    def test_projection(self):
+        table = shopping(projection="summary").offer_table
+        assert table.total_amount.tolist() == [486300, 300000, 500000]
+        assert table.segment_count.tolist() == [MISSING] * 3
+        assert table.filter(max_stops=1).tolist() == []
+
+    def test_no_offers(self):
+        table = OfferTable([])
+        assert len(table) == 0
+        assert table.sort().tolist() == []
+        assert table.group_by("owner_code") == {}
+        resp = parse_xml_response("responses/order/air-shopping__no-offers.xml")
+        table = parse_air_shopping_response(resp).offer_table
+        assert len(table) == 0
+        assert table.filter(max_stops=0).tolist() == []
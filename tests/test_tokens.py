@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import base64
+import json
+import threading
+import time
+
+from mixvel.tokens import FileTokenStore, MemoryTokenStore, Token, token_expiration
+
+import pytest
+
+
+def jwt(claims):
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode("utf-8"))
+    return "eyJhbGciOiJIUzI1NiJ9.{}.c2lnbmF0dXJl".format(payload.decode("ascii").rstrip("="))
+
+
+class TestTokens:
+    def test_token_expiration_from_jwt(self):
+        assert token_expiration(jwt({"exp": 1748600000})) == 1748600000
+
+    def test_token_expiration_default(self):
+        expires_at = token_expiration("c2VjcmV0LXRva2Vu", default_ttl=600)
+        assert abs(expires_at - (time.time() + 600)) < 5
+
+    def test_expires_within(self):
+        token = Token("t", time.time() + 30)
+        assert token.expires_within(60)
+        assert not token.expires_within(10)
+
+    @pytest.mark.parametrize("store_factory", [
+        lambda tmpdir: MemoryTokenStore(),
+        lambda tmpdir: FileTokenStore(str(tmpdir.join("tokens"))),
+    ])
+    def test_store(self, tmpdir, store_factory):
+        store = store_factory(tmpdir)
+        assert store.get("key") is None
+        store.set("key", Token("t", 1748600000.0))
+        got = store.get("key")
+        assert (got.value, got.expires_at) == ("t", 1748600000.0)
+        store.delete("key")
+        assert store.get("key") is None
+
+    def test_file_store_is_shared(self, tmpdir):
+        path = str(tmpdir)
+        FileTokenStore(path).set("key", Token("t", 1748600000.0))
+        assert FileTokenStore(path).get("key").value == "t"
+
+    def test_file_store_lock(self, tmpdir):
+        stores = [FileTokenStore(str(tmpdir)) for _ in range(4)]
+        holders = []
+        overlaps = []
+
+        def worker(store):
+            with store.lock("key"):
+                holders.append(store)
+                if len(holders) > 1:
+                    overlaps.append(store)
+                time.sleep(0.01)
+                holders.remove(store)
+
+        threads = [threading.Thread(target=worker, args=(store,)) for store in stores]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not overlaps
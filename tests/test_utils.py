@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
+import datetime
+
 from .utils import parse_xml
-from mixvel.utils import lxml_remove_namespaces
+from mixvel.models import AnonymousPassenger, Leg
+from mixvel.utils import (
+    air_shopping_key, lxml_remove_namespaces, strip_envelope_namespaces, strip_namespaces,
+)
+
+from lxml import etree
 
 import pytest
 
@@ -14,3 +21,38 @@ class TestUtils:
         assert resp.find(".//AuthResponse") is None
         lxml_remove_namespaces(resp)
         assert resp.find(".//AuthResponse") is not None
+
+    @pytest.mark.parametrize("resp_path", [
+        "responses/accounts/login_error.xml",
+        "responses/order/air-shopping__RT-2ADT1CNN.xml",
+        "responses/order/view.xml",
+    ])
+    def test_strip_namespaces(self, resp_path):
+        want = parse_xml(resp_path)
+        lxml_remove_namespaces(want)
+        got = parse_xml(resp_path)
+        strip_namespaces(got)
+        assert etree.tostring(got) == etree.tostring(want)
+
+    @pytest.mark.parametrize("resp_path", [
+        "responses/accounts/login_error.xml",
+        "responses/order/air-shopping__RT-2ADT1CNN.xml",
+        "responses/order/view.xml",
+    ])
+    def test_strip_envelope_namespaces(self, resp_path):
+        resp = parse_xml(resp_path)
+        strip_envelope_namespaces(resp)
+        assert resp.getroot().tag == "Envelope"
+        assert not [
+            elm for elm in resp.iter(tag=etree.Element) if elm.tag.startswith("{")
+        ]
+
+    def test_air_shopping_key(self):
+        dept = datetime.date(2025, 6, 13)
+        itinerary = [Leg("MOW", "AER", dept), Leg("AER", "MOW", dept)]
+        paxes = [AnonymousPassenger("Pax-1", "ADT"), AnonymousPassenger("Pax-2", "CNN")]
+        key = air_shopping_key(itinerary, paxes)
+        assert key == air_shopping_key(list(itinerary), list(reversed(paxes)))
+        assert key != air_shopping_key(list(reversed(itinerary)), paxes)
+        assert key != air_shopping_key(itinerary, paxes[:1])
+        assert hash(key) == hash(air_shopping_key(itinerary, paxes))
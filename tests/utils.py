@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 import os
+import time
+from copy import deepcopy
 
 from mixvel.utils import lxml_remove_namespaces
 
 from lxml import etree
+import requests
 
 here = os.path.abspath(os.path.dirname(__file__))
 
@@ -20,3 +23,69 @@ def parse_xml_response(resp_path):
     resp = parse_xml(resp_path)
     lxml_remove_namespaces(resp)
     return resp.find('.//Body/AppData/')
+
+
+def multiply_offers(resp, overrides):
+    """Appends copies of the first offer to air shopping response.
+
+    :param resp: Mixvel_AirShoppingRS, e.g. returned by `parse_xml_response`
+    :param overrides: texts of elements of every copy by their paths,
+        e.g. {"OfferID": "offer-1", "TotalPrice/TotalAmount": "3000.00"},
+        None removes the element
+    :type overrides: list[dict]
+    :return: resp
+    """
+    response = resp.find("./Response")
+    offer = response.find("./Offer")
+    for texts in overrides:
+        copy = deepcopy(offer)
+        for path, text in texts.items():
+            elm = copy.find(path)
+            if text is None:
+                elm.getparent().remove(elm)
+            else:
+                elm.text = text
+        response.append(copy)
+    return resp
+
+
+class FakeResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(
+                "{} Error".format(self.status_code), response=self
+            )
+
+
+class FakeSession:
+    """Session stub replaying saved responses, keyed by endpoint."""
+
+    def __init__(self, responses, delay=0, statuses=None):
+        self.responses = responses
+        self.delay = delay
+        self.statuses = statuses or {}  # endpoint: error statuses to reply first
+        self.calls = []
+        self.closed = False
+
+    def post(self, url, data=None, headers=None, verify=True, **kwargs):
+        self.calls.append((url, data, headers))
+        time.sleep(self.delay)
+        endpoint = url[url.index("/api/"):]
+        if self.statuses.get(endpoint):
+            return FakeResponse(b"", status_code=self.statuses[endpoint].pop(0))
+        with open(os.path.join(here, self.responses[endpoint]), "rb") as f:
+            return FakeResponse(f.read())
+
+    def close(self):
+        self.closed = True